@@ -1,5 +1,5 @@
 import os
-from flask import Flask
+from flask import Flask, Response
 from flask_migrate import Migrate
 from config import config
 from extensions import db, jwt, ma, cors
@@ -25,9 +25,18 @@ def create_app(config_name=None):
         config_name = os.environ.get('FLASK_ENV', 'development')
     
     app.config.from_object(config[config_name])
+
+    # Fast JSON encoding with native datetime support
+    from services.json_provider import init_json_provider
+    init_json_provider(app)
     
+    # Backend-specific pool settings must be in place before the engine is built
+    from services.engine_profiles import apply_engine_options, install_sqlite_pragmas
+    apply_engine_options(app)
+
     # Initialize extensions with app
     db.init_app(app)
+    install_sqlite_pragmas(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
     ma.init_app(app)
@@ -37,7 +46,9 @@ def create_app(config_name=None):
         r"/api/*": {
             "origins": ["http://localhost:5173", "http://localhost:3000", "http://localhost:5174"],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization"],
+            # Lets the client back off on 503s from the password hashing pool
+            "expose_headers": ["Retry-After"]
         }
     })
     
@@ -46,17 +57,28 @@ def create_app(config_name=None):
     from models.category import Category
     from models.product import Product
     from models.sale import Sale, SaleItem
+    from models.sales_rollup import DailySalesRollup
+    from models.inventory_counter import InventoryCounter
+    from models.revoked_token import RevokedToken
+    from models.stock_movement import StockMovement, StockSnapshot
+    from models.table_version import TableVersion
 
     # Register blueprints (routes)
     from routes.auth_routes import auth_bp
     from routes.inventory_routes import inventory_bp
     from routes.category_routes import category_bp
     from routes.sale_routes import sale_bp
+    from routes.admin_routes import admin_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(inventory_bp, url_prefix='/api/inventory')
     app.register_blueprint(category_bp, url_prefix='/api/categories')
     app.register_blueprint(sale_bp, url_prefix='/api/sales')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+
+    # Register CLI maintenance commands
+    from commands import register_commands
+    register_commands(app)
     
     # JWT error handlers
     @jwt.invalid_token_loader
@@ -71,15 +93,54 @@ def create_app(config_name=None):
     def expired_token_callback(jwt_header, jwt_data):
         return {'error': 'Token has expired', 'message': 'Please log in again'}, 401
     
+    # Revoked tokens are checked against an in-memory blocklist
+    from services.token_blocklist import TokenBlocklist
+    TokenBlocklist(app)
+
+    # Password hashing runs on a bounded worker pool
+    from services.password_hasher import PasswordHasher
+    PasswordHasher(app)
+
+    # Identity lookups on authenticated endpoints go through a user cache
+    from services.user_cache import UserCache
+    UserCache(app)
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_data):
+        from services.token_blocklist import get_token_blocklist
+        return get_token_blocklist().is_revoked(jwt_data['jti'])
+    
     @jwt.revoked_token_loader
     def revoked_token_callback(jwt_header, jwt_data):
         return {'error': 'Token has been revoked', 'message': 'Please log in again'}, 401
     
+    # Read-only routes can be served from replicas (SQLALCHEMY_REPLICA_URIS)
+    from services.read_replicas import ReplicaRouter
+    ReplicaRouter(app)
+
+    # Request latency, status and SQL instrumentation for /api/metrics
+    from services.metrics import RequestMetrics
+    RequestMetrics(app)
+
+    # Statements over SLOW_QUERY_THRESHOLD_MS are recorded with their plans
+    from services.slow_query_log import SlowQueryLog
+    SlowQueryLog(app)
+
+    # Closed periods of the sales chart series are cached per worker
+    from services.sales_series_service import SalesSeriesCache
+    SalesSeriesCache(app)
+
     # Health check route
     @app.route('/api/health', methods=['GET'])
     def health_check():
         return {'status': 'ok', 'message': 'Server is running'}, 200
     
+    # Prometheus scrape target
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        from services.metrics import get_request_metrics
+        return Response(get_request_metrics().render(), mimetype='text/plain; version=0.0.4')
+
     # Root route
     @app.route('/')
     def index():
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+HTTP benchmark suite for every API blueprint.
+
+Starts ``create_app('testing')`` in-process on a temporary SQLite database
+seeded with a configurable number of products and sales. Each route in
+auth_bp, inventory_bp, category_bp, sale_bp and admin_bp is then driven by
+concurrent test clients. For every endpoint the suite records p50/p95/p99 latency,
+throughput, status codes and the number of SQL statements per request, and
+writes the results to a JSON baseline. Pass ``--compare`` with an earlier
+baseline to flag regressions between commits.
+
+Usage:
+    python benchmarks/bench_http.py
+    python benchmarks/bench_http.py --products 5000 --sales 20000 --output /tmp/after.json
+    python benchmarks/bench_http.py --compare benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, 'benchmarks', 'baseline.json')
+DEFAULT_LATEST = os.path.join(BACKEND_DIR, 'benchmarks', 'latest.json')
+BENCH_PASSWORD = 'password123'
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed_database(db, products, sales, seed=42):
+    """Bulk-insert a deterministic dataset and build the derived tables."""
+    from models.user import User
+    from models.category import Category
+    from models.product import Product
+    from models.sale import Sale, SaleItem, EAT, to_timestamp
+    from services.sales_rollup_service import rebuild_daily_rollup
+    from services.inventory_counter_service import reconcile_inventory_counters
+    from services.category_counter_service import reconcile_category_counts
+    from services.stock_ledger_service import record_opening_stock
+
+    rng = random.Random(seed)
+
+    admin = User(username='bench_admin', email='bench@example.com', first_name='Bench', last_name='Admin', role='admin')
+    admin.set_password(BENCH_PASSWORD)
+    db.session.add(admin)
+    db.session.flush()
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'cashier{i}', 'email': f'cashier{i}@example.com', 'first_name': 'Cashier',
+         'last_name': str(i), 'role': 'staff', 'is_active': True, 'password_hash': admin.password_hash}
+        for i in range(9)
+    ])
+    user_ids = [admin.id] + list(db.session.execute(db.select(User.id).where(User.id != admin.id)).scalars())
+
+    db.session.execute(Category.__table__.insert(), [
+        {'name': f'Category {i}', 'description': f'Benchmark category {i}'} for i in range(12)
+    ])
+    category_ids = list(db.session.execute(db.select(Category.id)).scalars())
+
+    db.session.execute(Product.__table__.insert(), [
+        {'name': f'Product {i}', 'sku': f'BENCH{i:06d}', 'category_id': rng.choice(category_ids),
+         'price': round(rng.uniform(1, 500), 2), 'stock': rng.randint(0, 100000),
+         'low_stock_threshold': 10, 'description': f'Benchmark product number {i}'}
+        for i in range(products)
+    ])
+    product_rows = db.session.execute(db.select(Product.id, Product.price)).all()
+
+    now = datetime.now(EAT)
+    batch = 1000
+    next_sale_id = 1
+    for offset in range(0, sales, batch):
+        sale_rows, item_rows = [], []
+        for sale_id in range(next_sale_id, next_sale_id + min(batch, sales - offset)):
+            lines = rng.sample(product_rows, min(len(product_rows), rng.randint(1, 4)))
+            total = 0
+            for product_id, price in lines:
+                quantity = rng.randint(1, 3)
+                total += price * quantity
+                item_rows.append({'sale_id': sale_id, 'product_id': product_id,
+                                  'quantity': quantity, 'price_at_sale': price})
+            sale_rows.append({'id': sale_id, 'total_amount': total, 'payment_method': 'cash',
+                              'user_id': rng.choice(user_ids),
+                              'created_ts': to_timestamp(now - timedelta(minutes=rng.randint(0, 60 * 24 * 120)))})
+        next_sale_id += len(sale_rows)
+        db.session.execute(Sale.__table__.insert(), sale_rows)
+        db.session.execute(SaleItem.__table__.insert(), item_rows)
+    db.session.commit()
+
+    rebuild_daily_rollup()
+    reconcile_inventory_counters()
+    reconcile_category_counts()
+    record_opening_stock()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+    return admin.id
+
+
+class Scenario:
+    """
+    One endpoint under test.
+
+    ``call(client, prepared)`` issues the timed request. The optional
+    ``setup(client)`` runs untimed before each call (e.g. to create the row a
+    DELETE will remove) and its return value is passed as ``prepared``.
+    """
+
+    def __init__(self, name, blueprint, call, setup=None):
+        self.name = name
+        self.blueprint = blueprint
+        self.call = call
+        self.setup = setup
+
+
+def build_scenarios(app, admin_id):
+    """Return a Scenario for every route, with per-call unique inputs where needed."""
+    from flask_jwt_extended import create_access_token, create_refresh_token
+    from extensions import db
+    from models.category import Category
+    from models.product import Product
+
+    counter = itertools.count(1)
+
+    with app.app_context():
+        claims = {'role': 'admin', 'username': 'bench_admin'}
+        access_token = create_access_token(identity=str(admin_id), additional_claims=claims)
+        refresh_token = create_refresh_token(identity=str(admin_id), additional_claims=claims)
+        product_ids = list(db.session.execute(db.select(Product.id).limit(500)).scalars())
+        in_stock_ids = list(db.session.execute(
+            db.select(Product.id).where(Product.stock > 1000).limit(200)
+        ).scalars())
+        category_ids = list(db.session.execute(db.select(Category.id)).scalars())
+
+    auth = {'Authorization': f'Bearer {access_token}'}
+
+    def fresh_token():
+        with app.app_context():
+            return create_access_token(identity=str(admin_id), additional_claims=claims)
+
+    def new_product(client):
+        n = next(counter)
+        response = client.post('/api/inventory/', headers=auth, json={
+            'name': f'Temp {n}', 'sku': f'TMP{n:08d}', 'price': 1, 'stock': 5})
+        return response.get_json()['id']
+
+    def new_category(client):
+        n = next(counter)
+        response = client.post('/api/categories/', headers=auth, json={'name': f'Temp category {n}'})
+        return response.get_json()['id']
+
+    def import_body():
+        start = next(counter) * 10
+        rows = ''.join(f'Imported {i},IMP{i:09d},Category 1,9.99,50,5\n' for i in range(start, start + 10))
+        return 'name,sku,category,price,stock,low_stock_threshold\n' + rows
+
+    def first_sales_cursor(client):
+        return client.get('/api/sales/', headers=auth, query_string={'limit': 50}).get_json()['next_cursor']
+
+    today = datetime.now().date()
+    month_ago = (today - timedelta(days=30)).isoformat()
+    week_ago = (today - timedelta(days=7)).isoformat()
+    year_ago = (today - timedelta(days=365)).isoformat()
+
+    return [
+        # auth_bp
+        Scenario('POST /api/auth/register', 'auth', lambda c, _: c.post('/api/auth/register', json={
+            'username': f'user{next(counter)}', 'email': f'user{next(counter)}@example.com',
+            'password': BENCH_PASSWORD})),
+        Scenario('POST /api/auth/login', 'auth', lambda c, _: c.post('/api/auth/login', json={
+            'email': 'bench@example.com', 'password': BENCH_PASSWORD})),
+        Scenario('POST /api/auth/refresh', 'auth', lambda c, _: c.post(
+            '/api/auth/refresh', headers={'Authorization': f'Bearer {refresh_token}'})),
+        Scenario('POST /api/auth/logout', 'auth', lambda c, token: c.post(
+            '/api/auth/logout', headers={'Authorization': f'Bearer {token}'}), setup=lambda c: fresh_token()),
+        Scenario('GET /api/auth/me', 'auth', lambda c, _: c.get('/api/auth/me', headers=auth)),
+        Scenario('PUT /api/auth/change-password', 'auth', lambda c, _: c.put('/api/auth/change-password', headers=auth, json={
+            'current_password': BENCH_PASSWORD, 'new_password': BENCH_PASSWORD})),
+        Scenario('PUT /api/auth/profile', 'auth', lambda c, _: c.put('/api/auth/profile', headers=auth, json={
+            'first_name': f'Bench{next(counter) % 10}'})),
+
+        # inventory_bp
+        Scenario('GET /api/inventory/ (page)', 'inventory', lambda c, _: c.get(
+            '/api/inventory/', headers=auth, query_string={'limit': 50})),
+        Scenario('GET /api/inventory/ (full list)', 'inventory', lambda c, _: c.get('/api/inventory/', headers=auth)),
+        Scenario('POST /api/inventory/', 'inventory', lambda c, _: c.post('/api/inventory/', headers=auth, json={
+            'name': f'New {next(counter)}', 'sku': f'NEW{next(counter):08d}', 'price': 2.5, 'stock': 20})),
+        Scenario('GET /api/inventory/search', 'inventory', lambda c, _: c.get(
+            '/api/inventory/search', headers=auth, query_string={'q': f'Product {random.randint(1, 99)}'})),
+        Scenario('POST /api/inventory/import', 'inventory', lambda c, body: c.post(
+            '/api/inventory/import', headers={**auth, 'Content-Type': 'text/csv'}, data=body),
+            setup=lambda c: import_body()),
+        Scenario('PATCH /api/inventory/bulk', 'inventory', lambda c, _: c.patch('/api/inventory/bulk', headers=auth, json={
+            'updates': [{'id': pid, 'price': round(random.uniform(1, 500), 2)} for pid in random.sample(product_ids, 20)]})),
+        Scenario('PUT /api/inventory/<id>', 'inventory', lambda c, _: c.put(
+            f'/api/inventory/{random.choice(product_ids)}', headers=auth, json={'price': round(random.uniform(1, 500), 2)})),
+        Scenario('DELETE /api/inventory/<id>', 'inventory', lambda c, product_id: c.delete(
+            f'/api/inventory/{product_id}', headers=auth), setup=new_product),
+        Scenario('GET /api/inventory/stats', 'inventory', lambda c, _: c.get('/api/inventory/stats', headers=auth)),
+        Scenario('GET /api/inventory/recent-activity', 'inventory', lambda c, _: c.get(
+            '/api/inventory/recent-activity', headers=auth)),
+        Scenario('GET /api/inventory/<id>/stock', 'inventory', lambda c, _: c.get(
+            f'/api/inventory/{random.choice(product_ids)}/stock', headers=auth, query_string={'as_of': month_ago})),
+        Scenario('GET /api/inventory/<id>/stock-movements', 'inventory', lambda c, _: c.get(
+            f'/api/inventory/{random.choice(in_stock_ids)}/stock-movements', headers=auth,
+            query_string={'limit': 50})),
+
+        # category_bp
+        Scenario('GET /api/categories/', 'categories', lambda c, _: c.get('/api/categories/', headers=auth)),
+        Scenario('POST /api/categories/', 'categories', lambda c, _: c.post('/api/categories/', headers=auth, json={
+            'name': f'Bench category {next(counter)}'})),
+        Scenario('PUT /api/categories/<id>', 'categories', lambda c, _: c.put(
+            f'/api/categories/{random.choice(category_ids)}', headers=auth, json={
+                'description': f'Updated {next(counter)}'})),
+        Scenario('DELETE /api/categories/<id>', 'categories', lambda c, category_id: c.delete(
+            f'/api/categories/{category_id}', headers=auth), setup=new_category),
+
+        # sale_bp
+        Scenario('GET /api/sales/ (page)', 'sales', lambda c, _: c.get(
+            '/api/sales/', headers=auth, query_string={'limit': 50})),
+        Scenario('GET /api/sales/ (next page)', 'sales', lambda c, cursor: c.get(
+            '/api/sales/', headers=auth, query_string={'limit': 50, 'cursor': cursor}), setup=first_sales_cursor),
+        Scenario('POST /api/sales/', 'sales', lambda c, _: c.post('/api/sales/', headers=auth, json={
+            'items': [{'product_id': pid, 'quantity': 1} for pid in random.sample(in_stock_ids, 3)]})),
+        Scenario('GET /api/sales/series (day)', 'sales', lambda c, _: c.get(
+            '/api/sales/series', headers=auth, query_string={'interval': 'day', 'start': month_ago})),
+        Scenario('GET /api/sales/series (hour)', 'sales', lambda c, _: c.get(
+            '/api/sales/series', headers=auth, query_string={'interval': 'hour', 'start': week_ago})),
+        Scenario('GET /api/sales/series (month)', 'sales', lambda c, _: c.get(
+            '/api/sales/series', headers=auth, query_string={'interval': 'month', 'start': year_ago})),
+        Scenario('GET /api/sales/export', 'sales', lambda c, _: c.get(
+            '/api/sales/export', headers=auth, query_string={'start': month_ago})),
+        Scenario('GET /api/sales/<id>', 'sales', lambda c, _: c.get(
+            f'/api/sales/{random.randint(1, 100)}', headers=auth)),
+        Scenario('POST /api/sales/generate-sample-data', 'sales', lambda c, _: c.post(
+            '/api/sales/generate-sample-data', headers=auth)),
+
+        # admin_bp
+        Scenario('GET /api/admin/slow-queries', 'admin', lambda c, _: c.get(
+            '/api/admin/slow-queries', headers=auth)),
+        Scenario('DELETE /api/admin/slow-queries', 'admin', lambda c, _: c.delete(
+            '/api/admin/slow-queries', headers=auth)),
+    ]
+
+
+def run_scenario(app, engine, scenario, concurrency, iterations):
+    """Drive one scenario with concurrent clients and summarize the results."""
+    from sqlalchemy import event
+
+    local = threading.local()
+
+    def count_statement(*args):
+        local.statements = getattr(local, 'statements', 0) + 1
+
+    latencies, query_counts, statuses = [], [], {}
+    lock = threading.Lock()
+
+    def client_loop():
+        client = app.test_client()
+        for _ in range(iterations):
+            prepared = scenario.setup(client) if scenario.setup else None
+            local.statements = 0
+            started = time.perf_counter()
+            response = scenario.call(client, prepared)
+            response.get_data()  # Drain streamed bodies
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                query_counts.append(local.statements)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    try:
+        threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    return {
+        'blueprint': scenario.blueprint,
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'sql_queries_per_request': round(sum(query_counts) / len(query_counts), 2) if query_counts else 0,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-endpoint deltas against a baseline; return True if anything regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['endpoints']
+
+    regressed = False
+    print(f'\nComparison with {baseline_path} (threshold {threshold:.0f}%)')
+    print('-' * 90)
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f'  {name:45} (new endpoint)')
+            continue
+        p95_change = ((current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100) if previous['p95_ms'] else 0
+        more_queries = current['sql_queries_per_request'] > previous['sql_queries_per_request']
+        flag = ''
+        if p95_change > threshold or more_queries:
+            flag = '  <-- REGRESSION'
+            regressed = True
+        print(f"  {name:45} p95 {previous['p95_ms']:8.2f} -> {current['p95_ms']:8.2f} ms ({p95_change:+6.1f}%)  "
+              f"queries {previous['sql_queries_per_request']} -> {current['sql_queries_per_request']}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=2000, help='seeded products')
+    parser.add_argument('--sales', type=int, default=5000, help='seeded sales')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent clients per endpoint')
+    parser.add_argument('--iterations', type=int, default=10, help='requests per client per endpoint')
+    parser.add_argument('--only', help='only run endpoints whose name contains this text')
+    parser.add_argument('--output', help='where to write the JSON results (default: benchmarks/baseline.json, '
+                                         'or benchmarks/latest.json when comparing)')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=25.0, help='allowed p95 slowdown in percent')
+    args = parser.parse_args()
+
+    from config import TestingConfig
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    from app import create_app
+    from extensions import db
+
+    try:
+        app = create_app('testing')
+        print(f'Seeding {args.products} products and {args.sales} sales...')
+        started = time.perf_counter()
+        with app.app_context():
+            db.create_all()
+            admin_id = seed_database(db, args.products, args.sales)
+            engine = db.engine
+        print(f'Seeded in {time.perf_counter() - started:.1f}s\n')
+
+        results = {}
+        for scenario in build_scenarios(app, admin_id):
+            if args.only and args.only not in scenario.name:
+                continue
+            result = run_scenario(app, engine, scenario, args.concurrency, args.iterations)
+            results[scenario.name] = result
+            print(f"  {scenario.name:45} p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  "
+                  f"p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:8.1f} req/s  "
+                  f"{result['sql_queries_per_request']:5} queries  errors {result['errors']}")
+    finally:
+        os.remove(path)
+
+    regressed = False
+    if args.compare:
+        regressed = compare(results, args.compare, args.threshold)
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'products': args.products,
+            'sales': args.sales,
+            'concurrency': args.concurrency,
+            'iterations': args.iterations,
+        },
+        'endpoints': results,
+    }
+    output = args.output or (DEFAULT_LATEST if args.compare else DEFAULT_BASELINE)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nResults written to {output}')
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+JSON serialization benchmark for the sales list.
+
+Seeds a temporary SQLite database, loads the sales list the way
+``GET /api/sales/`` does (``Sale.to_dict()`` with eager-loaded users, items,
+products and categories), then times encoding that payload with each JSON
+provider: Flask's stdlib encoder and orjson. It also times the full
+endpoint with each provider, so the share of request time spent encoding is
+visible.
+
+Usage:
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --sales 5000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_http import BENCH_PASSWORD, seed_database  # noqa: E402
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=500, help='seeded products')
+    parser.add_argument('--sales', type=int, default=3000, help='seeded sales (rows in the list)')
+    parser.add_argument('--repeat', type=int, default=10, help='timed repetitions (median is reported)')
+    args = parser.parse_args()
+
+    from config import TestingConfig
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    from app import create_app
+    from extensions import db
+    from services.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+
+    if orjson is None:
+        sys.exit('orjson is not installed; nothing to compare against')
+
+    app = create_app('testing')
+    from models.sale import Sale
+    from routes.sale_routes import _sale_loader_options
+
+    try:
+        with app.app_context():
+            db.create_all()
+            seed_database(db, args.products, args.sales)
+            sales = Sale.query.options(*_sale_loader_options()).order_by(Sale.created_ts.desc()).all()
+            payload = [sale.to_dict() for sale in sales]
+
+        client = app.test_client()
+        response = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': BENCH_PASSWORD})
+        headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+        results = []
+        for name, provider_class in (('stdlib', StdlibJSONProvider), ('orjson', OrjsonProvider)):
+            app.json = provider_class(app)
+            with app.app_context():
+                size = len(app.json.response(payload).get_data())
+                encode_ms = timed(lambda: app.json.response(payload), args.repeat)
+
+            def request():
+                assert client.get('/api/sales/', headers=headers).status_code == 200
+            request()  # warm up
+            endpoint_ms = timed(request, args.repeat)
+            results.append((name, encode_ms, endpoint_ms, size))
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    print(f'\nSales list JSON ({len(payload)} sales, median of {args.repeat})')
+    print('-' * 64)
+    print(f"{'provider':10} {'encode ms':>10} {'GET /api/sales/ ms':>19} {'body KB':>9}")
+    for name, encode_ms, endpoint_ms, size in results:
+        print(f'{name:10} {encode_ms:10.1f} {endpoint_ms:19.1f} {size / 1024:9.0f}')
+    stdlib, fast = results
+    print(f'\norjson encodes {stdlib[1] / fast[1]:.1f}x faster; '
+          f'endpoint {stdlib[2] - fast[2]:.0f} ms ({(1 - fast[2] / stdlib[2]) * 100:.0f}%) quicker')
+
+
+if __name__ == '__main__':
+    main()
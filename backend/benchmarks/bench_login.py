@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark.
+
+Runs the app in-process against a temporary SQLite database and fires
+concurrent POST /api/auth/login requests, reporting throughput, latency
+percentiles and how many requests were shed with 503 by the hashing pool.
+Use it to compare hash parameters and pool sizes.
+
+Usage:
+    python benchmarks/bench_login.py
+    python benchmarks/bench_login.py --method pbkdf2:sha256:600000 --workers 2 --concurrency 32
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(method, workers, queue_limit, concurrency, requests_per_client):
+    from config import TestingConfig
+    TestingConfig.PASSWORD_HASH_METHOD = method
+    TestingConfig.PASSWORD_HASH_WORKERS = workers
+    TestingConfig.PASSWORD_HASH_QUEUE_LIMIT = queue_limit
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    from app import create_app
+    from extensions import db
+    from models.user import User
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', email='bench@example.com', role='staff')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    credentials = {'email': 'bench@example.com', 'password': 'password123'}
+
+    def client_loop():
+        client = app.test_client()
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            response = client.post('/api/auth/login', json=credentials)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    os.remove(path)
+
+    ok = statuses.get(200, 0)
+    return {
+        'method': method,
+        'workers': workers,
+        'queue_limit': queue_limit,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'statuses': statuses,
+        'successful_logins_per_sec': ok / wall if wall else 0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--method', default='scrypt:32768:8:1', help='werkzeug hash method string')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help='hashing pool size')
+    parser.add_argument('--queue-limit', type=int, default=0, help='queued hashes before 503')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=10, help='logins per client')
+    args = parser.parse_args()
+
+    result = run(args.method, args.workers, args.queue_limit, args.concurrency, args.requests)
+
+    print(f"\nLogin benchmark ({result['method']}, {result['workers']} hash workers, "
+          f"queue {result['queue_limit']}, {result['concurrency']} clients)")
+    print('-' * 60)
+    print(f"  Requests:        {result['requests']}  statuses: {result['statuses']}")
+    print(f"  Logins/sec:      {result['successful_logins_per_sec']:.1f}")
+    print(f"  Latency p50/p95/p99: {result['p50_ms']:.1f} / {result['p95_ms']:.1f} / {result['p99_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+SQLite write-concurrency benchmark for the engine profiles.
+
+Runs the app in-process twice against fresh temporary databases: once with
+SQLite's defaults (rollback journal, synchronous=FULL) and once with the
+tuned ``SQLITE_PRAGMAS`` profile from ``Config``. In each run, writer threads
+post sales (POS checkouts) while reader threads pull the CSV export and the
+sales list, the pattern that used to make reports block checkouts. Reports
+checkout throughput, latency percentiles and failed writes per profile.
+
+Usage:
+    python benchmarks/bench_sqlite_concurrency.py
+    python benchmarks/bench_sqlite_concurrency.py --writers 8 --readers 4 --seconds 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_http import BENCH_PASSWORD, percentile, seed_database  # noqa: E402
+
+# What SQLite does out of the box (pysqlite still waits up to 5s on a lock)
+DEFAULT_PRAGMAS = {}
+
+
+def run(profile, pragmas, writers, readers, seconds, products, sales):
+    from config import TestingConfig
+    TestingConfig.SQLITE_PRAGMAS = pragmas
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    from app import create_app
+    from extensions import db
+
+    app = create_app('testing')
+    from models.product import Product
+    with app.app_context():
+        db.create_all()
+        seed_database(db, products, sales)
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+        product_ids = list(db.session.execute(
+            db.select(Product.id).where(Product.stock >= 1000)
+        ).scalars())
+
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': BENCH_PASSWORD})
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    lock = threading.Lock()
+    write_latencies, write_statuses = [], {}
+    read_latencies, read_statuses = [], {}
+    deadline = time.perf_counter() + seconds
+
+    def writer(index):
+        client = app.test_client()
+        n = 0
+        while time.perf_counter() < deadline:
+            product_id = product_ids[(index * 7919 + n) % len(product_ids)]
+            n += 1
+            started = time.perf_counter()
+            response = client.post('/api/sales/', headers=headers,
+                                   json={'items': [{'product_id': product_id, 'quantity': 1}]})
+            elapsed = time.perf_counter() - started
+            with lock:
+                write_latencies.append(elapsed)
+                write_statuses[response.status_code] = write_statuses.get(response.status_code, 0) + 1
+
+    def reader(index):
+        client = app.test_client()
+        urls = ['/api/sales/export', '/api/sales/?limit=200', '/api/inventory/stats']
+        n = index
+        while time.perf_counter() < deadline:
+            url = urls[n % len(urls)]
+            n += 1
+            started = time.perf_counter()
+            response = client.get(url, headers=headers)
+            response.get_data()  # drain streamed exports
+            elapsed = time.perf_counter() - started
+            with lock:
+                read_latencies.append(elapsed)
+                read_statuses[response.status_code] = read_statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    with app.app_context():
+        db.engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    ok_writes = write_statuses.get(201, 0)
+    return {
+        'profile': profile,
+        'journal_mode': journal_mode,
+        'writes': len(write_latencies),
+        'write_statuses': write_statuses,
+        'failed_writes': len(write_latencies) - ok_writes,
+        'writes_per_sec': ok_writes / wall if wall else 0,
+        'write_p50_ms': percentile(write_latencies, 50) * 1000,
+        'write_p95_ms': percentile(write_latencies, 95) * 1000,
+        'write_p99_ms': percentile(write_latencies, 99) * 1000,
+        'reads_per_sec': len(read_latencies) / wall if wall else 0,
+        'read_p95_ms': percentile(read_latencies, 95) * 1000,
+        'read_statuses': read_statuses,
+    }
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4, help='concurrent checkout clients')
+    parser.add_argument('--readers', type=int, default=2, help='concurrent report clients')
+    parser.add_argument('--seconds', type=float, default=10, help='duration of each run')
+    parser.add_argument('--products', type=int, default=500, help='seeded products')
+    parser.add_argument('--sales', type=int, default=5000, help='seeded sales (size of each export)')
+    args = parser.parse_args()
+
+    results = [
+        run(name, pragmas, args.writers, args.readers, args.seconds, args.products, args.sales)
+        for name, pragmas in (('default', DEFAULT_PRAGMAS), ('tuned', dict(Config.SQLITE_PRAGMAS)))
+    ]
+
+    print(f'\nSQLite concurrency ({args.writers} writers, {args.readers} readers, {args.seconds:.0f}s per profile)')
+    print('-' * 96)
+    print(f"{'profile':10} {'journal':8} {'writes/s':>9} {'failed':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'reads/s':>8} {'read p95':>9}")
+    for r in results:
+        print(f"{r['profile']:10} {r['journal_mode']:8} {r['writes_per_sec']:9.1f} {r['failed_writes']:7d} "
+              f"{r['write_p50_ms']:8.1f} {r['write_p95_ms']:8.1f} {r['write_p99_ms']:8.1f} "
+              f"{r['reads_per_sec']:8.1f} {r['read_p95_ms']:9.1f}")
+    for r in results:
+        print(f"  {r['profile']}: write statuses {r['write_statuses']}, read statuses {r['read_statuses']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Flask CLI commands for database maintenance.
+
+Run with the Flask CLI, e.g. ``flask --app app rebuild-sales-rollup``.
+"""
+from datetime import datetime
+
+import click
+
+
+def register_commands(app):
+    """Attach maintenance commands to the app's CLI."""
+
+    @app.cli.command('rebuild-sales-rollup')
+    def rebuild_sales_rollup():
+        """Recompute daily_sales_rollup from the full sales history."""
+        from services.sales_rollup_service import rebuild_daily_rollup
+
+        days = rebuild_daily_rollup()
+        click.echo(f'Rebuilt daily sales rollup: {days} day(s)')
+
+    @app.cli.command('reconcile-inventory-counters')
+    def reconcile_inventory_counters_command():
+        """Recompute in-stock / low-stock / out-of-stock counters."""
+        from services.inventory_counter_service import reconcile_inventory_counters
+
+        counter = reconcile_inventory_counters()
+        click.echo(
+            f'Inventory counters: {counter.in_stock} in stock, '
+            f'{counter.low_stock} low stock, {counter.out_of_stock} out of stock'
+        )
+
+    @app.cli.command('reconcile-category-counts')
+    def reconcile_category_counts_command():
+        """Recompute each category's product_count from the products table."""
+        from services.category_counter_service import reconcile_category_counts
+
+        corrected = reconcile_category_counts()
+        click.echo(f'Category product counts: corrected {corrected} category(ies)')
+
+    @app.cli.command('snapshot-stock')
+    def snapshot_stock_command():
+        """Snapshot the stock of every product that moved since the last run."""
+        from services.stock_ledger_service import take_stock_snapshots
+
+        written = take_stock_snapshots()
+        click.echo(f'Stock snapshots: {written} product(s)')
+
+    @app.cli.command('record-opening-stock')
+    def record_opening_stock_command():
+        """Ledger current stock for products that have no movement history."""
+        from services.stock_ledger_service import record_opening_stock
+
+        written = record_opening_stock()
+        click.echo(f'Opening stock movements: {written} product(s)')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Create (if missing) and repopulate the product search index."""
+        from services.product_search_service import rebuild_search_index
+
+        rebuild_search_index()
+        click.echo('Product search index rebuilt')
+
+    @app.cli.command('prune-revoked-tokens')
+    def prune_revoked_tokens_command():
+        """Delete revocations for tokens that have already expired."""
+        from services.token_blocklist import prune_expired_tokens
+
+        removed = prune_expired_tokens()
+        click.echo(f'Pruned {removed} expired token revocation(s)')
+
+    @app.cli.command('seed-data')
+    @click.option('--users', default=25, show_default=True, help='Staff accounts (the first is an admin).')
+    @click.option('--categories', default=8, show_default=True, help='Number of categories.')
+    @click.option('--products', default=5000, show_default=True, help='Number of products.')
+    @click.option('--days', default=365, show_default=True, help='Days of sales history.')
+    @click.option('--sales-per-day', default=2500, show_default=True, help='Average sales per business day.')
+    @click.option('--seed', default=42, show_default=True, help='Random seed.')
+    @click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']),
+                  help='Last day of history (EAT). Defaults to today; fix it for reproducible data.')
+    @click.option('--batch-size', default=5000, show_default=True, help='Sales per insert batch.')
+    def seed_data_command(users, categories, products, days, sales_per_day, seed, end_date, batch_size):
+        """Generate a large, realistic dataset with bulk inserts."""
+        from services.data_seeder import SEED_PASSWORD, seed_dataset
+
+        started = datetime.now()
+
+        def progress(day, sales):
+            if day.day == 1 or day == end_day:
+                click.echo(f'  {day.isoformat()}: {sales:,} sales')
+
+        end_day = end_date.date() if end_date else None
+        try:
+            counts = seed_dataset(
+                users=users, categories=categories, products=products, days=days,
+                sales_per_day=sales_per_day, seed=seed, end_date=end_day,
+                batch_size=batch_size, progress=progress
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        elapsed = (datetime.now() - started).total_seconds()
+        click.echo(', '.join(f'{count:,} {table}' for table, count in counts.items()) + f' in {elapsed:.1f}s')
+        click.echo(f'Log in as seed_admin@example.com / {SEED_PASSWORD}')
@@ -11,9 +11,75 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # How often each worker pulls token revocations made by other workers
+    JWT_BLOCKLIST_SYNC_SECONDS = 5
+
+    # Cache of user records used to resolve JWT identities
+    USER_CACHE_MAX_SIZE = 1024
+    USER_CACHE_TTL_SECONDS = 60
+
+    # Password hashing (werkzeug method string, e.g. 'scrypt:32768:8:1' or
+    # 'pbkdf2:sha256:600000'). Existing hashes are upgraded on next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or min(4, os.cpu_count() or 1))
+    # Hashes allowed to wait for a busy pool. Each waiter holds a request
+    # thread, so keep workers + queue well below the server's thread count;
+    # the default 0 answers 503 (with Retry-After) as soon as every worker is busy
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT') or 0)
+    PASSWORD_HASH_TIMEOUT_SECONDS = 10
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Engine profiles, picked by the database URI's backend.
+    # SQLite: WAL lets reports read while the POS writes; NORMAL sync is
+    # durable across app crashes in WAL mode; busy_timeout makes concurrent
+    # writers queue instead of failing with "database is locked".
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,  # ms
+        'cache_size': -64000,  # KiB (64 MB)
+        'mmap_size': 268435456,  # 256 MB
+        'temp_store': 'MEMORY',
+    }
+    # MySQL: recycle connections before the server/proxy idle timeout drops
+    # them and ping on checkout so a dead connection never reaches a request
+    MYSQL_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE') or 10),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW') or 20),
+        'pool_timeout': 10,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE') or 1800),
+        'pool_pre_ping': True,
+    }
     TIMEZONE = 'Africa/Nairobi'  # EAT (UTC+3)
 
+    # Read replicas for read-only routes (comma-separated URIs; empty = primary only).
+    # A replica further behind than REPLICA_MAX_LAG_SECONDS is skipped, and users
+    # who just wrote read from the primary for that long.
+    SQLALCHEMY_REPLICA_URIS = [
+        uri.strip() for uri in (os.environ.get('DATABASE_REPLICA_URLS') or '').split(',') if uri.strip()
+    ]
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS') or 5)
+    REPLICA_CHECK_INTERVAL_SECONDS = 10
+
+    # 'auto' uses orjson when installed, else the stdlib; or force 'orjson' / 'stdlib'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER') or 'auto'
+
+    # Keyset pagination for list endpoints
+    PAGINATION_DEFAULT_LIMIT = 50
+    PAGINATION_MAX_LIMIT = 200
+
+    # Statements slower than this are kept (with their plan) for GET /api/admin/slow-queries
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS') or 100)
+    SLOW_QUERY_LOG_SIZE = 200
+    SLOW_QUERY_EXPLAIN = True
+    # Bound values can hold emails, password hashes and tokens; by default only
+    # their types are recorded
+    SLOW_QUERY_LOG_PARAMETERS = (os.environ.get('SLOW_QUERY_LOG_PARAMETERS') or '').lower() in ('1', 'true', 'yes')
+
+    # Closed buckets of GET /api/sales/series kept per worker
+    SALES_SERIES_CACHE_SIZE = 20000
+    SALES_SERIES_MAX_BUCKETS = 2000
+
 
 class DevelopmentConfig(Config):
     """Development configuration using SQLite."""
@@ -64,6 +64,14 @@ def create_test_db():
             db.session.add(product)
         
         db.session.commit()
+
+        # Products were added directly, so fill in the per-category counts
+        from services.category_counter_service import reconcile_category_counts
+        reconcile_category_counts()
+
+        # Start each product's stock ledger at its current stock
+        from services.stock_ledger_service import record_opening_stock
+        record_opening_stock()
         
         print("\n" + "="*50)
         print("✅ Test database created successfully!")
@@ -0,0 +1,136 @@
+"""Create the base schema
+
+The first revisions only altered tables that db.create_all() had already
+made, so ``flask db upgrade`` failed on an empty database. This revision
+creates every table the later ones expect (in the shape they expect), plus
+the tables added without a revision of their own: daily_sales_rollup,
+inventory_counters and revoked_tokens, and the product search index.
+Tables that already exist are left alone, so databases built with
+db.create_all() upgrade unchanged.
+
+Revision ID: 9d1f3b5a7c20
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d1f3b5a7c20'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+
+    if 'users' not in tables:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=255), nullable=False),
+            sa.Column('first_name', sa.String(length=50), nullable=True),
+            sa.Column('last_name', sa.String(length=50), nullable=True),
+            sa.Column('role', sa.String(length=20), nullable=False),
+            sa.Column('is_active', sa.Boolean(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+        )
+        op.create_index('ix_users_username', 'users', ['username'], unique=True)
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+        op.create_index('ix_users_role', 'users', ['role'], unique=False)
+
+    if 'categories' not in tables:
+        op.create_table(
+            'categories',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=50), nullable=False, unique=True),
+            sa.Column('description', sa.String(length=200), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+
+    if 'products' not in tables:
+        op.create_table(
+            'products',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('sku', sa.String(length=50), nullable=False, unique=True),
+            sa.Column('category_id', sa.Integer(), sa.ForeignKey('categories.id'), nullable=True),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.Column('stock', sa.Integer(), nullable=True),
+            sa.Column('low_stock_threshold', sa.Integer(), nullable=True),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sqlite_autoincrement=True,
+        )
+        from services.product_search_service import install_search_index
+        install_search_index(bind)
+
+    if 'sales' not in tables:
+        op.create_table(
+            'sales',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('total_amount', sa.Float(), nullable=False),
+            sa.Column('payment_method', sa.String(length=20), nullable=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+
+    if 'sale_items' not in tables:
+        op.create_table(
+            'sale_items',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('sale_id', sa.Integer(), sa.ForeignKey('sales.id'), nullable=False),
+            sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id'), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('price_at_sale', sa.Float(), nullable=False),
+        )
+
+    if 'daily_sales_rollup' not in tables:
+        op.create_table(
+            'daily_sales_rollup',
+            sa.Column('date', sa.Date(), primary_key=True),
+            sa.Column('revenue', sa.Float(), nullable=False),
+            sa.Column('units', sa.Integer(), nullable=False),
+            sa.Column('sale_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+    if 'inventory_counters' not in tables:
+        op.create_table(
+            'inventory_counters',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('in_stock', sa.Integer(), nullable=False),
+            sa.Column('low_stock', sa.Integer(), nullable=False),
+            sa.Column('out_of_stock', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+    if 'revoked_tokens' not in tables:
+        op.create_table(
+            'revoked_tokens',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('jti', sa.String(length=36), nullable=False, unique=True),
+            sa.Column('token_type', sa.String(length=10), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('revoked_at', sa.DateTime(), nullable=False),
+        )
+        op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'], unique=False)
+        op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS products_fts')
+        op.execute('DROP TABLE IF EXISTS products_fts_trigram')
+    for table in ('revoked_tokens', 'inventory_counters', 'daily_sales_rollup',
+                  'sale_items', 'sales', 'products', 'categories', 'users'):
+        op.drop_table(table)
@@ -0,0 +1,45 @@
+"""Add secondary indexes for sales, sale items and products
+
+Covers the columns the dashboard, sales list and activity feed filter, join
+or sort on. The indexes are created with IF NOT EXISTS so this is safe on
+databases (built by db.create_all()) that already have them.
+
+Revision ID: a1c4e9d2b7f0
+Revises: 9d1f3b5a7c20
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c4e9d2b7f0'
+down_revision = '9d1f3b5a7c20'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_sales_created_at', 'sales', ['created_at']),
+    ('ix_sales_user_id', 'sales', ['user_id']),
+    ('ix_sale_items_sale_id', 'sale_items', ['sale_id']),
+    ('ix_sale_items_product_id', 'sale_items', ['product_id']),
+    ('ix_products_category_id', 'products', ['category_id']),
+    ('ix_products_stock', 'products', ['stock']),
+    ('ix_products_updated_at', 'products', ['updated_at']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        # Skip columns a later revision replaced (sales.created_at -> created_ts)
+        if set(columns) <= existing:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
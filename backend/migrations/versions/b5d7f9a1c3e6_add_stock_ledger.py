@@ -0,0 +1,74 @@
+"""Add the stock movement ledger and stock snapshots
+
+stock_movements is an append-only history of every change to
+products.stock (sales, adjustments, restocks and imports), written in the
+same transaction as the change. stock_snapshots holds periodic per-product
+balances taken by ``flask snapshot-stock``, so stock at a past time is one
+snapshot plus a bounded replay (see services/stock_ledger_service.py).
+
+Existing products get an opening 'adjustment' equal to their current stock,
+so each product's history adds up to its stock from here on. Skips tables
+that db.create_all() already made.
+
+Revision ID: b5d7f9a1c3e6
+Revises: f4a6b8c0d2e4
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+import time
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d7f9a1c3e6'
+down_revision = 'f4a6b8c0d2e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'stock_movements' not in tables:
+        op.create_table(
+            'stock_movements',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id'), nullable=False),
+            sa.Column('kind', sa.String(length=20), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('sale_id', sa.Integer(), sa.ForeignKey('sales.id'), nullable=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('created_ts', sa.BigInteger(), nullable=False),
+        )
+    op.create_index('ix_stock_movements_created_ts', 'stock_movements', ['created_ts'],
+                    unique=False, if_not_exists=True)
+    op.create_index('ix_stock_movements_product_created', 'stock_movements',
+                    ['product_id', 'created_ts', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_stock_movements_kind_created', 'stock_movements', ['kind', 'created_ts'],
+                    unique=False, if_not_exists=True)
+
+    if 'stock_snapshots' not in tables:
+        op.create_table(
+            'stock_snapshots',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id'), nullable=False),
+            sa.Column('taken_ts', sa.BigInteger(), nullable=False),
+            sa.Column('stock', sa.Integer(), nullable=False),
+            sa.UniqueConstraint('product_id', 'taken_ts', name='uq_stock_snapshots_product_taken'),
+        )
+    op.create_index('ix_stock_snapshots_taken_ts', 'stock_snapshots', ['taken_ts'],
+                    unique=False, if_not_exists=True)
+
+    op.get_bind().execute(sa.text(
+        'INSERT INTO stock_movements (product_id, kind, quantity, created_ts) '
+        "SELECT id, 'adjustment', stock, :now FROM products "
+        'WHERE stock != 0 AND NOT EXISTS '
+        '(SELECT 1 FROM stock_movements WHERE stock_movements.product_id = products.id)'
+    ), {'now': int(time.time())})
+
+
+def downgrade():
+    op.drop_table('stock_snapshots')
+    op.drop_table('stock_movements')
@@ -0,0 +1,33 @@
+"""Add categories.updated_at
+
+Used (with products.updated_at) as the validator for conditional GETs on the
+category list. Existing rows are backfilled from created_at. Skips the column
+on databases where db.create_all() already added it.
+
+Revision ID: c3d5f7a9e1b2
+Revises: a1c4e9d2b7f0
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d5f7a9e1b2'
+down_revision = 'a1c4e9d2b7f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('categories')}
+    if 'updated_at' not in columns:
+        with op.batch_alter_table('categories') as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute('UPDATE categories SET updated_at = created_at WHERE updated_at IS NULL')
+
+
+def downgrade():
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,50 @@
+"""Create the inventory counter row
+
+The write paths adjust the single inventory_counters row in place and now
+fail if it is missing, instead of silently dropping the change. Databases
+where the row was only ever built lazily (by the first stats request) get
+it here, counted from the products table.
+
+Revision ID: c6e8a0b2d4f6
+Revises: b5d7f9a1c3e6
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e8a0b2d4f6'
+down_revision = 'b5d7f9a1c3e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'inventory_counters' not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            'inventory_counters',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('in_stock', sa.Integer(), nullable=False),
+            sa.Column('low_stock', sa.Integer(), nullable=False),
+            sa.Column('out_of_stock', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+    if bind.execute(sa.text('SELECT 1 FROM inventory_counters WHERE id = 1')).first() is not None:
+        return
+    bind.execute(sa.text(
+        'INSERT INTO inventory_counters (id, in_stock, low_stock, out_of_stock, updated_at) '
+        'SELECT 1, '
+        'COUNT(*) - COALESCE(SUM(CASE WHEN stock = 0 OR stock <= low_stock_threshold THEN 1 ELSE 0 END), 0), '
+        'COALESCE(SUM(CASE WHEN stock != 0 AND stock <= low_stock_threshold THEN 1 ELSE 0 END), 0), '
+        'COALESCE(SUM(CASE WHEN stock = 0 THEN 1 ELSE 0 END), 0), '
+        'CURRENT_TIMESTAMP '
+        'FROM products'
+    ))
+
+
+def downgrade():
+    pass  # The row is harmless to older code, which builds it on demand
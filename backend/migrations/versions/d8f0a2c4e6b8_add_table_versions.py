@@ -0,0 +1,45 @@
+"""Add per-table version counters
+
+The product and category list ETags were built from max(updated_at) and a
+row count. Both can stay put across a real change (same-second edits on
+MySQL, a delete plus an insert), which sent stale 304s. table_versions
+holds a counter per table that each committing write bumps (see
+models/table_version.py), plus 'sales_history', which moves when a past
+day's sales totals change.
+
+Revision ID: d8f0a2c4e6b8
+Revises: c6e8a0b2d4f6
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f0a2c4e6b8'
+down_revision = 'c6e8a0b2d4f6'
+branch_labels = None
+depends_on = None
+
+VERSION_NAMES = ('categories', 'products', 'sales_history')
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'table_versions' not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            'table_versions',
+            sa.Column('name', sa.String(length=50), primary_key=True),
+            sa.Column('version', sa.BigInteger(), nullable=False),
+        )
+
+    existing = {row[0] for row in bind.execute(sa.text('SELECT name FROM table_versions'))}
+    for name in VERSION_NAMES:
+        if name not in existing:
+            bind.execute(sa.text('INSERT INTO table_versions (name, version) VALUES (:name, 0)'),
+                         {'name': name})
+
+
+def downgrade():
+    op.drop_table('table_versions')
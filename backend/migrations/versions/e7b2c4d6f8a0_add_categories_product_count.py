@@ -0,0 +1,40 @@
+"""Add categories.product_count
+
+Counter-cached number of products per category, kept up to date by the
+product write paths (see services/category_counter_service.py). Existing rows
+are backfilled from the products table; the same repair can be run later
+with ``flask reconcile-category-counts``. Skips the column on databases where
+db.create_all() already added it.
+
+Revision ID: e7b2c4d6f8a0
+Revises: c3d5f7a9e1b2
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b2c4d6f8a0'
+down_revision = 'c3d5f7a9e1b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('categories')}
+    if 'product_count' not in columns:
+        with op.batch_alter_table('categories') as batch_op:
+            batch_op.add_column(
+                sa.Column('product_count', sa.Integer(), nullable=False, server_default='0')
+            )
+    op.execute(
+        'UPDATE categories SET product_count = '
+        '(SELECT COUNT(*) FROM products WHERE products.category_id = categories.id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('product_count')
@@ -0,0 +1,55 @@
+"""Keep the stock ledger when a product is deleted
+
+Deleting a product used to delete its stock movements and snapshots first,
+because both referenced products.id. The ledger is append-only, so the
+foreign keys go instead: rows keep the product id of a deleted product,
+whose history now ends with a closing adjustment.
+
+Revision ID: e9a1c3e5f7b9
+Revises: d8f0a2c4e6b8
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a1c3e5f7b9'
+down_revision = 'd8f0a2c4e6b8'
+branch_labels = None
+depends_on = None
+
+LEDGER_TABLES = ('stock_movements', 'stock_snapshots')
+
+# SQLite reflects these foreign keys without a name; batch mode names them by this
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _product_foreign_keys(bind, table):
+    return [
+        fk for fk in sa.inspect(bind).get_foreign_keys(table)
+        if fk['referred_table'] == 'products' and fk['constrained_columns'] == ['product_id']
+    ]
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table in LEDGER_TABLES:
+        foreign_keys = _product_foreign_keys(bind, table)
+        if not foreign_keys:
+            continue
+        if bind.dialect.name == 'sqlite':
+            with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+                batch_op.drop_constraint(f'fk_{table}_product_id_products', type_='foreignkey')
+        else:
+            for fk in foreign_keys:
+                op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+
+def downgrade():
+    # Fails on databases that enforce foreign keys once a product with history was deleted
+    for table in LEDGER_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_foreign_key(f'fk_{table}_product_id_products', 'products',
+                                        ['product_id'], ['id'])
@@ -0,0 +1,60 @@
+"""Never reuse product ids
+
+A deleted product keeps its stock ledger under its id, but SQLite hands the
+highest rowid out again once that row is deleted, so a new product could
+inherit another product's movements and snapshots. products becomes an
+AUTOINCREMENT table on SQLite, and on every backend the id counter is moved
+past any id the ledger still holds.
+
+Revision ID: f1b3d5e7a9c2
+Revises: e9a1c3e5f7b9
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b3d5e7a9c2'
+down_revision = 'e9a1c3e5f7b9'
+branch_labels = None
+depends_on = None
+
+
+def _highest_product_id(bind):
+    """Highest id held by a product or by the ledger of a deleted one."""
+    return bind.execute(sa.text(
+        'SELECT MAX(id) FROM ('
+        'SELECT MAX(id) AS id FROM products '
+        'UNION ALL SELECT MAX(product_id) FROM stock_movements '
+        'UNION ALL SELECT MAX(product_id) FROM stock_snapshots'
+        ') AS ids'
+    )).scalar() or 0
+
+
+def upgrade():
+    bind = op.get_bind()
+    highest = _highest_product_id(bind)
+
+    if bind.dialect.name == 'sqlite':
+        table_sql = bind.execute(sa.text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'products'"
+        )).scalar()
+        if 'AUTOINCREMENT' not in table_sql.upper():
+            with op.batch_alter_table('products', recreate='always',
+                                      table_kwargs={'sqlite_autoincrement': True}):
+                pass
+            # Dropping the old table dropped its search triggers
+            from services.product_search_service import install_search_index
+            install_search_index(bind)
+
+        bind.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'products'"))
+        bind.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES ('products', :seq)"),
+                     {'seq': highest})
+    elif bind.dialect.name == 'mysql':
+        op.execute(f'ALTER TABLE products AUTO_INCREMENT = {int(highest) + 1}')
+
+
+def downgrade():
+    pass  # AUTOINCREMENT is harmless to older code
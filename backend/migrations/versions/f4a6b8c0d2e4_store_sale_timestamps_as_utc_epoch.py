@@ -0,0 +1,92 @@
+"""Store sale timestamps as UTC epoch seconds
+
+Replaces sales.created_at (a DATETIME holding a mix of naive UTC and EAT
+wall-clock values) with sales.created_ts, an indexed BIGINT of UTC seconds
+since the epoch. Existing rows are backfilled in id-range chunks with one
+UPDATE per chunk, then the old column is dropped.
+
+The stored DATETIMEs carry no zone, so the backfill cannot tell the two
+kinds of row apart. By default every row is read as UTC, which is how the
+API has always displayed them. If rows from some id onwards were written in
+EAT wall-clock time (sales rung up through the API after the switch to
+EAT), set SALE_TIMESTAMPS_EAT_FROM_ID to that id before upgrading, then run
+``flask rebuild-sales-rollup``.
+
+Revision ID: f4a6b8c0d2e4
+Revises: e7b2c4d6f8a0
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+import os
+import time
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a6b8c0d2e4'
+down_revision = 'e7b2c4d6f8a0'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 50000
+EAT_OFFSET_SECONDS = 3 * 3600
+
+
+def _epoch_seconds(dialect):
+    """SQL reading the naive sales.created_at as UTC epoch seconds."""
+    if dialect == 'sqlite':
+        return "CAST(strftime('%s', created_at) AS INTEGER)"
+    return "TIMESTAMPDIFF(SECOND, '1970-01-01', created_at)"
+
+
+def upgrade():
+    bind = op.get_bind()
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('sales')}
+    if 'created_at' not in columns:
+        return  # Created by db.create_all() with created_ts already
+
+    if 'created_ts' not in columns:
+        with op.batch_alter_table('sales') as batch_op:
+            batch_op.add_column(sa.Column('created_ts', sa.BigInteger(), nullable=True))
+
+    eat_from_id = os.environ.get('SALE_TIMESTAMPS_EAT_FROM_ID')
+    epoch = _epoch_seconds(bind.dialect.name)
+    if eat_from_id:
+        epoch = f'{epoch} - CASE WHEN id >= {int(eat_from_id)} THEN {EAT_OFFSET_SECONDS} ELSE 0 END'
+
+    max_id = bind.execute(sa.text('SELECT MAX(id) FROM sales')).scalar() or 0
+    update = sa.text(
+        f'UPDATE sales SET created_ts = {epoch} '
+        'WHERE id > :low AND id <= :high AND created_ts IS NULL'
+    )
+    for low in range(0, max_id, BACKFILL_CHUNK_SIZE):
+        bind.execute(update, {'low': low, 'high': low + BACKFILL_CHUNK_SIZE})
+    # Rows that never had a timestamp get the time of the migration
+    bind.execute(sa.text(
+        'UPDATE sales SET created_ts = :now WHERE created_ts IS NULL'
+    ), {'now': int(time.time())})
+
+    op.drop_index('ix_sales_created_at', table_name='sales', if_exists=True)
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.alter_column('created_ts', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column('created_at')
+    op.create_index('ix_sales_created_ts', 'sales', ['created_ts'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        to_datetime = "datetime(created_ts, 'unixepoch')"
+    else:
+        to_datetime = "TIMESTAMPADD(SECOND, created_ts, '1970-01-01')"
+
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.execute(f'UPDATE sales SET created_at = {to_datetime}')
+
+    op.drop_index('ix_sales_created_ts', table_name='sales', if_exists=True)
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.drop_column('created_ts')
+    op.create_index('ix_sales_created_at', 'sales', ['created_at'], unique=False, if_not_exists=True)
@@ -8,13 +8,16 @@ class Category(db.Model):
     name = db.Column(db.String(50), unique=True, nullable=False)
     description = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Maintained by services.category_counter_service
+    product_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
-            'product_count': len(self.products) if self.products else 0
+            'product_count': self.product_count or 0
         }
 
 class CategorySchema(ma.SQLAlchemyAutoSchema):
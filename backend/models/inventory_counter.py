@@ -0,0 +1,23 @@
+from extensions import db
+from sqlalchemy import event
+from datetime import datetime
+
+class InventoryCounter(db.Model):
+    """Single-row table holding product counts per stock status."""
+    __tablename__ = 'inventory_counters'
+
+    id = db.Column(db.Integer, primary_key=True)
+    in_stock = db.Column(db.Integer, nullable=False, default=0)
+    low_stock = db.Column(db.Integer, nullable=False, default=0)
+    out_of_stock = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def total(self):
+        return self.in_stock + self.low_stock + self.out_of_stock
+
+@event.listens_for(InventoryCounter.__table__, 'after_create')
+def create_counter_row(target, connection, **kw):
+    """Create the single counter row whenever the table is created."""
+    from services.inventory_counter_service import install_counter_row
+    install_counter_row(connection)
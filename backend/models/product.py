@@ -1,8 +1,11 @@
 from extensions import db, ma
 from datetime import datetime
+from sqlalchemy import event
 
 class Product(db.Model):
     __tablename__ = 'products'
+    # Never reuse a deleted product's id: its stock ledger is kept under it
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -10,15 +13,15 @@ class Product(db.Model):
     # category is now a foreign key, but we keep the string for backward compatibility or display if needed, 
     # or we can remove it. Let's keep it simple and just add category_id and make category string optional/computed.
     # For this phase, I'll replace the string column with a relationship.
-    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True, index=True)
     category = db.relationship('Category', backref='products')
     
     price = db.Column(db.Float, nullable=False)
-    stock = db.Column(db.Integer, default=0)
+    stock = db.Column(db.Integer, default=0, index=True)
     low_stock_threshold = db.Column(db.Integer, default=10)
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def to_dict(self):
         return {
@@ -31,18 +34,28 @@ class Product(db.Model):
             'stock': self.stock,
             'status': self.get_status(),
             'description': self.description,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
     def get_status(self):
-        if self.stock == 0:
+        return Product.status_for(self.stock, self.low_stock_threshold)
+
+    @staticmethod
+    def status_for(stock, low_stock_threshold):
+        if stock == 0:
             return 'Out of Stock'
-        elif self.stock <= self.low_stock_threshold:
+        elif stock <= low_stock_threshold:
             return 'Low Stock'
         else:
             return 'In Stock'
 
+@event.listens_for(Product.__table__, 'after_create')
+def create_search_index(target, connection, **kw):
+    """Build the full-text search structures whenever the table is created."""
+    from services.product_search_service import install_search_index
+    install_search_index(connection)
+
 class ProductSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Product
@@ -0,0 +1,13 @@
+from extensions import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    """A JWT that was revoked before it expired (e.g. on logout)."""
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
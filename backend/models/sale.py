@@ -1,46 +1,59 @@
 from extensions import db, ma
-from datetime import datetime
+from datetime import datetime, timezone
+import time
 import pytz
 
 # East Africa Time timezone
 EAT = pytz.timezone('Africa/Nairobi')
 
+# EAT has no daylight saving, so one fixed offset converts every timestamp;
+# a plain datetime.timezone is far cheaper per row than pytz
+EAT_OFFSET = timezone(EAT.utcoffset(datetime(2000, 1, 1)), 'EAT')
+
 def get_eat_now():
     """Get current time in East Africa Time"""
     return datetime.now(EAT)
 
+def get_utc_timestamp():
+    """Current time as UTC seconds since the epoch (the stored sale timestamp)"""
+    return int(time.time())
+
+def to_timestamp(value):
+    """Convert a datetime to UTC epoch seconds; naive values are taken as UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def to_eat(timestamp):
+    """Convert a stored sale timestamp (UTC epoch seconds) to East Africa Time"""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, EAT_OFFSET)
+
 class Sale(db.Model):
     __tablename__ = 'sales'
 
     id = db.Column(db.Integer, primary_key=True)
     total_amount = db.Column(db.Float, nullable=False)
     payment_method = db.Column(db.String(20), default='cash')
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=get_eat_now)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    # UTC seconds since the epoch; converted to EAT only when responding
+    created_ts = db.Column(db.BigInteger, default=get_utc_timestamp, nullable=False, index=True)
     
     # Relationships
     items = db.relationship('SaleItem', backref='sale', lazy=True, cascade="all, delete-orphan")
     user = db.relationship('User', backref='sales')
 
     def to_dict(self):
-        # Handle both timezone-aware and naive datetimes
-        created_at_str = None
-        if self.created_at:
-            if self.created_at.tzinfo is None:
-                # Old data: naive datetime (assume UTC), convert to EAT
-                created_at_eat = pytz.utc.localize(self.created_at).astimezone(EAT)
-                created_at_str = created_at_eat.isoformat()
-            else:
-                # New data: already timezone-aware
-                created_at_str = self.created_at.isoformat()
-        
         return {
             'id': self.id,
             'total_amount': self.total_amount,
             'payment_method': self.payment_method,
             'user_name': f"{self.user.first_name} {self.user.last_name}" if self.user else "Unknown",
             'items_count': len(self.items),
-            'created_at': created_at_str,
+            'created_at': to_eat(self.created_ts),  # serialized as ISO 8601 by the JSON provider
             'items': [item.to_dict() for item in self.items]
         }
 
@@ -48,8 +61,8 @@ class SaleItem(db.Model):
     __tablename__ = 'sale_items'
 
     id = db.Column(db.Integer, primary_key=True)
-    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False)
     price_at_sale = db.Column(db.Float, nullable=False)
     
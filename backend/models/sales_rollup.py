@@ -0,0 +1,20 @@
+from extensions import db
+from datetime import datetime
+
+class DailySalesRollup(db.Model):
+    """Pre-aggregated sales totals per business day (EAT)."""
+    __tablename__ = 'daily_sales_rollup'
+
+    date = db.Column(db.Date, primary_key=True)  # Business day in EAT
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    sale_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'revenue': self.revenue,
+            'units': self.units,
+            'sale_count': self.sale_count
+        }
@@ -0,0 +1,50 @@
+from extensions import db
+from models.sale import get_utc_timestamp, to_eat
+
+# Why a product's stock changed
+MOVEMENT_KINDS = ('sale', 'adjustment', 'restock', 'import')
+
+class StockMovement(db.Model):
+    """One append-only change to a product's stock."""
+    __tablename__ = 'stock_movements'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign key: the ledger is kept after its product is deleted
+    product_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)  # Signed: negative for stock leaving
+    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    # UTC seconds since the epoch, like sales.created_ts
+    created_ts = db.Column(db.BigInteger, default=get_utc_timestamp, nullable=False, index=True)
+
+    __table_args__ = (
+        # Per-product history and snapshot replays are range scans on this
+        db.Index('ix_stock_movements_product_created', 'product_id', 'created_ts', 'id'),
+        # Recent restocks for the activity feed
+        db.Index('ix_stock_movements_kind_created', 'kind', 'created_ts'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'product_id': self.product_id,
+            'kind': self.kind,
+            'quantity': self.quantity,
+            'sale_id': self.sale_id,
+            'user_id': self.user_id,
+            'created_at': to_eat(self.created_ts)
+        }
+
+class StockSnapshot(db.Model):
+    """A product's stock including every movement before ``taken_ts``."""
+    __tablename__ = 'stock_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, nullable=False)  # Outlives the product, like stock_movements
+    taken_ts = db.Column(db.BigInteger, nullable=False, index=True)  # UTC epoch seconds
+    stock = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('product_id', 'taken_ts', name='uq_stock_snapshots_product_taken'),
+    )
@@ -0,0 +1,76 @@
+from extensions import db
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Tables whose list endpoints are validated by version (services/http_cache.py)
+VERSIONED_TABLES = ('categories', 'products')
+# Counters bumped explicitly with mark_changed(), not by every write to a table:
+# 'sales_history' moves when totals for a past day change (services/sales_series_service.py)
+EXPLICIT_VERSIONS = ('sales_history',)
+
+_PENDING_KEY = 'table_versions_pending'
+
+class TableVersion(db.Model):
+    """Per-table change counter, bumped by the transaction that changed the table.
+
+    Unlike max(updated_at) or a row count, it moves on every committed write,
+    including deletes and edits within the same second.
+    """
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+def mark_changed(session, name):
+    """Bump the named version when the session's transaction commits."""
+    session.info.setdefault(_PENDING_KEY, set()).add(name)
+
+def _mark(session, table_name):
+    if table_name in VERSIONED_TABLES:
+        mark_changed(session, table_name)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_statement(orm_execute_state):
+    """Note Core/ORM INSERT, UPDATE and DELETE statements run through the session."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        _mark(orm_execute_state.session, getattr(table, 'name', None))
+
+@event.listens_for(Session, 'after_flush')
+def _mark_flush(session, flush_context):
+    """Note tables written by the unit of work."""
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        _mark(session, getattr(instance, '__tablename__', None))
+
+@event.listens_for(Session, 'before_commit')
+def _bump_versions(session):
+    """Bump the noted tables' versions just before commit, so the row lock is held briefly."""
+    session.flush()
+    names = sorted(session.info.pop(_PENDING_KEY, ()))
+    if not names:
+        return
+
+    table = TableVersion.__table__
+    connection = session.connection()
+    result = connection.execute(
+        table.update().where(table.c.name.in_(names)).values(version=table.c.version + 1)
+    )
+    if result.rowcount != len(names):
+        # A row was deleted by hand: recreate it rather than leave the table unversioned
+        existing = set(connection.execute(
+            db.select(table.c.name).where(table.c.name.in_(names))
+        ).scalars())
+        connection.execute(table.insert(), [
+            {'name': name, 'version': 1} for name in names if name not in existing
+        ])
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_versions(session):
+    session.info.pop(_PENDING_KEY, None)
+
+@event.listens_for(TableVersion.__table__, 'after_create')
+def create_version_rows(target, connection, **kw):
+    """Create a row for every version whenever the table is created."""
+    connection.execute(target.insert(), [
+        {'name': name, 'version': 0} for name in VERSIONED_TABLES + EXPLICIT_VERSIONS
+    ])
@@ -1,6 +1,6 @@
 from datetime import datetime
 from extensions import db, ma
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.password_hasher import hash_password, verify_password, password_needs_rehash
 from marshmallow import Schema, fields, validate, validates, ValidationError
 
 
@@ -51,7 +51,7 @@ class User(db.Model):
         Args:
             password (str): Plain text password
         """
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """
@@ -63,7 +63,11 @@ class User(db.Model):
         Returns:
             bool: True if password matches, False otherwise
         """
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Check whether the stored hash uses outdated hashing parameters."""
+        return password_needs_rehash(self.password_hash)
     
     def to_dict(self, include_email=True):
         """
@@ -82,8 +86,8 @@ class User(db.Model):
             'last_name': self.last_name,
             'role': self.role,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
         
         if include_email:
@@ -0,0 +1,50 @@
+from functools import wraps
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from services.user_cache import get_cached_user
+
+admin_bp = Blueprint('admin', __name__)
+
+
+def admin_required(fn):
+    """Require a valid access token belonging to an active admin."""
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        user = get_cached_user(get_jwt_identity())
+        if not user or not user['is_active'] or user['role'] != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """
+    List recorded slow queries, newest first.
+
+    Query Parameters:
+        endpoint (str): Only records issued by this endpoint (e.g. ``inventory.get_stats``)
+        limit (int): Maximum number of records
+    """
+    from services.slow_query_log import get_slow_query_log
+
+    log = get_slow_query_log()
+    records = log.records(
+        endpoint=request.args.get('endpoint'),
+        limit=request.args.get('limit', type=int)
+    )
+    return jsonify({**log.stats(), 'queries': records}), 200
+
+
+@admin_bp.route('/slow-queries', methods=['DELETE'])
+@admin_required
+def clear_slow_queries():
+    """Empty the slow-query buffer and its cached plans."""
+    from services.slow_query_log import get_slow_query_log
+
+    get_slow_query_log().clear()
+    return jsonify({'message': 'Slow query log cleared'}), 200
@@ -8,11 +8,19 @@ from flask_jwt_extended import (
 )
 from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError
+from services.password_hasher import PasswordHashingBusy
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__)
 
 
+def hashing_busy_response(error):
+    """503 response for when the password hashing pool is saturated."""
+    response = jsonify({'error': 'Server is busy', 'message': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -84,6 +92,9 @@ def register():
             'user': user_schema.dump(new_user)
         }), 201
         
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return hashing_busy_response(e)
     except IntegrityError as e:
         db.session.rollback()
         return jsonify({'error': 'Database integrity error', 'message': str(e)}), 400
@@ -111,6 +122,7 @@ def login():
         500: Server error
     """
     # Import inside function to avoid circular imports
+    from extensions import db
     from models.user import User, user_schema, user_login_schema
     
     try:
@@ -140,6 +152,14 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is inactive. Please contact administrator.'}), 403
         
+        # Upgrade hashes made with older parameters while we have the password
+        if user.password_needs_rehash():
+            try:
+                user.set_password(validated_data['password'])
+                db.session.commit()
+            except PasswordHashingBusy:
+                db.session.rollback()  # Try again on a later login
+        
         # Create JWT tokens
         # Include additional claims in the token
         additional_claims = {
@@ -164,6 +184,8 @@ def login():
             'user': user_schema.dump(user)
         }), 200
         
+    except PasswordHashingBusy as e:
+        return hashing_busy_response(e)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -184,29 +206,29 @@ def refresh():
         401: Invalid or expired refresh token
     """
     # Import inside function to avoid circular imports
-    from models.user import User
+    from services.user_cache import get_cached_user
     
     try:
         # Get current user identity from refresh token
         current_user_id = get_jwt_identity()
         
-        # Get user from database to ensure they still exist and are active
-        user = User.query.get(int(current_user_id))
+        # Ensure the user still exists and is active (served from the user cache)
+        user = get_cached_user(current_user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 401
         
-        if not user.is_active:
+        if not user['is_active']:
             return jsonify({'error': 'Account is inactive'}), 403
         
         # Create new access token
         additional_claims = {
-            'role': user.role,
-            'username': user.username
+            'role': user['role'],
+            'username': user['username']
         }
         
         access_token = create_access_token(
-            identity=str(user.id),
+            identity=str(user['id']),
             additional_claims=additional_claims
         )
         
@@ -222,24 +244,49 @@ def refresh():
 @jwt_required()
 def logout():
     """
-    Logout user (invalidate token).
+    Logout user (revoke tokens).
     
-    Note: JWT tokens are stateless. For production, implement token blacklist.
-    This endpoint is here for client-side logout handling.
+    The access token used for this request is revoked. If the refresh token
+    is sent as well, it is revoked too, so it can no longer mint new access
+    tokens.
     
     Headers:
         Authorization: Bearer <access_token>
     
+    Optional JSON:
+        {
+            "refresh_token": "<refresh_token>"
+        }
+    
     Returns:
         200: Logout successful
+        400: Refresh token is invalid or belongs to another user
     """
-    # In production, you would:
-    # 1. Add token to blacklist/revoked tokens list
-    # 2. Store in Redis or database
-    # 3. Check blacklist on each protected request
+    from flask_jwt_extended import decode_token
+    from services.token_blocklist import revoke_token
     
-    # For now, client should remove tokens from storage
-    return jsonify({'message': 'Logout successful. Please remove tokens from client.'}), 200
+    try:
+        access_claims = get_jwt()
+        
+        # Validate the refresh token before revoking anything
+        refresh_claims = None
+        data = request.get_json(silent=True) or {}
+        if data.get('refresh_token'):
+            try:
+                refresh_claims = decode_token(data['refresh_token'])
+            except Exception:
+                return jsonify({'error': 'Invalid refresh token'}), 400
+            if refresh_claims.get('type') != 'refresh' or refresh_claims.get('sub') != access_claims.get('sub'):
+                return jsonify({'error': 'Invalid refresh token'}), 400
+        
+        revoke_token(access_claims)
+        if refresh_claims:
+            revoke_token(refresh_claims)
+        
+        return jsonify({'message': 'Logout successful'}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'An error occurred during logout', 'message': str(e)}), 500
 
 
 @auth_bp.route('/me', methods=['GET'])
@@ -257,23 +304,23 @@ def get_current_user():
         404: User not found
     """
     # Import inside function to avoid circular imports
-    from models.user import User, user_schema
+    from services.user_cache import get_cached_user
     
     try:
         # Get current user ID from JWT
         current_user_id = get_jwt_identity()
         
-        # Get user from database
-        user = User.query.get(int(current_user_id))
+        # Get user (served from the user cache)
+        user = get_cached_user(current_user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        if not user.is_active:
+        if not user['is_active']:
             return jsonify({'error': 'Account is inactive'}), 403
         
         return jsonify({
-            'user': user_schema.dump(user)
+            'user': user
         }), 200
         
     except Exception as e:
@@ -339,6 +386,9 @@ def change_password():
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return hashing_busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'An error occurred', 'message': str(e)}), 500
@@ -2,12 +2,17 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from extensions import db
 from models.category import Category, category_schema, categories_schema
+from models.product import Product
+from services.http_cache import category_list_version, conditional
+from services.read_replicas import use_read_replica
 from sqlalchemy.exc import IntegrityError
 
 category_bp = Blueprint('categories', __name__)
 
 @category_bp.route('/', methods=['GET'])
 @jwt_required()
+@use_read_replica
+@conditional(category_list_version)
 def get_categories():
     categories = Category.query.all()
     return jsonify([c.to_dict() for c in categories]), 200
@@ -60,8 +65,11 @@ def update_category(id):
 def delete_category(id):
     category = Category.query.get_or_404(id)
     
-    # Check if category has products
-    if category.products:
+    # Check if category has products (an indexed probe, not a load of them all)
+    has_products = db.session.query(
+        db.select(Product.id).where(Product.category_id == id).exists()
+    ).scalar()
+    if has_products:
         return jsonify({'error': 'Cannot delete category with associated products'}), 400
     
     try:
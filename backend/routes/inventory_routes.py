@@ -1,17 +1,121 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models.product import Product, product_schema, products_schema
-from sqlalchemy.exc import IntegrityError
+from models.stock_movement import StockMovement
+from services.pagination import (
+    InvalidCursorError, decode_cursor, encode_cursor, get_page_limit, is_paginated_request
+)
+from services.category_counter_service import apply_category_change
+from services.inventory_counter_service import apply_status_change, get_inventory_counts
+from services.product_bulk_update_service import BulkUpdateError, bulk_update_products
+from services.product_import_service import ProductImportAborted, import_products
+from services.product_search_service import search_products
+from services.http_cache import conditional, product_list_version
+from services.read_replicas import use_read_replica
+from services.stock_ledger_service import (
+    kind_for_change, record_closing_stock, record_movement, stock_before
+)
+from services.user_cache import get_cached_user
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import joinedload
+from datetime import datetime
+import csv
+import io
+import json
 
 inventory_bp = Blueprint('inventory', __name__)
 
+JSON_READ_SIZE = 64 * 1024
+
 @inventory_bp.route('/', methods=['GET'])
 @jwt_required()
+@use_read_replica
+@conditional(product_list_version)
 def get_products():
-    products = Product.query.all()
-    # Use to_dict to include the computed status
-    return jsonify([p.to_dict() for p in products]), 200
+    """
+    List products.
+
+    Without paging parameters the full catalog is returned as a plain list
+    (kept for existing clients). Passing ``limit`` and/or ``cursor`` switches to
+    keyset pagination and returns ``{items, next_cursor, has_more}``.
+
+    Query params:
+        category_id: Only products in this category
+        status: 'in_stock', 'low_stock' or 'out_of_stock'
+        order_by: 'id' (ascending, default) or 'updated_at' (newest first)
+        limit: Page size, capped at PAGINATION_MAX_LIMIT
+        cursor: next_cursor value from the previous page
+    """
+    # Load categories in the same query so to_dict() does not lazy-load per row
+    query = Product.query.options(joinedload(Product.category))
+
+    category_id = request.args.get('category_id', type=int)
+    if category_id is not None:
+        query = query.filter(Product.category_id == category_id)
+
+    status = request.args.get('status')
+    if status == 'in_stock':
+        query = query.filter(Product.stock > Product.low_stock_threshold)
+    elif status == 'low_stock':
+        query = query.filter(Product.stock != 0, Product.stock <= Product.low_stock_threshold)
+    elif status == 'out_of_stock':
+        query = query.filter(Product.stock == 0)
+    elif status:
+        return jsonify({'error': f'Unknown status filter: {status}'}), 400
+
+    if not is_paginated_request(request.args):
+        products = query.order_by(Product.id).all()
+        # Use to_dict to include the computed status
+        return jsonify([p.to_dict() for p in products]), 200
+
+    order_by = request.args.get('order_by', 'id')
+    if order_by not in ('id', 'updated_at'):
+        return jsonify({'error': f'Unknown order_by: {order_by}'}), 400
+
+    limit = get_page_limit(request.args)
+    cursor = request.args.get('cursor')
+
+    try:
+        if order_by == 'id':
+            if cursor:
+                last_id, = decode_cursor(cursor, 1)
+                query = query.filter(Product.id > int(last_id))
+            query = query.order_by(Product.id.asc())
+        else:
+            if cursor:
+                last_updated, last_id = decode_cursor(cursor, 2)
+                last_updated = datetime.fromisoformat(last_updated)
+                last_id = int(last_id)
+                # The leading <= bound lets the updated_at index serve the range
+                query = query.filter(
+                    Product.updated_at <= last_updated,
+                    (Product.updated_at < last_updated) |
+                    ((Product.updated_at == last_updated) & (Product.id < last_id))
+                )
+            query = query.order_by(Product.updated_at.desc(), Product.id.desc())
+    except (InvalidCursorError, ValueError, TypeError):
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    # Fetch one extra row to know whether another page exists
+    products = query.limit(limit + 1).all()
+    has_more = len(products) > limit
+    products = products[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = products[-1]
+        if order_by == 'id':
+            next_cursor = encode_cursor([last.id])
+        else:
+            next_cursor = encode_cursor([last.updated_at.isoformat(), last.id])
+
+    return jsonify({
+        'items': [p.to_dict() for p in products],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'limit': limit
+    }), 200
 
 @inventory_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -32,6 +136,10 @@ def add_product():
         )
         
         db.session.add(new_product)
+        db.session.flush()  # Apply column defaults before computing status
+        apply_status_change(None, new_product.get_status())
+        apply_category_change(None, new_product.category_id)
+        record_movement(new_product.id, 'restock', new_product.stock, user_id=int(get_jwt_identity()))
         db.session.commit()
         
         return jsonify(new_product.to_dict()), 201
@@ -43,11 +151,213 @@ def add_product():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@inventory_bp.route('/search', methods=['GET'])
+@jwt_required()
+@use_read_replica
+def search_products_route():
+    """
+    Search products by SKU, name or description.
+
+    SKU prefix matches come first (barcode lookups), then word-prefix matches
+    ranked by relevance, then typo-tolerant matches.
+
+    Query params:
+        q: Search text
+        limit: Maximum results, capped at PAGINATION_MAX_LIMIT
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+
+    try:
+        results = search_products(query, get_page_limit(request.args))
+    except OperationalError:
+        db.session.rollback()
+        return jsonify({'error': 'Search index is not available. Run: flask --app app rebuild-search-index'}), 503
+
+    return jsonify([dict(product.to_dict(), match=match_type) for product, match_type in results]), 200
+
+
+def _iter_json_array(stream):
+    """
+    Yield the elements of a JSON array, or of the "products" array in a
+    top-level object, reading the body JSON_READ_SIZE characters at a time so
+    only the current element is held in memory.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = text.read(JSON_READ_SIZE)
+        buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+        return not eof
+
+    def peek():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return buffer[pos:pos + 1]
+
+    def take(char):
+        nonlocal pos
+        if peek() != char:
+            raise ValueError(f"Invalid JSON: expected '{char}'")
+        pos += 1
+
+    def value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # A value ending at the buffer edge may continue (e.g. a number)
+                if end < len(buffer) or eof:
+                    pos = end
+                    return item
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f'Invalid JSON: {e.msg}')
+            fill()
+
+    if peek() == '{':
+        take('{')
+        while True:
+            if peek() != '"':
+                raise ValueError('Expected a JSON array of products')
+            key = value()
+            take(':')
+            if key == 'products' and peek() == '[':
+                break
+            value()
+            if peek() == ',':
+                take(',')
+    elif peek() != '[':
+        raise ValueError('Expected a JSON array of products')
+
+    take('[')
+    if peek() == ']':
+        return
+    while True:
+        yield value()
+        if peek() != ',':
+            take(']')
+            return
+        take(',')
+
+
+def _iter_import_rows():
+    """
+    Yield product rows from the request body without buffering it all.
+
+    Accepts text/csv, application/x-ndjson, a JSON array (or {"products": [...]})
+    or a multipart upload in a 'file' field (.csv, .ndjson or .json).
+    """
+    content_type = request.mimetype
+    stream = request.stream
+    filename = ''
+
+    if content_type == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            raise ValueError("Multipart uploads must include a 'file' field")
+        stream = upload.stream
+        filename = (upload.filename or '').lower()
+        if filename.endswith('.ndjson') or filename.endswith('.jsonl'):
+            content_type = 'application/x-ndjson'
+        elif filename.endswith('.json'):
+            content_type = 'application/json'
+        else:
+            content_type = 'text/csv'
+
+    if content_type == 'text/csv':
+        return csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+
+    if content_type == 'application/x-ndjson':
+        text = io.TextIOWrapper(stream, encoding='utf-8')
+        return (json.loads(line) for line in text if line.strip())
+
+    if content_type == 'application/json':
+        return _iter_json_array(stream)
+
+    raise ValueError('Unsupported content type. Use text/csv, application/x-ndjson or application/json')
+
+
+@inventory_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_products_route():
+    """
+    Bulk import products.
+
+    Rows are written in chunks with one lookup and one bulk statement per
+    chunk. Invalid rows and duplicate SKUs are reported per row and do not
+    stop the rest of the import. If the body itself cannot be read to the
+    end, the response is a 400 that still reports what was imported before
+    the unreadable row.
+
+    Query params:
+        mode: 'insert' (default, existing SKUs are rejected) or 'upsert'
+            (existing SKUs are updated, but only in the fields their row supplies)
+    """
+    mode = request.args.get('mode', 'insert')
+    if mode not in ('insert', 'upsert'):
+        return jsonify({'error': "mode must be 'insert' or 'upsert'"}), 400
+
+    try:
+        rows = _iter_import_rows()
+        summary = import_products(rows, upsert=(mode == 'upsert'), user_id=int(get_jwt_identity()))
+    except ProductImportAborted as e:
+        # Rows before the unreadable one are already committed; say which
+        db.session.rollback()
+        return jsonify(dict(e.summary, error=str(e))), 400
+    except (ValueError, csv.Error) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify(summary), 200
+
+
+@inventory_bp.route('/bulk', methods=['PATCH'])
+@jwt_required()
+def bulk_update_route():
+    """
+    Update price, stock and/or low_stock_threshold for many products at once.
+
+    Expected JSON:
+        {"updates": [{"id": 1, "price": 9.99}, {"sku": "ABC", "fields": {"stock": 5}}]}
+        (a bare list of entries is also accepted)
+
+    Returns:
+        200: Per-entry results and the products that actually changed
+    """
+    data = request.get_json(silent=True)
+    entries = data.get('updates') if isinstance(data, dict) else data
+
+    try:
+        result = bulk_update_products(entries, user_id=int(get_jwt_identity()))
+    except BulkUpdateError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify(result), 200
+
+
 @inventory_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_product(id):
     product = Product.query.get_or_404(id)
     data = request.get_json()
+    old_status = product.get_status()
+    old_category_id = product.category_id
+    old_stock = product.stock
     
     try:
         product.name = data.get('name', product.name)
@@ -61,6 +371,10 @@ def update_product(id):
             product.stock = int(data['stock'])
         product.description = data.get('description', product.description)
         
+        apply_status_change(old_status, product.get_status())
+        apply_category_change(old_category_id, product.category_id)
+        delta = product.stock - old_stock
+        record_movement(product.id, kind_for_change(delta), delta, user_id=int(get_jwt_identity()))
         db.session.commit()
         return jsonify(product.to_dict()), 200
         
@@ -77,6 +391,9 @@ def delete_product(id):
     product = Product.query.get_or_404(id)
     
     try:
+        apply_status_change(product.get_status(), None)
+        apply_category_change(product.category_id, None)
+        record_closing_stock(product, user_id=int(get_jwt_identity()))
         db.session.delete(product)
         db.session.commit()
         return jsonify({'message': 'Product deleted successfully'}), 200
@@ -84,41 +401,170 @@ def delete_product(id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _parse_as_of(value):
+    """
+    Parse an ``as_of`` query value as UTC epoch seconds.
+
+    A bare date (YYYY-MM-DD) means the last second of that day in EAT; a
+    datetime without an offset is read as EAT.
+    """
+    from models.sale import EAT, to_timestamp
+    try:
+        return to_timestamp(EAT.localize(datetime.strptime(value, '%Y-%m-%d'))) + 86400 - 1
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is None:
+            moment = EAT.localize(moment)
+        return to_timestamp(moment)
+
+@inventory_bp.route('/<int:id>/stock', methods=['GET'])
+@jwt_required()
+@use_read_replica
+def get_stock_as_of(id):
+    """
+    Stock of one product at a point in time.
+
+    Answered from the newest snapshot before ``as_of`` plus the movements
+    after it, not by replaying the product's whole history.
+
+    Query params:
+        as_of: YYYY-MM-DD (end of that day, EAT) or an ISO datetime; default now
+    """
+    from models.sale import get_utc_timestamp, to_eat
+
+    product = db.session.get(Product, id)
+    if product is None:
+        return jsonify({'error': 'Product not found'}), 404
+
+    try:
+        as_of = _parse_as_of(request.args['as_of']) if request.args.get('as_of') else get_utc_timestamp()
+    except ValueError:
+        return jsonify({'error': 'as_of must be YYYY-MM-DD or an ISO datetime'}), 400
+
+    # Include movements stamped in the as_of second itself
+    result = stock_before(id, as_of + 1)
+    return jsonify({
+        'product_id': id,
+        'as_of': to_eat(as_of).isoformat(),
+        'stock': result['stock'],
+        'snapshot_at': to_eat(result['snapshot_ts']).isoformat() if result['snapshot_ts'] is not None else None,
+        'replayed_movements': result['replayed']
+    }), 200
+
+@inventory_bp.route('/<int:id>/stock-movements', methods=['GET'])
+@jwt_required()
+@use_read_replica
+def get_stock_movements(id):
+    """
+    A product's stock movements, oldest first, each with the balance after it.
+
+    The opening balance comes from a snapshot plus a bounded replay; pages
+    then walk the (product_id, created_ts, id) index with keyset pagination.
+
+    Query params:
+        start: Only movements on or after this date (YYYY-MM-DD, EAT)
+        end: Only movements on or before this date (YYYY-MM-DD, EAT)
+        limit: Page size, capped at PAGINATION_MAX_LIMIT
+        cursor: next_cursor value from the previous page
+    """
+    from models.sale import EAT, to_timestamp
+
+    if db.session.get(Product, id) is None:
+        return jsonify({'error': 'Product not found'}), 404
+
+    try:
+        start = end = None
+        if request.args.get('start'):
+            start = to_timestamp(EAT.localize(datetime.strptime(request.args['start'], '%Y-%m-%d')))
+        if request.args.get('end'):
+            end = to_timestamp(EAT.localize(datetime.strptime(request.args['end'], '%Y-%m-%d'))) + 86400
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+
+    query = StockMovement.query.filter(StockMovement.product_id == id)
+    if start is not None:
+        query = query.filter(StockMovement.created_ts >= start)
+    if end is not None:
+        query = query.filter(StockMovement.created_ts < end)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_created, last_id, balance = (int(value) for value in decode_cursor(cursor, 3))
+        except (InvalidCursorError, ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(
+            StockMovement.created_ts >= last_created,
+            (StockMovement.created_ts > last_created) |
+            ((StockMovement.created_ts == last_created) & (StockMovement.id > last_id))
+        )
+        opening_stock = None
+    else:
+        balance = stock_before(id, start)['stock'] if start is not None else 0
+        opening_stock = balance
+
+    limit = get_page_limit(request.args)
+    movements = query.order_by(StockMovement.created_ts, StockMovement.id).limit(limit + 1).all()
+    has_more = len(movements) > limit
+    movements = movements[:limit]
+
+    items = []
+    for movement in movements:
+        balance += movement.quantity
+        item = movement.to_dict()
+        item['stock_after'] = balance
+        items.append(item)
+
+    next_cursor = None
+    if has_more:
+        last = movements[-1]
+        next_cursor = encode_cursor([last.created_ts, last.id, balance])
+
+    return jsonify({
+        'product_id': id,
+        'opening_stock': opening_stock,
+        'items': items,
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'limit': limit
+    }), 200
+
 @inventory_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@use_read_replica
 def get_stats():
-    from models.sale import Sale, SaleItem, get_eat_now
+    from models.sale import get_eat_now
+    from models.sales_rollup import DailySalesRollup
     from datetime import datetime, timedelta
     
-    total_products = Product.query.count()
-    low_stock = Product.query.filter(Product.stock <= Product.low_stock_threshold).count()
-    out_of_stock = Product.query.filter(Product.stock == 0).count()
+    # Status counts come from the incrementally maintained counter row
+    counts = get_inventory_counts()
+    total_products = counts['total']
+    out_of_stock = counts['out_of_stock']
+    # 'low_stock' has always included out-of-stock products (stock <= threshold)
+    low_stock = counts['low_stock'] + out_of_stock
     
     # Calculate real sales statistics using EAT
     now = get_eat_now()
     current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
     
-    # Current month sales
-    current_month_sales = Sale.query.filter(Sale.created_at >= current_month_start).all()
-    current_revenue = sum(float(sale.total_amount) for sale in current_month_sales)
-    
-    # Calculate units sold (sum of all sale item quantities)
-    current_units = db.session.query(db.func.sum(SaleItem.quantity)).join(Sale).filter(
-        Sale.created_at >= current_month_start
-    ).scalar() or 0
-    
-    # Previous month sales
-    prev_month_sales = Sale.query.filter(
-        Sale.created_at >= last_month_start,
-        Sale.created_at < current_month_start
+    # Read at most ~62 pre-aggregated day rows instead of scanning the sales tables
+    rollup_rows = DailySalesRollup.query.filter(
+        DailySalesRollup.date >= last_month_start.date()
     ).all()
-    prev_revenue = sum(float(sale.total_amount) for sale in prev_month_sales)
     
-    prev_units = db.session.query(db.func.sum(SaleItem.quantity)).join(Sale).filter(
-        Sale.created_at >= last_month_start,
-        Sale.created_at < current_month_start
-    ).scalar() or 0
+    current_revenue = 0.0
+    current_units = 0
+    prev_revenue = 0.0
+    prev_units = 0
+    for row in rollup_rows:
+        if row.date >= current_month_start.date():
+            current_revenue += row.revenue
+            current_units += row.units
+        else:
+            prev_revenue += row.revenue
+            prev_units += row.units
     
     # Calculate trends
     revenue_trend = 0
@@ -146,37 +592,46 @@ def get_stats():
 
 @inventory_bp.route('/recent-activity', methods=['GET'])
 @jwt_required()
+@use_read_replica
 def get_recent_activity():
     """Get recent activity including sales and low stock alerts"""
-    from models.sale import Sale, SaleItem, get_eat_now, EAT
-    from datetime import datetime, timedelta
-    import pytz
+    from models.sale import Sale, get_eat_now, get_utc_timestamp, to_eat
     
     activities = []
     
     # Get recent sales (last 10)
-    recent_sales = Sale.query.order_by(Sale.created_at.desc()).limit(10).all()
+    recent_sales = Sale.query.order_by(Sale.created_ts.desc()).limit(10).all()
     for sale in recent_sales:
-        # Handle both timezone-aware and naive datetimes
-        sale_time = sale.created_at
-        if sale_time:
-            # If naive (old data), assume it's UTC and convert to EAT
-            if sale_time.tzinfo is None:
-                sale_time = pytz.utc.localize(sale_time).astimezone(EAT)
-            # If already aware, ensure it's in EAT
-            elif sale_time.tzinfo != EAT:
-                sale_time = sale_time.astimezone(EAT)
+        # Cashier names come from the user cache instead of a lazy load per sale
+        cashier = get_cached_user(sale.user_id)
+        sale_time = to_eat(sale.created_ts)
                 
         activities.append({
             'id': f'sale-{sale.id}',
             'type': 'sale',
-            'message': f'New order #{sale.id} from {sale.user.first_name} {sale.user.last_name[0]}.',
+            'message': f'New order #{sale.id} from {cashier["first_name"]} {cashier["last_name"][0]}.',
             'time': sale_time.isoformat() if sale_time else None,
             'created_at': sale_time
         })
     
-    # Get recent restocks (products updated in last 7 days with stock increase)
-    # For now, we'll skip this as we don't track stock history yet
+    # Get recent restocks (last 7 days) from the stock ledger
+    week_ago = get_utc_timestamp() - 7 * 86400
+    recent_restocks = db.session.execute(
+        db.select(StockMovement.id, StockMovement.quantity, StockMovement.created_ts, Product.name)
+        .join(Product, Product.id == StockMovement.product_id)
+        .where(StockMovement.kind == 'restock', StockMovement.created_ts >= week_ago)
+        .order_by(StockMovement.created_ts.desc())
+        .limit(5)
+    ).all()
+    for restock in recent_restocks:
+        restock_time = to_eat(restock.created_ts)
+        activities.append({
+            'id': f'stock-{restock.id}',
+            'type': 'stock',
+            'message': f'Restocked "{restock.name}" (+{restock.quantity})',
+            'time': restock_time.isoformat(),
+            'created_at': restock_time
+        })
     
     # Get low stock alerts
     low_stock_products = Product.query.filter(
@@ -1,18 +1,119 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models.sale import Sale, SaleItem, sale_schema, sales_schema
+from models.sale import Sale, SaleItem, sale_schema, sales_schema, get_eat_now, to_eat, to_timestamp
 from models.product import Product
 from models.user import User
+from models.category import Category
+from services.inventory_counter_service import apply_status_changes
+from services.sales_rollup_service import record_sale
+from services.stock_ledger_service import record_movements
+from services.read_replicas import use_read_replica
+from services.sales_series_service import (
+    INTERVALS, SalesSeriesError, default_start, get_timezone, sales_series
+)
+from services.pagination import (
+    InvalidCursorError, decode_cursor, encode_cursor, get_page_limit, is_paginated_request
+)
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import datetime
+import csv
+import io
+import json
 
 sale_bp = Blueprint('sales', __name__)
 
+SECONDS_PER_DAY = 86400
+
+
+def _sale_loader_options():
+    """
+    Eager-loading options for serializing sales with Sale.to_dict().
+
+    Users, items and products are each fetched in one batched IN query per
+    page (categories are joined onto the product query), so the number of
+    statements stays constant regardless of how many sales are returned.
+    """
+    return (
+        selectinload(Sale.user),
+        selectinload(Sale.items)
+            .selectinload(SaleItem.product)
+            .joinedload(Product.category),
+    )
+
+
+def _parse_eat_date(value):
+    """Parse a YYYY-MM-DD query value as midnight in EAT, as a stored (UTC epoch) timestamp."""
+    from models.sale import EAT
+    return to_timestamp(EAT.localize(datetime.strptime(value, '%Y-%m-%d')))
+
+
 @sale_bp.route('/', methods=['GET'])
 @jwt_required()
+@use_read_replica
 def get_sales():
-    sales = Sale.query.order_by(Sale.created_at.desc()).all()
-    return jsonify([s.to_dict() for s in sales]), 200
+    """
+    List sales, newest first.
+
+    Without paging parameters every sale is returned as a plain list (kept for
+    existing clients). Passing ``limit`` and/or ``cursor`` switches to keyset
+    pagination on (created_ts, id) and returns ``{items, next_cursor, has_more}``.
+
+    Query params:
+        start: Only sales on or after this date (YYYY-MM-DD, EAT)
+        end: Only sales on or before this date (YYYY-MM-DD, EAT)
+        limit: Page size, capped at PAGINATION_MAX_LIMIT
+        cursor: next_cursor value from the previous page
+    """
+    query = Sale.query.options(*_sale_loader_options())
+
+    try:
+        if request.args.get('start'):
+            query = query.filter(Sale.created_ts >= _parse_eat_date(request.args['start']))
+        if request.args.get('end'):
+            end = _parse_eat_date(request.args['end']) + SECONDS_PER_DAY
+            query = query.filter(Sale.created_ts < end)
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+
+    query = query.order_by(Sale.created_ts.desc(), Sale.id.desc())
+
+    if not is_paginated_request(request.args):
+        sales = query.all()
+        return jsonify([s.to_dict() for s in sales]), 200
+
+    limit = get_page_limit(request.args)
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_created, last_id = decode_cursor(cursor, 2)
+            last_created = int(last_created)
+            last_id = int(last_id)
+        except (InvalidCursorError, ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        # The leading <= bound lets the created_ts index serve the range
+        query = query.filter(
+            Sale.created_ts <= last_created,
+            (Sale.created_ts < last_created) |
+            ((Sale.created_ts == last_created) & (Sale.id < last_id))
+        )
+
+    # Fetch one extra row to know whether another page exists
+    sales = query.limit(limit + 1).all()
+    has_more = len(sales) > limit
+    sales = sales[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = sales[-1]
+        next_cursor = encode_cursor([last.created_ts, last.id])
+
+    return jsonify({
+        'items': [s.to_dict() for s in sales],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'limit': limit
+    }), 200
 
 @sale_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -24,30 +125,65 @@ def create_sale():
         return jsonify({'error': 'No items in sale'}), 400
         
     try:
-        # Calculate total amount and verify stock first
-        total_amount = 0
-        sale_items_data = []
-        
+        # Total quantity per product, so a product listed twice is checked once
+        quantities = {}
         for item in data['items']:
-            product_id = item['product_id']
-            quantity = item['quantity']
-            
-            product = Product.query.get(product_id)
+            product_id = int(item['product_id'])
+            quantity = int(item['quantity'])
+            if quantity <= 0:
+                return jsonify({'error': 'Quantity must be greater than zero'}), 400
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+        # Load every product in the basket with a single query
+        products = {
+            product.id: product
+            for product in Product.query.filter(Product.id.in_(quantities)).all()
+        }
+
+        # Fail fast on what we can see now; the conditional UPDATE below is
+        # what actually guarantees we never oversell.
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
             if not product:
                 return jsonify({'error': f'Product {product_id} not found'}), 404
-                
             if product.stock < quantity:
                 return jsonify({'error': f'Insufficient stock for {product.name}. Available: {product.stock}'}), 400
-                
-            item_total = product.price * quantity
-            total_amount += item_total
-            
+
+        # Calculate total amount
+        total_amount = 0
+        sale_items_data = []
+        for item in data['items']:
+            product = products[int(item['product_id'])]
+            quantity = int(item['quantity'])
+            total_amount += product.price * quantity
             sale_items_data.append({
                 'product': product,
                 'quantity': quantity,
                 'price_at_sale': product.price
             })
 
+        # Decrement stock atomically; any line that lost a race rolls back the sale
+        if not _decrement_stock(quantities):
+            db.session.rollback()
+            # After the rollback we see committed stock again; report the first short line
+            for product in Product.query.filter(Product.id.in_(quantities)).order_by(Product.id).all():
+                if product.stock < quantities[product.id]:
+                    return jsonify({'error': f'Insufficient stock for {product.name}. Available: {product.stock}'}), 409
+            return jsonify({'error': 'Stock changed during checkout, please retry'}), 409
+
+        # Re-read the decremented rows (one query) so the session and the
+        # status counters see the stock values that were actually written
+        updated_products = Product.query.filter(
+            Product.id.in_(quantities)
+        ).populate_existing().all()
+        apply_status_changes(
+            (
+                Product.status_for(product.stock + quantities[product.id], product.low_stock_threshold),
+                product.get_status()
+            )
+            for product in updated_products
+        )
+
         # Create Sale
         new_sale = Sale(
             user_id=current_user_id,
@@ -57,22 +193,28 @@ def create_sale():
         db.session.add(new_sale)
         db.session.flush() # Get ID for new_sale
 
-        # Create Sale Items and Update Stock
+        # Create Sale Items
         for item_data in sale_items_data:
-            product = item_data['product']
-            quantity = item_data['quantity']
-            
-            # Create SaleItem
-            sale_item = SaleItem(
+            db.session.add(SaleItem(
                 sale_id=new_sale.id,
-                product_id=product.id,
-                quantity=quantity,
+                product_id=item_data['product'].id,
+                quantity=item_data['quantity'],
                 price_at_sale=item_data['price_at_sale']
-            )
-            db.session.add(sale_item)
-            
-            # Update Stock
-            product.stock -= quantity
+            ))
+
+        # Ledger the stock that left, stamped with the sale's own time
+        record_movements(
+            {'product_id': product_id, 'kind': 'sale', 'quantity': -quantity,
+             'sale_id': new_sale.id, 'user_id': current_user_id, 'created_ts': new_sale.created_ts}
+            for product_id, quantity in quantities.items()
+        )
+
+        # Keep the daily rollup in step with the sale, in the same transaction
+        record_sale(
+            to_eat(new_sale.created_ts).date(),
+            total_amount,
+            sum(quantities.values())
+        )
             
         db.session.commit()
         return jsonify(new_sale.to_dict()), 201
@@ -81,10 +223,216 @@ def create_sale():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+
+def _decrement_stock(quantities):
+    """
+    Subtract sold quantities with ``UPDATE ... SET stock = stock - :q
+    WHERE id = :id AND stock >= :q``.
+
+    The stock check happens inside the UPDATE, so concurrent checkouts cannot
+    both take the last unit. Rows are updated in id order to keep lock
+    acquisition consistent across tills. The caller must roll back when this
+    returns False, since earlier lines may already have been decremented.
+
+    Args:
+        quantities (dict): product_id -> quantity to subtract
+
+    Returns:
+        bool: True if every line was decremented
+    """
+    products = Product.__table__
+    stmt = (
+        products.update()
+        .where(products.c.id == db.bindparam('b_id'))
+        .where(products.c.stock >= db.bindparam('b_qty'))
+        .values(stock=products.c.stock - db.bindparam('b_qty'))
+    )
+    params = [{'b_id': product_id, 'b_qty': quantities[product_id]} for product_id in sorted(quantities)]
+
+    if db.session.get_bind().dialect.supports_sane_multi_rowcount:
+        # One executemany for the whole basket
+        return db.session.execute(stmt, params).rowcount == len(params)
+
+    for param in params:
+        if db.session.execute(stmt, param).rowcount != 1:
+            return False
+    return True
+
+
+EXPORT_COLUMNS = [
+    'sale_id', 'created_at', 'payment_method', 'cashier', 'sale_total',
+    'item_id', 'product_id', 'sku', 'product_name', 'category',
+    'quantity', 'price_at_sale', 'subtotal'
+]
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_rows(start=None, end=None):
+    """
+    Yield one flat dict per sale item, oldest sale first.
+
+    Uses a Core select with ``yield_per`` so rows are pulled from a server-side
+    cursor in batches and no ORM objects are built.
+    """
+    stmt = (
+        db.select(
+            Sale.id.label('sale_id'),
+            Sale.created_ts,
+            Sale.payment_method,
+            Sale.total_amount,
+            User.first_name,
+            User.last_name,
+            SaleItem.id.label('item_id'),
+            SaleItem.product_id,
+            SaleItem.quantity,
+            SaleItem.price_at_sale,
+            Product.sku,
+            Product.name.label('product_name'),
+            Category.name.label('category_name'),
+        )
+        .join(SaleItem, SaleItem.sale_id == Sale.id)
+        .outerjoin(User, User.id == Sale.user_id)
+        .outerjoin(Product, Product.id == SaleItem.product_id)
+        .outerjoin(Category, Category.id == Product.category_id)
+        .order_by(Sale.id, SaleItem.id)
+    )
+    if start is not None:
+        stmt = stmt.where(Sale.created_ts >= start)
+    if end is not None:
+        stmt = stmt.where(Sale.created_ts < end)
+
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for row in result:
+        created_at = to_eat(row.created_ts)
+        yield {
+            'sale_id': row.sale_id,
+            'created_at': created_at.isoformat() if created_at else None,
+            'payment_method': row.payment_method,
+            'cashier': f"{row.first_name or ''} {row.last_name or ''}".strip() or 'Unknown',
+            'sale_total': row.total_amount,
+            'item_id': row.item_id,
+            'product_id': row.product_id,
+            'sku': row.sku,
+            'product_name': row.product_name or 'Unknown Product',
+            'category': row.category_name,
+            'quantity': row.quantity,
+            'price_at_sale': row.price_at_sale,
+            'subtotal': row.quantity * row.price_at_sale
+        }
+
+
+def _stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _stream_ndjson(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(row))
+        if len(chunk) == EXPORT_BATCH_SIZE:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+
+@sale_bp.route('/export', methods=['GET'])
+@jwt_required()
+@use_read_replica
+def export_sales():
+    """
+    Stream sales history as one row per sale item.
+
+    The response body is generated while rows are read from the database, so
+    memory use stays flat no matter how long the export period is.
+
+    Query params:
+        format: 'csv' (default) or 'ndjson'
+        start: Only sales on or after this date (YYYY-MM-DD, EAT)
+        end: Only sales on or before this date (YYYY-MM-DD, EAT)
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': "format must be 'csv' or 'ndjson'"}), 400
+
+    try:
+        start = _parse_eat_date(request.args['start']) if request.args.get('start') else None
+        end = None
+        if request.args.get('end'):
+            end = _parse_eat_date(request.args['end']) + SECONDS_PER_DAY
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+
+    rows = _export_rows(start, end)
+    filename = f"sales_export_{get_eat_now().strftime('%Y%m%d_%H%M%S')}"
+    if export_format == 'csv':
+        body, mimetype, filename = _stream_csv(rows), 'text/csv', filename + '.csv'
+    else:
+        body, mimetype, filename = _stream_ndjson(rows), 'application/x-ndjson', filename + '.ndjson'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@sale_bp.route('/series', methods=['GET'])
+@jwt_required()
+@use_read_replica
+def get_sales_series():
+    """
+    Revenue, units and order counts per time bucket, for charts.
+
+    Query params:
+        interval: hour, day (default), week or month, in the shop's timezone
+        start: First day to cover (YYYY-MM-DD); defaults to today (hour),
+            30 days (day), 12 weeks (week) or 12 months (month) back
+        end: Last day to cover (YYYY-MM-DD), default today
+
+    Returns:
+        200: {interval, timezone, start, end, buckets: [{period, revenue, units, orders}]}
+    """
+    interval = request.args.get('interval', 'day')
+    if interval not in INTERVALS:
+        return jsonify({'error': f"interval must be one of: {', '.join(INTERVALS)}"}), 400
+
+    tz = get_timezone()
+    try:
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() \
+            if request.args.get('end') else datetime.now(tz).date()
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() \
+            if request.args.get('start') else default_start(interval, end)
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+
+    try:
+        buckets = sales_series(interval, start, end)
+    except SalesSeriesError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'interval': interval,
+        'timezone': tz.zone,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'buckets': buckets
+    }), 200
+
 @sale_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
+@use_read_replica
 def get_sale(id):
-    sale = Sale.query.get_or_404(id)
+    sale = Sale.query.options(*_sale_loader_options()).filter_by(id=id).first_or_404()
     return jsonify(sale.to_dict()), 200
 
 @sale_bp.route('/generate-sample-data', methods=['POST'])
@@ -104,6 +452,8 @@ def generate_sample_data():
         if not products:
             return jsonify({'error': 'No products available. Please add products first.'}), 400
         
+        old_statuses = {product.id: product.get_status() for product in products}
+        
         import random
         from datetime import timedelta
         import pytz
@@ -152,12 +502,13 @@ def generate_sample_data():
                 user_id=current_user_id,
                 total_amount=total_amount,
                 payment_method=random.choice(payment_methods),
-                created_at=sale_date
+                created_ts=to_timestamp(sale_date)
             )
             db.session.add(new_sale)
             db.session.flush()
             
             # Create Sale Items and Update Stock
+            movements = []
             for item_data in sale_items_data:
                 product = item_data['product']
                 quantity = item_data['quantity']
@@ -172,9 +523,23 @@ def generate_sample_data():
                 
                 # Update Stock
                 product.stock -= quantity
+                movements.append({
+                    'product_id': product.id, 'kind': 'sale', 'quantity': -quantity,
+                    'sale_id': new_sale.id, 'user_id': current_user_id
+                })
+            # Stamped now, when the stock actually changes: backdating them
+            # could slip movements behind snapshots that are already taken
+            record_movements(movements)
+
+            record_sale(
+                sale_date.date(),
+                total_amount,
+                sum(item_data['quantity'] for item_data in sale_items_data)
+            )
             
             sales_created += 1
         
+        apply_status_changes((old_statuses[product.id], product.get_status()) for product in products)
         db.session.commit()
         return jsonify({
             'message': 'Sample sales data generated successfully',
@@ -0,0 +1,96 @@
+"""
+Incrementally maintained product counts per category.
+
+The category list shows how many products each category holds. Counting
+them per request (or loading ``category.products``) grows with the catalog,
+so every write that adds, removes or moves a product adjusts
+``categories.product_count`` in the same transaction instead.
+"""
+from extensions import db
+from models.category import Category
+from models.product import Product
+
+
+def apply_category_change(old_category_id, new_category_id, count=1):
+    """
+    Move ``count`` products from one category to another.
+
+    Pass ``old_category_id=None`` for new products and ``new_category_id=None``
+    for deleted ones (uncategorised products are not counted anywhere).
+    Nothing is committed here; the caller's transaction covers both the
+    product write and the counter update.
+
+    Args:
+        old_category_id (int): Category before the change
+        new_category_id (int): Category after the change
+        count (int): Number of products moving between the two categories
+    """
+    if old_category_id == new_category_id or count == 0:
+        return
+
+    # Core UPDATEs so categories.updated_at moves too, which keeps the
+    # category list's ETag in step with the counts it shows
+    table = Category.__table__
+    if old_category_id is not None:
+        db.session.execute(
+            table.update().where(table.c.id == old_category_id)
+            .values(product_count=table.c.product_count - count)
+        )
+    if new_category_id is not None:
+        db.session.execute(
+            table.update().where(table.c.id == new_category_id)
+            .values(product_count=table.c.product_count + count)
+        )
+
+
+def apply_category_changes(changes):
+    """
+    Apply a batch of (old_category_id, new_category_id) pairs with one UPDATE
+    per affected category.
+
+    Args:
+        changes (iterable): (old_category_id, new_category_id) tuples
+    """
+    deltas = {}
+    for old_category_id, new_category_id in changes:
+        if old_category_id == new_category_id:
+            continue
+        if old_category_id is not None:
+            deltas[old_category_id] = deltas.get(old_category_id, 0) - 1
+        if new_category_id is not None:
+            deltas[new_category_id] = deltas.get(new_category_id, 0) + 1
+
+    for category_id, delta in deltas.items():
+        if delta > 0:
+            apply_category_change(None, category_id, delta)
+        elif delta < 0:
+            apply_category_change(category_id, None, -delta)
+
+
+def reconcile_category_counts(commit=True):
+    """
+    Recompute every category's product_count from the products table.
+
+    Only categories whose stored count is wrong are written, so their
+    ``updated_at`` (and the category list ETag) only moves when a count
+    actually changes.
+
+    Args:
+        commit (bool): Commit the session after writing the counts
+
+    Returns:
+        int: Number of categories whose count was corrected
+    """
+    table = Category.__table__
+    actual = (
+        db.select(db.func.count(Product.id))
+        .where(Product.category_id == table.c.id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        table.update().where(table.c.product_count != actual).values(product_count=actual)
+    )
+
+    if commit:
+        db.session.commit()
+    return result.rowcount
@@ -0,0 +1,345 @@
+"""
+Deterministic generator for production-sized demo and load-test databases.
+
+Everything is written with Core bulk inserts in fixed-size batches, so a year
+of trading (roughly a million sales) takes minutes rather than the hours the
+row-at-a-time ORM path would need. The same seed and end date always produce
+the same database.
+
+The distributions aim to look like a real shop rather than uniform noise:
+
+* product popularity follows a Zipf curve, so a few SKUs dominate sales;
+* sales happen in EAT business hours with lunch and evening peaks, busier
+  weekends and month-end/December bumps;
+* basket sizes and quantities are skewed towards one or two items;
+* mobile money is the most common payment method.
+
+Every sale line is also written to the stock ledger, on top of an opening
+balance per product, with a stock snapshot at each EAT midnight, so the
+ledger adds up to the seeded ``products.stock``.
+"""
+import bisect
+import itertools
+import math
+import random
+from datetime import datetime, time, timedelta
+
+from extensions import db
+from models.category import Category
+from models.product import Product
+from models.sale import EAT, Sale, SaleItem, to_timestamp
+from models.stock_movement import StockMovement
+from models.user import User
+
+SEED_PASSWORD = 'password123'
+
+CATALOGUE = {
+    'Electronics': (['Wireless', 'Smart', 'Portable', 'USB-C', 'Bluetooth', 'HD'],
+                    ['Headphones', 'Charger', 'Speaker', 'Power Bank', 'Mouse', 'Keyboard', 'Cable'], 60.0),
+    'Clothing': (['Cotton', 'Denim', 'Linen', 'Slim Fit', 'Kids', 'Classic'],
+                 ['T-Shirt', 'Jeans', 'Shirt', 'Dress', 'Jacket', 'Socks', 'Kikoi'], 25.0),
+    'Groceries': (['Premium', 'Organic', 'Family Pack', 'Fresh', 'Whole', 'Local'],
+                  ['Rice', 'Maize Flour', 'Sugar', 'Cooking Oil', 'Tea Leaves', 'Milk', 'Beans'], 4.0),
+    'Household': (['Heavy Duty', 'Scented', 'Eco', 'Compact', 'Large', 'Value'],
+                  ['Detergent', 'Soap', 'Bucket', 'Broom', 'Jerrycan', 'Candles', 'Matches'], 6.0),
+    'Stationery': (['A4', 'Ruled', 'Blue', 'Spiral', 'Student', 'Office'],
+                   ['Notebook', 'Pen', 'Pencil', 'Ruler', 'Folder', 'Exercise Book', 'Marker'], 2.0),
+    'Beauty': (['Herbal', 'Shea', 'Aloe', 'Unscented', 'Travel', 'Deluxe'],
+               ['Lotion', 'Shampoo', 'Hair Oil', 'Petroleum Jelly', 'Toothpaste', 'Deodorant', 'Comb'], 5.0),
+    'Toys': (['Wooden', 'Plastic', 'Mini', 'Deluxe', 'Educational', 'Classic'],
+             ['Ball', 'Puzzle', 'Board Game', 'Doll', 'Car', 'Blocks', 'Kite'], 12.0),
+    'Books': (['Illustrated', 'Revised', 'Pocket', 'Hardcover', 'Primary', 'Secondary'],
+              ['Atlas', 'Dictionary', 'Novel', 'Cookbook', 'Workbook', 'Storybook', 'Bible'], 15.0),
+}
+
+# Share of a day's sales that fall in each EAT hour (shop open 08:00-21:00)
+HOUR_WEIGHTS = {
+    8: 3, 9: 5, 10: 7, 11: 9, 12: 12, 13: 12, 14: 8,
+    15: 7, 16: 8, 17: 11, 18: 13, 19: 10, 20: 5,
+}
+WEEKDAY_FACTORS = [0.9, 0.85, 0.9, 0.95, 1.1, 1.35, 0.8]  # Monday..Sunday
+BASKET_SIZES = ([1, 2, 3, 4, 5, 6], [45, 27, 14, 8, 4, 2])
+QUANTITIES = ([1, 2, 3, 4, 5], [70, 18, 7, 3, 2])
+PAYMENT_METHODS = (['mobile', 'cash', 'card'], [55, 30, 15])
+ZIPF_EXPONENT = 1.07
+
+
+def _cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+
+def _day_factor(day):
+    """Relative trading volume for ``day`` (weekday, month-end and December effects)."""
+    factor = WEEKDAY_FACTORS[day.weekday()]
+    if day.day >= 25 or day.day <= 2:
+        factor *= 1.15  # payday
+    if day.month == 12:
+        factor *= 1.4
+    elif day.month == 1:
+        factor *= 0.85
+    return factor
+
+
+def seed_dataset(users=25, categories=8, products=5000, days=365, sales_per_day=2500,
+                 seed=42, end_date=None, batch_size=5000, progress=None):
+    """
+    Generate users, categories, products, sales, sale items and stock
+    movements in bulk.
+
+    The ``products`` and ``sales`` tables must be empty and the database must
+    not have been seeded before; existing users and categories are kept.
+
+    Args:
+        users (int): Staff accounts to create (the first is an admin)
+        categories (int): Number of categories
+        products (int): Number of products
+        days (int): Days of sales history ending on ``end_date``
+        sales_per_day (int): Average sales per business day
+        seed (int): Random seed; the same seed and end date give the same data
+        end_date (date): Last day of history in EAT (defaults to today)
+        batch_size (int): Sales per insert batch
+        progress (callable): Optional ``progress(day, sales_so_far)`` callback
+
+    Returns:
+        dict: Row counts per table
+
+    Raises:
+        ValueError: If products, sales or seeded accounts already exist
+    """
+    if (db.session.query(Product.id).first() is not None
+            or db.session.query(Sale.id).first() is not None
+            or User.query.filter_by(username='seed_admin').first() is not None):
+        raise ValueError('Products, sales or seeded users already exist; seed an empty database')
+
+    rng = random.Random(seed)
+    end_date = end_date or datetime.now(EAT).date()
+    start_date = end_date - timedelta(days=days - 1)
+    history_start = datetime.combine(start_date, time()) - timedelta(days=30)
+
+    user_ids = _seed_users(users)
+    category_ids = _seed_categories(categories)
+    catalogue = _seed_products(rng, category_ids, products, history_start)
+
+    # Zipf popularity over a shuffled ranking so best sellers are spread across categories
+    ranking = list(range(len(catalogue)))
+    rng.shuffle(ranking)
+    popularity = [0.0] * len(catalogue)
+    for rank, index in enumerate(ranking, start=1):
+        popularity[index] = 1.0 / rank ** ZIPF_EXPONENT
+    product_cum = _cumulative(popularity)
+    product_total = product_cum[-1]
+
+    # Cashiers do most of the selling; the admin rings up the odd sale
+    cashier_cum = _cumulative([1] + [8] * (len(user_ids) - 1))
+    hours, hour_weights = zip(*HOUR_WEIGHTS.items())
+    hour_cum = _cumulative(hour_weights)
+    basket_cum = _cumulative(BASKET_SIZES[1])
+    quantity_cum = _cumulative(QUANTITIES[1])
+    payment_cum = _cumulative(PAYMENT_METHODS[1])
+
+    sale_table = Sale.__table__
+    item_table = SaleItem.__table__
+    movement_table = StockMovement.__table__
+    sale_rows, item_rows, movement_rows = [], [], []
+    sale_id = 0
+    item_count = 0
+    units_sold = {}
+
+    def flush():
+        if sale_rows:
+            db.session.execute(sale_table.insert(), sale_rows)
+            db.session.execute(item_table.insert(), item_rows)
+            db.session.execute(movement_table.insert(), movement_rows)
+            db.session.commit()
+            sale_rows.clear()
+            item_rows.clear()
+            movement_rows.clear()
+
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        expected = sales_per_day * _day_factor(day)
+        count = max(0, int(rng.gauss(expected, math.sqrt(expected))))
+
+        # Sort the day's timestamps so sale ids increase with time, as they do live
+        moments = sorted(
+            timedelta(hours=rng.choices(hours, cum_weights=hour_cum)[0],
+                      seconds=rng.randrange(3600))
+            for _ in range(count)
+        )
+        day_start = EAT.localize(datetime.combine(day, time()))
+        for moment in moments:
+            sale_id += 1
+            created_ts = to_timestamp(day_start + moment)
+            user_id = user_ids[bisect.bisect_left(cashier_cum, rng.random() * cashier_cum[-1])]
+            basket = rng.choices(BASKET_SIZES[0], cum_weights=basket_cum)[0]
+            chosen = set()
+            while len(chosen) < min(basket, len(catalogue)):
+                chosen.add(min(bisect.bisect_left(product_cum, rng.random() * product_total), len(catalogue) - 1))
+
+            total = 0.0
+            for index in sorted(chosen):
+                product_id, price = catalogue[index]
+                quantity = rng.choices(QUANTITIES[0], cum_weights=quantity_cum)[0]
+                total += price * quantity
+                item_rows.append({'sale_id': sale_id, 'product_id': product_id,
+                                  'quantity': quantity, 'price_at_sale': price})
+                movement_rows.append({'product_id': product_id, 'kind': 'sale', 'quantity': -quantity,
+                                      'sale_id': sale_id, 'user_id': user_id, 'created_ts': created_ts})
+                units_sold[product_id] = units_sold.get(product_id, 0) + quantity
+            item_count += len(chosen)
+
+            sale_rows.append({
+                'id': sale_id,
+                'total_amount': round(total, 2),
+                'payment_method': rng.choices(PAYMENT_METHODS[0], cum_weights=payment_cum)[0],
+                'user_id': user_id,
+                'created_ts': created_ts,
+            })
+            if len(sale_rows) >= batch_size:
+                flush()
+
+        if progress:
+            progress(day, sale_id)
+
+    flush()
+    movement_count = item_count + _seed_stock_history(
+        units_sold, to_timestamp(EAT.localize(history_start)), start_date, days
+    )
+    _finish()
+
+    return {
+        'users': len(user_ids),
+        'categories': len(category_ids),
+        'products': len(catalogue),
+        'sales': sale_id,
+        'sale_items': item_count,
+        'stock_movements': movement_count,
+    }
+
+
+def _seed_users(count):
+    """Create one admin and ``count - 1`` staff accounts sharing one password hash."""
+    admin = User(username='seed_admin', email='seed_admin@example.com',
+                 first_name='Seed', last_name='Admin', role='admin')
+    admin.set_password(SEED_PASSWORD)
+    db.session.add(admin)
+    db.session.flush()
+
+    rows = [
+        {'username': f'seed_cashier{i}', 'email': f'seed_cashier{i}@example.com',
+         'first_name': 'Cashier', 'last_name': str(i), 'role': 'staff',
+         'is_active': True, 'password_hash': admin.password_hash}
+        for i in range(1, count)
+    ]
+    if rows:
+        db.session.execute(User.__table__.insert(), rows)
+    staff_ids = db.session.execute(
+        db.select(User.id).where(User.username.like('seed_cashier%')).order_by(User.id)
+    ).scalars().all()
+    db.session.commit()
+    return [admin.id] + list(staff_ids)
+
+
+def _seed_categories(count):
+    names = list(CATALOGUE)
+    rows = []
+    for i in range(count):
+        base = names[i % len(names)]
+        name = base if i < len(names) else f'{base} {i // len(names) + 1}'
+        rows.append({'name': f'Seed {name}', 'description': f'Generated {base.lower()} category'})
+    db.session.execute(Category.__table__.insert(), rows)
+    category_ids = db.session.execute(
+        db.select(Category.id).where(Category.name.like('Seed %')).order_by(Category.id)
+    ).scalars().all()
+    db.session.commit()
+    return list(category_ids)
+
+
+def _seed_products(rng, category_ids, count, created_at):
+    """Insert products and return ``[(id, price)]`` in insertion order."""
+    names = list(CATALOGUE)
+    table = Product.__table__
+    catalogue = []
+    for start in range(0, count, 5000):
+        rows = []
+        for i in range(start, min(start + 5000, count)):
+            slot = rng.randrange(len(category_ids))
+            adjectives, nouns, median_price = CATALOGUE[names[slot % len(names)]]
+            price = round(max(0.5, rng.lognormvariate(math.log(median_price), 0.6)), 2)
+            threshold = rng.choice([5, 10, 10, 15, 20, 25])
+            # Most shelves are stocked, a tail is running low or empty
+            roll = rng.random()
+            if roll < 0.04:
+                stock = 0
+            elif roll < 0.15:
+                stock = rng.randint(1, threshold)
+            else:
+                stock = rng.randint(threshold + 1, threshold * 20)
+            rows.append({
+                'name': f'{rng.choice(adjectives)} {rng.choice(nouns)} {i + 1}',
+                'sku': f'SEED{i + 1:07d}',
+                'category_id': category_ids[slot],
+                'price': price,
+                'stock': stock,
+                'low_stock_threshold': threshold,
+                'description': f'Generated product {i + 1}',
+                'created_at': created_at,
+                'updated_at': created_at,
+            })
+        db.session.execute(table.insert(), rows)
+        catalogue.extend((row['price'], row['sku']) for row in rows)
+
+    ids = dict(db.session.execute(db.select(Product.sku, Product.id)).all())
+    db.session.commit()
+    return [(ids[sku], price) for price, sku in catalogue]
+
+
+def _seed_stock_history(units_sold, opening_ts, start_date, days):
+    """
+    Give each product an opening balance of its seeded stock plus everything
+    it went on to sell, then snapshot the ledger at every EAT midnight that
+    has already passed. Returns the number of opening movements.
+    """
+    from models.sale import get_utc_timestamp
+    from services.stock_ledger_service import SNAPSHOT_SETTLE_SECONDS, take_stock_snapshots
+
+    stock = dict(db.session.execute(db.select(Product.id, Product.stock)).all())
+    rows = [
+        {'product_id': product_id, 'kind': 'adjustment', 'quantity': stock[product_id] + sold,
+         'sale_id': None, 'user_id': None, 'created_ts': opening_ts}
+        for product_id, sold in units_sold.items()
+    ]
+    rows.extend(
+        {'product_id': product_id, 'kind': 'adjustment', 'quantity': quantity,
+         'sale_id': None, 'user_id': None, 'created_ts': opening_ts}
+        for product_id, quantity in stock.items()
+        if product_id not in units_sold and quantity
+    )
+    for start in range(0, len(rows), 5000):
+        db.session.execute(StockMovement.__table__.insert(), rows[start:start + 5000])
+    db.session.commit()
+
+    # Later midnights are left to ``flask snapshot-stock``: a snapshot in the
+    # future would miss live movements written before it comes round
+    settled = get_utc_timestamp() - SNAPSHOT_SETTLE_SECONDS
+    for offset in range(1, days + 1):
+        midnight = to_timestamp(EAT.localize(datetime.combine(start_date + timedelta(days=offset), time())))
+        if midnight > settled:
+            break
+        take_stock_snapshots(at_ts=midnight)
+    return len(rows)
+
+
+def _finish():
+    """Rebuild the derived tables and refresh planner statistics."""
+    from services.category_counter_service import reconcile_category_counts
+    from services.inventory_counter_service import reconcile_inventory_counters
+    from services.sales_rollup_service import rebuild_daily_rollup
+
+    rebuild_daily_rollup()
+    reconcile_inventory_counters()
+    reconcile_category_counts()
+
+    if db.session.get_bind().dialect.name == 'sqlite':
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
@@ -0,0 +1,51 @@
+"""
+Per-backend database engine tuning.
+
+``Config`` carries one profile per backend: ``SQLITE_PRAGMAS`` applied to
+every new SQLite connection, and ``MYSQL_ENGINE_OPTIONS`` (pool sizing,
+recycling, pre-ping) passed to ``create_engine`` when the URI is MySQL.
+Any explicit ``SQLALCHEMY_ENGINE_OPTIONS`` still take precedence.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from extensions import db
+
+
+def engine_options_for(app, uri):
+    """``create_engine`` keyword arguments for ``uri`` under the app's profiles."""
+    options = {}
+    if make_url(uri).get_backend_name() == 'mysql':
+        options.update(app.config.get('MYSQL_ENGINE_OPTIONS') or {})
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+
+def apply_engine_options(app):
+    """Merge the backend's pool options into SQLALCHEMY_ENGINE_OPTIONS. Call before ``db.init_app``."""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_for(app, app.config['SQLALCHEMY_DATABASE_URI'])
+
+
+def install_sqlite_pragmas(app, engine=None, read_only=False):
+    """
+    Run SQLITE_PRAGMAS on every new connection of the app's (or the given) SQLite engine.
+
+    ``read_only`` adds ``query_only`` so a replica copy can never be written to.
+    """
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    if read_only:
+        pragmas['query_only'] = 'ON'
+    if engine is None:
+        with app.app_context():
+            engine = db.engine
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,170 @@
+"""
+Incrementally maintained product counts per stock status.
+
+Low-stock checks compare two columns (``stock <= low_stock_threshold``), so no
+index can answer them and every COUNT is a full scan of ``products``. Instead,
+each write that can move a product between statuses adjusts a single counter
+row in the same transaction, and the dashboard reads that row.
+"""
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from extensions import db
+from models.inventory_counter import InventoryCounter
+from models.product import Product
+
+COUNTER_ROW_ID = 1
+
+# Product.get_status() value -> counter column
+STATUS_COLUMNS = {
+    'In Stock': 'in_stock',
+    'Low Stock': 'low_stock',
+    'Out of Stock': 'out_of_stock'
+}
+
+
+def apply_status_change(old_status, new_status, count=1):
+    """
+    Move ``count`` products from one status bucket to another.
+
+    Pass ``old_status=None`` for new products and ``new_status=None`` for
+    deleted ones. Nothing is committed here; the caller's transaction covers
+    both the product write and the counter update.
+
+    Args:
+        old_status (str): Status before the change, as returned by get_status()
+        new_status (str): Status after the change
+        count (int): Number of products moving between the two buckets
+    """
+    if old_status == new_status or count == 0:
+        return
+
+    table = InventoryCounter.__table__
+    values = {'updated_at': datetime.utcnow()}
+    if old_status is not None:
+        column = STATUS_COLUMNS[old_status]
+        values[column] = table.c[column] - count
+    if new_status is not None:
+        column = STATUS_COLUMNS[new_status]
+        values[column] = table.c[column] + count
+
+    result = db.session.execute(
+        table.update().where(table.c.id == COUNTER_ROW_ID).values(**values)
+    )
+    # The row is created with its table (and by migration), so a miss means
+    # it was deleted: better to fail the write than to drop the change
+    if result.rowcount == 0:
+        raise RuntimeError(
+            'Inventory counter row is missing; run `flask reconcile-inventory-counters`'
+        )
+
+
+def apply_status_changes(changes):
+    """
+    Apply a batch of (old_status, new_status) pairs with one UPDATE per
+    distinct transition.
+
+    Args:
+        changes (iterable): (old_status, new_status) tuples
+    """
+    transitions = {}
+    for old_status, new_status in changes:
+        if old_status != new_status:
+            key = (old_status, new_status)
+            transitions[key] = transitions.get(key, 0) + 1
+
+    for (old_status, new_status), count in transitions.items():
+        apply_status_change(old_status, new_status, count)
+
+
+def _status_counts_query():
+    """SELECT of (out_of_stock, low_stock, total) over the products table."""
+    out_of_stock = Product.stock == 0
+    low_stock = db.and_(Product.stock != 0, Product.stock <= Product.low_stock_threshold)
+    return db.select(
+        db.func.coalesce(db.func.sum(db.case((out_of_stock, 1), else_=0)), 0),
+        db.func.coalesce(db.func.sum(db.case((low_stock, 1), else_=0)), 0),
+        db.func.count(Product.id)
+    )
+
+
+def install_counter_row(connection):
+    """
+    Create the counter row on a freshly created inventory_counters table,
+    counted from the products table when that already exists.
+
+    Args:
+        connection: Connection the table was created on
+    """
+    out_of_stock = low_stock = total = 0
+    if sa.inspect(connection).has_table(Product.__tablename__):
+        out_of_stock, low_stock, total = connection.execute(_status_counts_query()).one()
+
+    connection.execute(InventoryCounter.__table__.insert().values(
+        id=COUNTER_ROW_ID,
+        in_stock=int(total) - int(out_of_stock) - int(low_stock),
+        low_stock=int(low_stock),
+        out_of_stock=int(out_of_stock),
+        updated_at=datetime.utcnow()
+    ))
+
+
+def reconcile_inventory_counters(commit=True):
+    """
+    Recompute the counters from the products table in one conditional
+    aggregate query and overwrite the stored row.
+
+    Args:
+        commit (bool): Commit the session after writing the row
+
+    Returns:
+        InventoryCounter: The refreshed counter row
+    """
+    counts = db.session.execute(_status_counts_query()).one()
+
+    counter = db.session.get(InventoryCounter, COUNTER_ROW_ID)
+    if counter is None:
+        counter = InventoryCounter(id=COUNTER_ROW_ID)
+        db.session.add(counter)
+
+    counter.out_of_stock = int(counts[0])
+    counter.low_stock = int(counts[1])
+    counter.in_stock = int(counts[2]) - counter.out_of_stock - counter.low_stock
+    counter.updated_at = datetime.utcnow()
+
+    if commit:
+        db.session.commit()
+    return counter
+
+
+def get_inventory_counts():
+    """
+    Return the current counters.
+
+    Never writes: the stats view runs on a read replica. If the row is
+    missing (it is created with its table, so only after a manual delete),
+    the counts are computed from the products table instead; run
+    ``flask reconcile-inventory-counters`` on the primary to restore it.
+
+    Returns:
+        dict: total, in_stock, low_stock and out_of_stock product counts
+    """
+    counter = db.session.get(InventoryCounter, COUNTER_ROW_ID)
+    if counter is None:
+        out_of_stock, low_stock, total = (
+            int(count) for count in db.session.execute(_status_counts_query()).one()
+        )
+        return {
+            'total': total,
+            'in_stock': total - out_of_stock - low_stock,
+            'low_stock': low_stock,
+            'out_of_stock': out_of_stock
+        }
+
+    return {
+        'total': counter.total,
+        'in_stock': counter.in_stock,
+        'low_stock': counter.low_stock,
+        'out_of_stock': counter.out_of_stock
+    }
@@ -0,0 +1,73 @@
+"""
+JSON providers for ``app.json``.
+
+List endpoints serialize thousands of ``to_dict()`` rows per response, so
+encoding is a large share of their CPU time. ``OrjsonProvider`` encodes with
+orjson (Rust, several times faster than the stdlib) and writes the response
+body as bytes directly. Without orjson installed, ``StdlibJSONProvider`` is
+used. Both emit datetimes and dates as ISO 8601, so models can hand datetime
+objects to ``jsonify`` instead of calling ``isoformat()`` per row.
+
+Select with ``JSON_PROVIDER`` = ``'auto'`` (orjson if importable),
+``'orjson'`` or ``'stdlib'``.
+"""
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider, but with ISO 8601 datetimes instead of HTTP dates."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):  # includes datetime
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """Encode and decode with orjson; falls back to the stdlib for unusual arguments."""
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        # Flask internals (e.g. the session serializer) may pass json.dumps options
+        if kwargs.keys() - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options(bool(kwargs.get('indent')))).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(
+            obj, default=self.default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the provider selected by ``JSON_PROVIDER`` on ``app.json``."""
+    choice = app.config.get('JSON_PROVIDER', 'auto')
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+    if choice in ('auto', 'orjson') and orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = StdlibJSONProvider(app)
@@ -0,0 +1,221 @@
+"""
+Request and database instrumentation exposed in Prometheus text format.
+
+Every request records its latency, status code and the number of SQL
+statements it issued, labelled by blueprint, endpoint and method. An
+in-flight gauge tracks concurrent requests and the engine's connection pool
+reports how long callers waited to check out a connection. ``render()``
+produces the text served on ``/api/metrics``.
+
+The collectors are deliberately small (no client library dependency) and
+keep everything in process memory, so each worker exposes its own series;
+Prometheus aggregates across instances.
+"""
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+from services.read_replicas import get_replica_engines
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._series = {}  # labels -> [bucket counts..., sum]
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-1] += value
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.label_names, labels)} {_format_number(series[-1])}')
+            lines.append(f'{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}')
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values."""
+
+    def __init__(self, name, documentation, label_names, kind='counter'):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.kind = kind
+        self._series = {}
+
+    def inc(self, labels, amount=1):
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in sorted(self._series.items()):
+            lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}')
+        return lines
+
+
+class RequestMetrics:
+    """Collects request and database metrics for one app."""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Request latency in seconds.',
+            ('blueprint', 'endpoint', 'method'), LATENCY_BUCKETS
+        )
+        self.requests = Counter(
+            'http_requests_total', 'Requests by response status.',
+            ('blueprint', 'endpoint', 'method', 'status')
+        )
+        self.in_flight = Counter(
+            'http_requests_in_flight', 'Requests currently being handled.', (), kind='gauge'
+        )
+        self.statements = Histogram(
+            'http_request_sql_statements', 'SQL statements executed per request.',
+            ('blueprint', 'endpoint', 'method'), STATEMENT_BUCKETS
+        )
+        self.pool_wait = Histogram(
+            'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled database connection.',
+            (), POOL_WAIT_BUCKETS
+        )
+        self.in_flight.inc((), 0)
+        self._pool = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+        with app.app_context():
+            engine = db.engine
+            replicas = get_replica_engines()
+        for counted in [engine] + replicas:
+            event.listen(counted, 'before_cursor_execute', self._count_statement)
+        event.listen(engine, 'engine_disposed', lambda engine: self._instrument_pool(engine.pool))
+        self._instrument_pool(engine.pool)
+        app.extensions['metrics'] = self
+
+    def _instrument_pool(self, pool):
+        """Time ``pool.connect()`` so checkout waits under contention are visible."""
+        self._pool = pool
+        connect = pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                waited = time.perf_counter() - started
+                with self._lock:
+                    self.pool_wait.observe((), waited)
+
+        pool.connect = timed_connect
+
+    @staticmethod
+    def _labels():
+        endpoint = request.endpoint or '<unmatched>'
+        return (request.blueprint or '', endpoint, request.method)
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_statements = 0
+        with self._lock:
+            self.in_flight.inc((), 1)
+
+    def _after_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            duration = time.perf_counter() - started
+            labels = self._labels()
+            with self._lock:
+                self.request_duration.observe(labels, duration)
+                self.statements.observe(labels, g.get('metrics_statements', 0))
+                self.requests.inc(labels + (str(response.status_code),))
+        return response
+
+    def _teardown_request(self, error=None):
+        if g.pop('metrics_statements', None) is not None:
+            with self._lock:
+                self.in_flight.inc((), -1)
+
+    def _count_statement(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'metrics_statements' in g:
+            g.metrics_statements += 1
+
+    def render(self):
+        """Return all series in Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+            for metric in (self.request_duration, self.requests, self.in_flight, self.statements, self.pool_wait):
+                lines.extend(metric.collect())
+
+        pool = self._pool
+        if pool is not None and hasattr(pool, 'checkedout'):
+            lines += [
+                '# HELP db_pool_checked_out_connections Connections currently checked out of the pool.',
+                '# TYPE db_pool_checked_out_connections gauge',
+                f'db_pool_checked_out_connections {pool.checkedout()}',
+            ]
+
+        cache = current_app.extensions.get('user_cache')
+        if cache is not None:
+            stats = cache.stats()
+            lines += [
+                '# HELP user_cache_lookups_total User cache lookups by result.',
+                '# TYPE user_cache_lookups_total counter',
+                f'user_cache_lookups_total{{result="hit"}} {stats["hits"]}',
+                f'user_cache_lookups_total{{result="miss"}} {stats["misses"]}',
+                '# HELP user_cache_entries Users currently cached.',
+                '# TYPE user_cache_entries gauge',
+                f'user_cache_entries {stats["size"]}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+def get_request_metrics():
+    return current_app.extensions['metrics']
@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination helpers shared by the list endpoints.
+
+Cursors are opaque, URL-safe strings that encode the sort key of the last
+row on a page. The next page is fetched with a ``WHERE key > cursor`` style
+filter instead of ``OFFSET``, so every page costs the same no matter how deep
+the client has scrolled.
+"""
+import base64
+import json
+
+from flask import current_app
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client supplies a cursor we did not issue."""
+
+
+def encode_cursor(values):
+    """
+    Encode the sort key of the last row on a page.
+
+    Args:
+        values (list): JSON-serializable key values (e.g. ``[updated_at, id]``)
+
+    Returns:
+        str: Opaque cursor string
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor (str): Cursor string from the request
+        length (int): Number of key values the caller expects
+
+    Returns:
+        list: Decoded key values
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise InvalidCursorError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursorError('Invalid cursor')
+    return values
+
+
+def get_page_limit(args):
+    """
+    Read the ``limit`` query parameter, clamped to the configured maximum.
+
+    Args:
+        args: Request query arguments
+
+    Returns:
+        int: Page size to use
+    """
+    default = current_app.config['PAGINATION_DEFAULT_LIMIT']
+    maximum = current_app.config['PAGINATION_MAX_LIMIT']
+    limit = args.get('limit', default, type=int)
+    return max(1, min(limit, maximum))
+
+
+def is_paginated_request(args):
+    """Return True when the client opted into the paginated response shape."""
+    return 'limit' in args or 'cursor' in args
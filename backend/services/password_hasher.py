@@ -0,0 +1,112 @@
+"""
+Bounded, offloaded password hashing.
+
+scrypt/pbkdf2 are deliberately slow. Running them directly on request threads
+means a burst of logins (e.g. shift change) can occupy every worker and stall
+unrelated requests such as POS checkouts. Hashing is instead run on a small
+dedicated thread pool (hashlib releases the GIL while hashing). The calling
+request thread still waits for its hash, so waiting is kept short: by default
+nothing queues, and once every worker is busy callers get
+``PasswordHashingBusy`` immediately and the API answers 503 with Retry-After.
+A hash that has not started by the timeout is cancelled rather than left to
+run for a caller that has gone.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from flask import current_app, has_app_context
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+)
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool cannot accept more work."""
+
+
+def normalize_hash_method(method):
+    """Expand a werkzeug method name to the prefix it writes into hashes."""
+    parts = method.split(':')
+    if parts[0] == 'scrypt':
+        defaults = ['scrypt', '32768', '8', '1']
+    elif parts[0] == 'pbkdf2':
+        defaults = ['pbkdf2', 'sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    return ':'.join(parts + defaults[len(parts):])
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded worker pool for one app."""
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._slots = None
+        self.method = 'scrypt'
+        self.timeout = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        workers = app.config['PASSWORD_HASH_WORKERS']
+        queue_limit = app.config['PASSWORD_HASH_QUEUE_LIMIT']
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT_SECONDS']
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        # Running plus queued jobs; anything beyond is rejected immediately
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        app.extensions['password_hasher'] = self
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy('Password hashing is at capacity, please retry shortly')
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHashingBusy('Password hashing timed out, please retry shortly')
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with different method/parameters than configured."""
+        return password_hash.split('$', 1)[0] != normalize_hash_method(self.method)
+
+
+def _get_hasher():
+    if has_app_context():
+        return current_app.extensions.get('password_hasher')
+    return None
+
+
+def hash_password(password):
+    """Hash a password on the pool (or inline when no app is running)."""
+    hasher = _get_hasher()
+    if hasher is None:
+        return generate_password_hash(password)
+    return hasher.hash(password)
+
+
+def verify_password(password_hash, password):
+    """Check a password on the pool (or inline when no app is running)."""
+    hasher = _get_hasher()
+    if hasher is None:
+        return check_password_hash(password_hash, password)
+    return hasher.verify(password_hash, password)
+
+
+def password_needs_rehash(password_hash):
+    """True if the stored hash should be upgraded to the configured parameters."""
+    hasher = _get_hasher()
+    return hasher is not None and hasher.needs_rehash(password_hash)
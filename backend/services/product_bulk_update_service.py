@@ -0,0 +1,172 @@
+"""
+Set-based bulk updates of product price, stock and low-stock threshold.
+
+All target rows are read (and locked) with one query, entries are diffed
+against the current values, and the real changes are written as one executemany UPDATE
+per distinct set of changed fields, all in a single transaction.
+"""
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models.product import Product
+from services.inventory_counter_service import apply_status_changes
+from services.stock_ledger_service import kind_for_change, record_movements
+
+BULK_UPDATE_FIELDS = {
+    'price': float,
+    'stock': int,
+    'low_stock_threshold': int
+}
+BULK_UPDATE_MAX_ENTRIES = 5000
+
+
+class BulkUpdateError(ValueError):
+    """Raised when the request as a whole cannot be processed."""
+
+
+def _parse_entry(entry):
+    """Return (key_field, key_value, {field: value}) or raise ValueError."""
+    if not isinstance(entry, dict):
+        raise ValueError('Entry must be an object')
+
+    if entry.get('id') is not None:
+        try:
+            key = ('id', int(entry['id']))
+        except (TypeError, ValueError):
+            raise ValueError('id must be a number')
+    elif entry.get('sku'):
+        key = ('sku', str(entry['sku']))
+    else:
+        raise ValueError('Each entry needs an id or a sku')
+
+    # Accept fields either inline or under "fields"
+    source = entry.get('fields', entry)
+    if not isinstance(source, dict):
+        raise ValueError('fields must be an object')
+
+    fields = {}
+    for name, cast in BULK_UPDATE_FIELDS.items():
+        if name in source:
+            try:
+                fields[name] = cast(source[name])
+            except (TypeError, ValueError):
+                raise ValueError(f'{name} must be a number')
+            if fields[name] < 0:
+                raise ValueError(f'{name} cannot be negative')
+    if not fields:
+        raise ValueError('Nothing to update; expected one of: ' + ', '.join(BULK_UPDATE_FIELDS))
+
+    return key[0], key[1], fields
+
+
+def bulk_update_products(entries, user_id=None):
+    """
+    Apply many product updates in one transaction.
+
+    Args:
+        entries (list): Dicts with ``id`` or ``sku`` plus any of price, stock
+            and low_stock_threshold (inline or under ``fields``)
+        user_id (int): User recorded on the resulting stock movements
+
+    Returns:
+        dict: ``results`` (one per entry, in input order) and ``products``
+        (serialized rows that actually changed)
+
+    Raises:
+        BulkUpdateError: If the payload is not a list or is too large
+    """
+    if not isinstance(entries, list):
+        raise BulkUpdateError('Expected a list of updates')
+    if len(entries) > BULK_UPDATE_MAX_ENTRIES:
+        raise BulkUpdateError(f'At most {BULK_UPDATE_MAX_ENTRIES} updates per request')
+
+    results = [None] * len(entries)
+    parsed = []
+    for index, entry in enumerate(entries):
+        try:
+            parsed.append((index,) + _parse_entry(entry))
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+
+    # Load and lock every targeted product in one query: the stock written
+    # is absolute, so a sale committing before the UPDATE would be lost and
+    # the counter and ledger deltas below would no longer match
+    ids = [value for _, key, value, _ in parsed if key == 'id']
+    skus = [value for _, key, value, _ in parsed if key == 'sku']
+    products = Product.__table__
+    columns = [products.c.id, products.c.sku] + [products.c[name] for name in BULK_UPDATE_FIELDS]
+    current_rows = {}
+    if ids or skus:
+        for row in db.session.execute(
+            db.select(*columns)
+            .where(db.or_(products.c.id.in_(ids), products.c.sku.in_(skus)))
+            .with_for_update()
+        ):
+            current_rows[('id', row.id)] = row
+            current_rows[('sku', row.sku)] = row
+
+    # Diff against current values; the last entry for a product wins
+    pending = {}
+    for index, key, value, fields in parsed:
+        row = current_rows.get((key, value))
+        if row is None:
+            results[index] = {'index': index, key: value, 'status': 'error', 'error': 'Product not found'}
+            continue
+        item = pending.setdefault(row.id, {'row': row, 'fields': {}, 'entries': []})
+        item['fields'].update(fields)
+        item['entries'].append((index, fields))
+        results[index] = {'index': index, 'id': row.id, 'sku': row.sku, 'status': 'unchanged'}
+
+    # Group real changes by the set of fields they touch: one executemany each
+    groups = {}
+    status_changes = []
+    movements = []
+    for product_id, item in pending.items():
+        row = item['row']
+        changes = {name: new for name, new in item['fields'].items() if getattr(row, name) != new}
+        if not changes:
+            continue
+        groups.setdefault(tuple(sorted(changes)), []).append(dict(b_id=product_id, **{f'b_{k}': v for k, v in changes.items()}))
+        # Only entries that asked for a different value count as updates
+        for index, fields in item['entries']:
+            if any(getattr(row, name) != new for name, new in fields.items()):
+                results[index]['status'] = 'updated'
+
+        stock = changes.get('stock', row.stock)
+        if stock != row.stock:
+            delta = stock - row.stock
+            movements.append({
+                'product_id': product_id, 'kind': kind_for_change(delta),
+                'quantity': delta, 'user_id': user_id
+            })
+        threshold = changes.get('low_stock_threshold', row.low_stock_threshold)
+        status_changes.append((
+            Product.status_for(row.stock, row.low_stock_threshold),
+            Product.status_for(stock, threshold)
+        ))
+
+    for field_names, params in groups.items():
+        db.session.execute(
+            products.update()
+            .where(products.c.id == db.bindparam('b_id'))
+            .values(**{name: db.bindparam(f'b_{name}') for name in field_names}),
+            params
+        )
+    apply_status_changes(status_changes)
+    record_movements(movements)
+    db.session.commit()
+
+    changed_ids = [params['b_id'] for group in groups.values() for params in group]
+    changed = []
+    if changed_ids:
+        changed = (
+            Product.query.options(joinedload(Product.category))
+            .filter(Product.id.in_(changed_ids))
+            .order_by(Product.id)
+            .all()
+        )
+
+    return {
+        'results': results,
+        'products': [product.to_dict() for product in changed]
+    }
@@ -0,0 +1,313 @@
+"""
+Bulk product import.
+
+Rows are validated and written in fixed-size chunks: one SKU lookup, one
+multi-row INSERT and (in upsert mode) one executemany UPDATE per set of
+columns supplied, each chunk committed on its own. An upsert only overwrites
+the columns a row actually supplies; defaults apply to inserted rows only. Bad rows are reported individually and never
+abort the rest of the import. An upload that cannot be read to the end stops
+at the unreadable row, with everything before it kept and reported.
+"""
+import csv
+from itertools import islice
+
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.category import Category
+from models.product import Product
+from services.category_counter_service import apply_category_changes
+from services.inventory_counter_service import apply_status_changes
+from services.stock_ledger_service import record_movements
+
+IMPORT_CHUNK_SIZE = 500
+DEFAULT_LOW_STOCK_THRESHOLD = 10
+
+# Values for optional columns a row leaves out, used when inserting it
+INSERT_DEFAULTS = {
+    'category_id': None,
+    'stock': 0,
+    'low_stock_threshold': DEFAULT_LOW_STOCK_THRESHOLD,
+    'description': ''
+}
+
+
+class ProductImportError(ValueError):
+    """Raised for a row that cannot be imported."""
+
+
+class ProductImportAborted(ValueError):
+    """Raised when the upload cannot be read to the end; earlier chunks are committed."""
+
+    def __init__(self, message, summary):
+        super().__init__(message)
+        self.summary = summary
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _load_category_ids():
+    """Map lower-cased category names and ids to ids with a single query."""
+    by_name = {}
+    ids = set()
+    for category_id, name in db.session.execute(db.select(Category.id, Category.name)):
+        by_name[name.strip().lower()] = category_id
+        ids.add(category_id)
+    return by_name, ids
+
+
+def _clean_row(raw, categories_by_name, category_ids):
+    """
+    Validate one input row and convert it to column values.
+
+    Only the columns the row supplies (non-empty) are returned; name, sku
+    and price are always present. See INSERT_DEFAULTS for the rest.
+
+    Raises:
+        ProductImportError: If a field is missing or invalid
+    """
+    def value(key):
+        item = raw.get(key)
+        if isinstance(item, str):
+            item = item.strip()
+        return None if item in (None, '') else item
+
+    name = value('name')
+    sku = value('sku')
+    if not name:
+        raise ProductImportError('name is required')
+    if not sku:
+        raise ProductImportError('sku is required')
+    if value('price') is None:
+        raise ProductImportError('price is required')
+
+    cleaned = {'name': str(name), 'sku': str(sku)}
+    try:
+        cleaned['price'] = float(value('price'))
+        if value('stock') is not None:
+            cleaned['stock'] = int(value('stock'))
+        if value('low_stock_threshold') is not None:
+            cleaned['low_stock_threshold'] = int(value('low_stock_threshold'))
+    except (TypeError, ValueError):
+        raise ProductImportError('price, stock and low_stock_threshold must be numbers')
+
+    if any(cleaned.get(key, 0) < 0 for key in ('price', 'stock', 'low_stock_threshold')):
+        raise ProductImportError('price, stock and low_stock_threshold cannot be negative')
+
+    if value('category_id') is not None:
+        try:
+            category_id = int(value('category_id'))
+        except (TypeError, ValueError):
+            raise ProductImportError('category_id must be a number')
+        if category_id not in category_ids:
+            raise ProductImportError(f'Unknown category_id {category_id}')
+        cleaned['category_id'] = category_id
+    elif value('category') is not None:
+        category_name = str(value('category'))
+        category_id = categories_by_name.get(category_name.lower())
+        if category_id is None:
+            raise ProductImportError(f'Unknown category "{category_name}"')
+        cleaned['category_id'] = category_id
+
+    if value('description') is not None:
+        cleaned['description'] = str(value('description'))
+    return cleaned
+
+
+def import_products(rows, upsert=False, chunk_size=IMPORT_CHUNK_SIZE, user_id=None):
+    """
+    Import products from an iterable of dicts.
+
+    Args:
+        rows (iterable): Dicts with name, sku, price, stock and optional
+            category / category_id, low_stock_threshold, description
+        upsert (bool): Update products whose SKU already exists instead of
+            rejecting those rows
+        chunk_size (int): Rows written per bulk statement
+        user_id (int): User recorded on the resulting stock movements
+
+    Returns:
+        dict: inserted/updated/failed counts and per-row errors
+
+    Raises:
+        ProductImportAborted: If ``rows`` raises part-way (malformed CSV or
+            JSON); carries the summary of the rows imported before it
+    """
+    categories_by_name, category_ids = _load_category_ids()
+    summary = {'inserted': 0, 'updated': 0, 'failed': 0, 'errors': []}
+    seen_skus = set()
+
+    def reject(row_number, sku, message):
+        summary['failed'] += 1
+        summary['errors'].append({'row': row_number, 'sku': sku, 'error': message})
+
+    read_errors = []
+
+    def numbered_rows():
+        # Stop at an unreadable row but let the rows before it be written
+        iterator = iter(rows)
+        row_number = 1
+        while True:
+            try:
+                raw = next(iterator)
+            except StopIteration:
+                return
+            except (ValueError, csv.Error) as e:
+                read_errors.append(f'Row {row_number}: {e}')
+                return
+            yield row_number, raw
+            row_number += 1
+
+    for chunk in _chunks(numbered_rows(), chunk_size):
+        valid = []
+        for row_number, raw in chunk:
+            try:
+                if not isinstance(raw, dict):
+                    raise ProductImportError('Row must be an object')
+                cleaned = _clean_row(raw, categories_by_name, category_ids)
+            except ProductImportError as e:
+                reject(row_number, raw.get('sku') if isinstance(raw, dict) else None, str(e))
+                continue
+            if cleaned['sku'] in seen_skus:
+                reject(row_number, cleaned['sku'], 'Duplicate SKU in upload')
+                continue
+            seen_skus.add(cleaned['sku'])
+            valid.append((row_number, cleaned))
+
+        if valid:
+            _write_chunk(valid, upsert, summary, reject, user_id)
+
+    summary['errors'].sort(key=lambda error: error['row'])
+    if read_errors:
+        raise ProductImportAborted(read_errors[0], summary)
+    return summary
+
+
+def _write_chunk(valid, upsert, summary, reject, user_id=None):
+    """Insert/update one chunk of validated rows and commit it."""
+    existing = _lookup_existing([cleaned['sku'] for _, cleaned in valid], lock=upsert)
+
+    to_insert = []
+    to_update = []
+    for row_number, cleaned in valid:
+        current = existing.get(cleaned['sku'])
+        if current is None:
+            to_insert.append((row_number, cleaned))
+        elif upsert:
+            to_update.append((row_number, cleaned, current))
+        else:
+            reject(row_number, cleaned['sku'], 'SKU already exists')
+
+    try:
+        _bulk_write(to_insert, to_update, user_id)
+        db.session.commit()
+        summary['inserted'] += len(to_insert)
+        summary['updated'] += len(to_update)
+    except IntegrityError:
+        # Most likely a SKU inserted concurrently; retry row by row so only
+        # the offending rows are rejected.
+        db.session.rollback()
+        for row_number, cleaned in to_insert:
+            try:
+                _bulk_write([(row_number, cleaned)], [], user_id)
+                db.session.commit()
+                summary['inserted'] += 1
+            except IntegrityError:
+                db.session.rollback()
+                reject(row_number, cleaned['sku'], 'SKU already exists')
+        for row_number, cleaned, _ in to_update:
+            try:
+                # The rollback released the lock; read the row again under one
+                current = _lookup_existing([cleaned['sku']], lock=True).get(cleaned['sku'])
+                if current is None:
+                    db.session.rollback()
+                    reject(row_number, cleaned['sku'], 'Product was deleted during the import')
+                    continue
+                _bulk_write([], [(row_number, cleaned, current)], user_id)
+                db.session.commit()
+                summary['updated'] += 1
+            except IntegrityError:
+                db.session.rollback()
+                reject(row_number, cleaned['sku'], 'Update rejected by the database')
+
+
+def _lookup_existing(skus, lock=False):
+    """
+    Map SKU -> current row (id, category_id, stock, low_stock_threshold).
+
+    Pass ``lock=True`` before updating the rows: the counter and ledger
+    deltas are computed from these values, so a concurrent sale must not
+    change them before the UPDATE lands.
+    """
+    products = Product.__table__
+    lookup = db.select(
+        products.c.id, products.c.sku, products.c.category_id,
+        products.c.stock, products.c.low_stock_threshold
+    ).where(products.c.sku.in_(skus))
+    if lock:
+        lookup = lookup.with_for_update()
+    return {row.sku: row for row in db.session.execute(lookup)}
+
+
+def _bulk_write(to_insert, to_update, user_id=None):
+    """Issue the INSERT/UPDATE statements for a chunk without committing."""
+    products = Product.__table__
+    status_changes = []
+    category_changes = []
+    movements = []
+
+    if to_insert:
+        inserted = [{**INSERT_DEFAULTS, **cleaned} for _, cleaned in to_insert]
+        db.session.execute(products.insert(), inserted)
+        status_changes.extend(
+            (None, Product.status_for(row['stock'], row['low_stock_threshold'])) for row in inserted
+        )
+        category_changes.extend((None, row['category_id']) for row in inserted)
+        # Bulk INSERTs do not return ids; read them back by SKU for the ledger
+        inserted_ids = dict(db.session.execute(
+            db.select(products.c.sku, products.c.id)
+            .where(products.c.sku.in_([row['sku'] for row in inserted]))
+        ).all())
+        movements.extend(
+            {'product_id': inserted_ids[row['sku']], 'kind': 'import',
+             'quantity': row['stock'], 'user_id': user_id}
+            for row in inserted
+        )
+
+    # Rows supplying the same columns share one executemany UPDATE
+    by_columns = {}
+    for _, cleaned, current in to_update:
+        columns = tuple(sorted(key for key in cleaned if key != 'sku'))
+        by_columns.setdefault(columns, []).append((cleaned, current))
+
+    for columns, group in by_columns.items():
+        db.session.execute(
+            products.update()
+            .where(products.c.id == db.bindparam('b_id'))
+            .values(**{column: db.bindparam(f'b_{column}') for column in columns}),
+            [
+                {'b_id': current.id, **{f'b_{column}': cleaned[column] for column in columns}}
+                for cleaned, current in group
+            ]
+        )
+
+    for _, cleaned, current in to_update:
+        stock = cleaned.get('stock', current.stock)
+        status_changes.append((
+            Product.status_for(current.stock, current.low_stock_threshold),
+            Product.status_for(stock, cleaned.get('low_stock_threshold', current.low_stock_threshold))
+        ))
+        category_changes.append((current.category_id, cleaned.get('category_id', current.category_id)))
+        movements.append({'product_id': current.id, 'kind': 'import',
+                          'quantity': stock - current.stock, 'user_id': user_id})
+
+    apply_status_changes(status_changes)
+    apply_category_changes(category_changes)
+    record_movements(movements)
@@ -0,0 +1,242 @@
+"""
+Indexed product search.
+
+SQLite keeps two FTS5 tables in sync with ``products`` through triggers:
+``products_fts`` (word tokens with prefix indexes) for name/SKU/description
+prefix search, and ``products_fts_trigram`` for typo-tolerant matching. MySQL
+uses a FULLTEXT index on the same columns, which the server maintains itself.
+Because syncing happens in the database, every write path (ORM, bulk import,
+raw SQL) keeps the index current.
+"""
+import difflib
+import re
+
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models.product import Product
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, sku, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts_trigram USING fts5(
+        name, sku,
+        content='products', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, sku, description)
+            VALUES (new.id, new.name, new.sku, new.description);
+        INSERT INTO products_fts_trigram(rowid, name, sku)
+            VALUES (new.id, new.name, new.sku);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, sku, description)
+            VALUES ('delete', old.id, old.name, old.sku, old.description);
+        INSERT INTO products_fts_trigram(products_fts_trigram, rowid, name, sku)
+            VALUES ('delete', old.id, old.name, old.sku);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, sku, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, sku, description)
+            VALUES ('delete', old.id, old.name, old.sku, old.description);
+        INSERT INTO products_fts_trigram(products_fts_trigram, rowid, name, sku)
+            VALUES ('delete', old.id, old.name, old.sku);
+        INSERT INTO products_fts(rowid, name, sku, description)
+            VALUES (new.id, new.name, new.sku, new.description);
+        INSERT INTO products_fts_trigram(rowid, name, sku)
+            VALUES (new.id, new.name, new.sku);
+    END
+    """
+]
+
+MYSQL_FULLTEXT_INDEX = 'ft_products_search'
+
+# Candidates pulled from the trigram index before re-ranking in Python
+FUZZY_CANDIDATES = 50
+FUZZY_MIN_SIMILARITY = 0.6
+
+
+def install_search_index(connection):
+    """
+    Create the search index structures for the connection's backend.
+
+    Safe to call repeatedly. Used both when the products table is created and
+    by the ``rebuild-search-index`` CLI command for existing databases.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+    elif dialect == 'mysql':
+        exists = connection.exec_driver_sql(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'products' AND index_name = %s",
+            (MYSQL_FULLTEXT_INDEX,)
+        ).scalar()
+        if not exists:
+            connection.exec_driver_sql(
+                f'ALTER TABLE products ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (name, sku, description)'
+            )
+
+
+def rebuild_search_index():
+    """Create the index if needed and repopulate it from the products table."""
+    connection = db.session.connection()
+    install_search_index(connection)
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql("INSERT INTO products_fts_trigram(products_fts_trigram) VALUES ('rebuild')")
+    db.session.commit()
+
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def _sku_prefix_ids(query, limit):
+    """SKU exact/prefix matches as a range scan on the unique SKU index."""
+    ids = []
+    for prefix in dict.fromkeys([query, query.upper()]):
+        rows = db.session.execute(
+            db.select(Product.id)
+            .where(Product.sku >= prefix, Product.sku < prefix + '\U0010ffff')
+            .order_by(Product.sku)
+            .limit(limit)
+        ).scalars()
+        ids.extend(rows)
+    return ids
+
+
+def _sqlite_text_ids(terms, limit):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    return db.session.execute(
+        db.text(
+            "SELECT rowid FROM products_fts WHERE products_fts MATCH :match "
+            "ORDER BY bm25(products_fts, 10.0, 5.0, 1.0) LIMIT :limit"
+        ),
+        {'match': match, 'limit': limit}
+    ).scalars().all()
+
+
+def _sqlite_fuzzy_ids(terms, limit):
+    trigrams = {term[i:i + 3] for term in terms if len(term) >= 3 for i in range(len(term) - 2)}
+    if not trigrams:
+        return []
+    match = ' OR '.join(f'"{trigram}"' for trigram in sorted(trigrams))
+    candidates = db.session.execute(
+        db.text(
+            "SELECT rowid, name FROM products_fts_trigram WHERE products_fts_trigram MATCH :match "
+            "ORDER BY rank LIMIT :limit"
+        ),
+        {'match': match, 'limit': FUZZY_CANDIDATES}
+    ).all()
+    return _rerank_fuzzy(terms, candidates, limit)
+
+
+def _mysql_text_ids(terms, limit):
+    against = ' '.join(f'+{term}*' for term in terms)
+    return db.session.execute(
+        db.text(
+            "SELECT id FROM products WHERE MATCH(name, sku, description) AGAINST (:q IN BOOLEAN MODE) "
+            "ORDER BY MATCH(name, sku, description) AGAINST (:q IN BOOLEAN MODE) DESC LIMIT :limit"
+        ),
+        {'q': against, 'limit': limit}
+    ).scalars().all()
+
+
+def _mysql_fuzzy_ids(terms, limit):
+    candidates = db.session.execute(
+        db.text(
+            "SELECT id, name FROM products WHERE MATCH(name, sku, description) "
+            "AGAINST (:q IN NATURAL LANGUAGE MODE) LIMIT :limit"
+        ),
+        {'q': ' '.join(terms), 'limit': FUZZY_CANDIDATES}
+    ).all()
+    return _rerank_fuzzy(terms, candidates, limit)
+
+
+def _rerank_fuzzy(terms, candidates, limit):
+    """Order (id, name) candidates by how closely their words match the query."""
+    scored = []
+    for product_id, name in candidates:
+        words = _terms(name or '')
+        if not words:
+            continue
+        score = sum(
+            max(difflib.SequenceMatcher(None, term, word).ratio() for word in words)
+            for term in terms
+        ) / len(terms)
+        if score >= FUZZY_MIN_SIMILARITY:
+            scored.append((score, product_id))
+    scored.sort(key=lambda item: -item[0])
+    return [product_id for _, product_id in scored[:limit]]
+
+
+def search_products(query, limit):
+    """
+    Search products by SKU, name and description.
+
+    Results are ordered: SKU exact/prefix matches, then word-prefix matches
+    ranked by relevance, then (only if the page is not yet full) fuzzy
+    matches that tolerate typos.
+
+    Args:
+        query (str): Raw search string
+        limit (int): Maximum number of products to return
+
+    Returns:
+        list: (Product, match_type) tuples
+    """
+    query = query.strip()
+    terms = _terms(query)
+    dialect = db.session.get_bind().dialect.name
+
+    ordered = {}
+
+    def collect(ids, match_type):
+        for product_id in ids:
+            if len(ordered) >= limit:
+                return
+            ordered.setdefault(product_id, match_type)
+
+    collect(_sku_prefix_ids(query, limit), 'sku')
+    if terms and len(ordered) < limit:
+        if dialect == 'sqlite':
+            collect(_sqlite_text_ids(terms, limit), 'text')
+            if len(ordered) < limit:
+                collect(_sqlite_fuzzy_ids(terms, limit), 'fuzzy')
+        elif dialect == 'mysql':
+            collect(_mysql_text_ids(terms, limit), 'text')
+            if len(ordered) < limit:
+                collect(_mysql_fuzzy_ids(terms, limit), 'fuzzy')
+        else:
+            pattern = f'%{query}%'
+            collect(
+                db.session.execute(
+                    db.select(Product.id).where(Product.name.ilike(pattern)).limit(limit)
+                ).scalars(),
+                'text'
+            )
+
+    if not ordered:
+        return []
+
+    products = {
+        product.id: product
+        for product in Product.query.options(joinedload(Product.category))
+        .filter(Product.id.in_(list(ordered)))
+        .all()
+    }
+    return [(products[product_id], match_type) for product_id, match_type in ordered.items() if product_id in products]
@@ -0,0 +1,217 @@
+"""
+Read-replica routing.
+
+Routes decorated with ``@use_read_replica`` send their SELECTs to one of the
+replicas in ``SQLALCHEMY_REPLICA_URIS``; everything else stays on the
+primary. Within such a request the primary is still used for:
+
+* writes, and any read after the request has written (by flush or by a
+  Core INSERT/UPDATE/DELETE run through the session);
+* ``SELECT ... FOR UPDATE``;
+* users who wrote something in the last ``REPLICA_MAX_LAG_SECONDS`` (so a
+  cashier sees the sale they just rang up).
+
+Replicas are health-checked at most every ``REPLICA_CHECK_INTERVAL_SECONDS``.
+One that is unreachable or lagging more than ``REPLICA_MAX_LAG_SECONDS`` is
+skipped, and if every replica is out the request falls back to the primary.
+A request whose replica fails mid-way is rolled back and re-run on the
+primary.
+
+This module must not import ``extensions``: ``RoutingSession`` is passed to
+``SQLAlchemy()`` there.
+"""
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica when the current request allows it."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and clause is not None and not self._flushing
+                and getattr(clause, 'is_select', False)
+                and getattr(clause, '_for_update_arg', None) is None
+                and has_request_context() and g.get('db_read_replica')
+                and not g.get('db_wrote')):
+            engine = current_app.extensions['read_replicas'].pick()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_write(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_statement_write(orm_execute_state):
+    # Core INSERT/UPDATE/DELETE run through the session (bulk import, bulk
+    # PATCH, sale stock decrements) never flush, so after_flush misses them
+    if has_request_context() and (orm_execute_state.is_insert or orm_execute_state.is_update
+                                  or orm_execute_state.is_delete):
+        g.db_wrote = True
+
+
+class _Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.healthy = True
+        self.lag = 0.0
+        self.checked_at = None
+
+
+class ReplicaRouter:
+    """Tracks replica engines, their health and recent writers for one app."""
+
+    def __init__(self, app=None):
+        self.replicas = []
+        self._lock = threading.Lock()
+        self._cycle = None
+        self._recent_writers = {}  # identity -> monotonic deadline
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from services.engine_profiles import engine_options_for, install_sqlite_pragmas
+
+        self.max_lag = app.config['REPLICA_MAX_LAG_SECONDS']
+        self.check_interval = app.config['REPLICA_CHECK_INTERVAL_SECONDS']
+        self._logger = app.logger
+
+        for uri in app.config['SQLALCHEMY_REPLICA_URIS']:
+            engine = create_engine(uri, **engine_options_for(app, uri))
+            install_sqlite_pragmas(app, engine, read_only=True)
+            event.listen(engine, 'handle_error', self._on_error)
+            self.replicas.append(_Replica(engine))
+        self._cycle = itertools.cycle(self.replicas)
+
+        app.after_request(self._remember_writer)
+        app.extensions['read_replicas'] = self
+
+    @property
+    def engines(self):
+        return [replica.engine for replica in self.replicas]
+
+    def pick(self):
+        """Return a healthy, caught-up replica engine, or None to use the primary."""
+        if not self.replicas or self._is_recent_writer():
+            return None
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = next(self._cycle)
+                if replica.checked_at is None or now - replica.checked_at >= self.check_interval:
+                    self._check(replica, now)
+                if replica.healthy and replica.lag <= self.max_lag:
+                    return replica.engine
+        return None
+
+    def _check(self, replica, now):
+        replica.checked_at = now
+        try:
+            with replica.engine.connect() as connection:
+                replica.lag = _replication_lag(connection)
+            replica.healthy = True
+        except Exception as e:
+            replica.healthy = False
+            self._logger.warning('Read replica %s unavailable: %s', replica.engine.url, e)
+
+    def _on_error(self, context):
+        # Failing to connect, dropped connections and operational errors
+        # (locked/missing tables on a stale copy) take the replica out;
+        # plain SQL errors are the caller's
+        if not (context.connection is None or context.is_disconnect
+                or isinstance(context.sqlalchemy_exception, OperationalError)):
+            return
+        for replica in self.replicas:
+            if replica.engine is context.engine:
+                with self._lock:
+                    replica.healthy = False
+                    replica.checked_at = time.monotonic()
+        if has_request_context():
+            g.db_replica_failed = True
+
+    def _is_recent_writer(self):
+        identity = _current_identity()
+        if identity is None:
+            return False
+        deadline = self._recent_writers.get(identity)
+        return deadline is not None and deadline > time.monotonic()
+
+    def _remember_writer(self, response):
+        if g.get('db_wrote') and self.replicas:
+            identity = _current_identity()
+            if identity is not None:
+                now = time.monotonic()
+                with self._lock:
+                    self._recent_writers[identity] = now + self.max_lag
+                    if len(self._recent_writers) > 10000:
+                        self._recent_writers = {
+                            key: deadline for key, deadline in self._recent_writers.items() if deadline > now
+                        }
+        return response
+
+
+def _current_identity():
+    from flask_jwt_extended import get_jwt_identity
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+def _replication_lag(connection):
+    """Seconds the replica is behind its source (0 where it cannot be measured)."""
+    if connection.dialect.name != 'mysql':
+        connection.execute(text('SELECT 1'))
+        return 0.0
+    for statement, column in (('SHOW REPLICA STATUS', 'Seconds_Behind_Source'),
+                              ('SHOW SLAVE STATUS', 'Seconds_Behind_Master')):
+        try:
+            row = connection.execute(text(statement)).mappings().first()
+        except Exception:
+            continue
+        if row is None:
+            return 0.0  # Not configured as a replica (e.g. a static copy)
+        lag = row.get(column)
+        return float('inf') if lag is None else float(lag)  # NULL: replication stopped
+    return 0.0
+
+
+def get_replica_engines():
+    """Replica engines for the current app (empty when none are configured)."""
+    if has_app_context() and 'read_replicas' in current_app.extensions:
+        return current_app.extensions['read_replicas'].engines
+    return []
+
+
+def use_read_replica(view):
+    """Serve the view's SELECTs from a read replica when one is available."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        from extensions import db
+
+        g.db_read_replica = True
+        try:
+            response = view(*args, **kwargs)
+            if not g.get('db_replica_failed'):
+                return response
+        except Exception:
+            if not g.get('db_replica_failed'):
+                raise
+
+        # The replica failed mid-request: re-run the whole view on the primary
+        db.session.rollback()
+        g.db_read_replica = False
+        g.db_replica_failed = False
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,139 @@
+"""
+Maintenance of the ``daily_sales_rollup`` table.
+
+Every sale adds its revenue, units and a count of one to the rollup row for
+its business day (EAT) inside the same transaction as the sale itself, so the
+dashboard can read a handful of pre-aggregated rows instead of scanning
+``sales`` and ``sale_items``.
+
+Writes that change a day that has already closed (backdated sample sales, a
+rebuild) also bump the 'sales_history' version, which the sales series
+cache is stamped with.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from models.sale import EAT_OFFSET, Sale, SaleItem, get_eat_now
+from models.sales_rollup import DailySalesRollup
+from models.table_version import mark_changed
+
+SECONDS_PER_DAY = 86400
+EPOCH_DATE = date(1970, 1, 1)
+SALES_HISTORY_VERSION = 'sales_history'
+# A sale this close to midnight may commit after its day has closed, so it
+# counts as changing history too
+CLOSING_SETTLE_SECONDS = 300
+
+
+def record_sale(sale_date, revenue, units):
+    """
+    Add one sale to the rollup row for its business day.
+
+    The row is upserted atomically so concurrent checkouts on the same day do
+    not race on the insert. Nothing is committed here; the caller's
+    transaction covers both the sale and the rollup.
+
+    Args:
+        sale_date (date): Business day of the sale in EAT
+        revenue (float): Sale total
+        units (int): Total quantity across the sale's items
+    """
+    table = DailySalesRollup.__table__
+    now = datetime.utcnow()
+    if sale_date < (get_eat_now() + timedelta(seconds=CLOSING_SETTLE_SECONDS)).date():
+        mark_changed(db.session, SALES_HISTORY_VERSION)
+    values = {
+        'date': sale_date,
+        'revenue': revenue,
+        'units': units,
+        'sale_count': 1,
+        'updated_at': now
+    }
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        stmt = sqlite_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.date],
+            set_={
+                'revenue': table.c.revenue + stmt.excluded.revenue,
+                'units': table.c.units + stmt.excluded.units,
+                'sale_count': table.c.sale_count + 1,
+                'updated_at': now
+            }
+        )
+        db.session.execute(stmt)
+    elif dialect == 'mysql':
+        stmt = mysql_insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            revenue=table.c.revenue + stmt.inserted.revenue,
+            units=table.c.units + stmt.inserted.units,
+            sale_count=table.c.sale_count + 1,
+            updated_at=now
+        )
+        db.session.execute(stmt)
+    else:
+        result = db.session.execute(
+            table.update()
+            .where(table.c.date == sale_date)
+            .values(
+                revenue=table.c.revenue + revenue,
+                units=table.c.units + units,
+                sale_count=table.c.sale_count + 1,
+                updated_at=now
+            )
+        )
+        if result.rowcount == 0:
+            db.session.execute(table.insert().values(**values))
+
+
+def rebuild_daily_rollup():
+    """
+    Recompute the whole rollup table from the sales history.
+
+    Sale timestamps are UTC epoch seconds and EAT is a fixed offset, so the
+    business day is plain integer arithmetic and the grouping happens in SQL:
+    only one row per day comes back.
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    units_per_sale = (
+        db.select(SaleItem.sale_id, db.func.sum(SaleItem.quantity).label('units'))
+        .group_by(SaleItem.sale_id)
+        .subquery()
+    )
+    offset = int(EAT_OFFSET.utcoffset(None).total_seconds())
+    day_number = ((Sale.created_ts + offset) // SECONDS_PER_DAY).label('day_number')
+    stmt = (
+        db.select(
+            day_number,
+            db.func.sum(Sale.total_amount),
+            db.func.coalesce(db.func.sum(units_per_sale.c.units), 0),
+            db.func.count(Sale.id)
+        )
+        .outerjoin(units_per_sale, units_per_sale.c.sale_id == Sale.id)
+        .group_by(day_number)
+    )
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            'date': EPOCH_DATE + timedelta(days=int(day)),
+            'revenue': float(revenue or 0),
+            'units': int(units or 0),
+            'sale_count': int(sale_count),
+            'updated_at': now
+        }
+        for day, revenue, units, sale_count in db.session.execute(stmt)
+    ]
+
+    db.session.execute(DailySalesRollup.__table__.delete())
+    if rows:
+        db.session.execute(DailySalesRollup.__table__.insert(), rows)
+    mark_changed(db.session, SALES_HISTORY_VERSION)
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,262 @@
+"""
+Time-bucketed sales series for the dashboard chart.
+
+Revenue, units and order counts are grouped by hour, day, week (starting
+Monday) or month in SQL, over a ``sales.created_ts`` range that the index
+serves. Bucket boundaries follow ``TIMEZONE`` (EAT). Sale timestamps are UTC
+epoch seconds and EAT has no daylight saving, so adding one offset gives
+local seconds. Hour, day and week buckets are then integer arithmetic; only
+months need the database's calendar functions.
+
+Buckets that ended before today are closed and cached per worker. The cache
+is stamped with the 'sales_history' version (models/table_version.py), which
+the rollup service bumps in the same transaction as any sale recorded into
+a past day (sample data, a backfill) and on a rollup rebuild. A new stamp
+empties every worker's cache on its next request. Timestamps would not do:
+``updated_at`` keeps whole seconds on MySQL, so two backdated sales in one
+second would leave it unchanged.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+
+import pytz
+from flask import current_app
+
+from extensions import db
+from models.sale import Sale, SaleItem, to_timestamp
+from models.table_version import TableVersion
+from services.sales_rollup_service import SALES_HISTORY_VERSION
+
+INTERVALS = ('hour', 'day', 'week', 'month')
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+EPOCH = datetime(1970, 1, 1)
+
+
+class SalesSeriesError(ValueError):
+    """Raised for a series request that cannot be answered."""
+
+
+class SalesSeriesCache:
+    """LRU of closed bucket totals, emptied whenever past sales change."""
+
+    def __init__(self, app=None):
+        self._entries = OrderedDict()  # (interval, bucket start) -> (revenue, units, orders)
+        self._lock = threading.Lock()
+        self._stamp = None
+        self.maxsize = 20000
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.maxsize = app.config['SALES_SERIES_CACHE_SIZE']
+        app.extensions['sales_series_cache'] = self
+
+    def lookup(self, stamp, keys):
+        """Return the cached totals among ``keys``, dropping everything if ``stamp`` moved."""
+        found = {}
+        with self._lock:
+            if stamp != self._stamp:
+                self._entries.clear()
+                self._stamp = stamp
+                return found
+            for key in keys:
+                values = self._entries.get(key)
+                if values is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = values
+        return found
+
+    def store(self, stamp, entries):
+        """Cache closed bucket totals computed while ``stamp`` was current."""
+        with self._lock:
+            if stamp != self._stamp:
+                return
+            self._entries.update(entries)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stamp = None
+
+
+def get_sales_series_cache():
+    return current_app.extensions['sales_series_cache']
+
+
+def get_timezone():
+    return pytz.timezone(current_app.config['TIMEZONE'])
+
+
+def _utc_offset(tz):
+    return tz.utcoffset(datetime.utcnow())
+
+
+def bucket_start(moment, interval):
+    """Truncate a naive local datetime to the start of its bucket."""
+    if interval == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, interval):
+    """Start of the bucket following ``start``."""
+    if interval == 'hour':
+        return start + timedelta(hours=1)
+    if interval == 'week':
+        return start + timedelta(days=7)
+    if interval == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def default_start(interval, end):
+    """First day shown when no ``start`` is given: today, 30 days, 12 weeks or 12 months."""
+    if interval == 'hour':
+        return end
+    if interval == 'day':
+        return end - timedelta(days=29)
+    if interval == 'week':
+        return end - timedelta(weeks=11)
+    month_start = end.replace(day=1)
+    for _ in range(11):
+        month_start = (month_start - timedelta(days=1)).replace(day=1)
+    return month_start
+
+
+def _bucket_expression(local_seconds, interval, dialect):
+    """SQL for the start of a bucket, in local seconds since the epoch."""
+    if interval == 'hour':
+        return local_seconds // SECONDS_PER_HOUR * SECONDS_PER_HOUR
+    if interval == 'day':
+        return local_seconds // SECONDS_PER_DAY * SECONDS_PER_DAY
+    if interval == 'week':
+        # 1970-01-01 was a Thursday: shift by three days so weeks start on Monday
+        days = local_seconds // SECONDS_PER_DAY
+        return ((days + 3) // 7 * 7 - 3) * SECONDS_PER_DAY
+    # Months have no fixed length, so ask the database's calendar
+    if dialect == 'sqlite':
+        return db.cast(
+            db.func.strftime('%s', local_seconds, 'unixepoch', 'start of month'), db.Integer
+        )
+    if dialect == 'mysql':
+        # Computed against a literal epoch so the session time_zone plays no part
+        local = db.func.timestampadd(db.text('SECOND'), local_seconds, '1970-01-01')
+        return db.func.timestampdiff(
+            db.text('SECOND'), '1970-01-01', db.func.date_format(local, '%Y-%m-01')
+        )
+    raise SalesSeriesError(f'Monthly sales series are not supported on {dialect}')
+
+
+def _query_buckets(interval, local_start, local_end, offset):
+    """Totals per bucket for sales in [local_start, local_end), keyed by naive local bucket start."""
+    offset_seconds = int(offset.total_seconds())
+    units = (
+        db.select(db.func.coalesce(db.func.sum(SaleItem.quantity), 0))
+        .where(SaleItem.sale_id == Sale.id)
+        .scalar_subquery()
+    )
+    dialect = db.session.get_bind(clause=db.select(Sale.id)).dialect.name
+    bucket = _bucket_expression(Sale.created_ts + offset_seconds, interval, dialect).label('bucket')
+    stmt = (
+        db.select(
+            bucket,
+            db.func.sum(Sale.total_amount),
+            db.func.sum(units),
+            db.func.count(Sale.id)
+        )
+        .where(
+            Sale.created_ts >= to_timestamp(local_start) - offset_seconds,
+            Sale.created_ts < to_timestamp(local_end) - offset_seconds
+        )
+        .group_by(bucket)
+    )
+    return {
+        EPOCH + timedelta(seconds=int(row[0])): (
+            float(row[1] or 0), int(row[2] or 0), int(row[3] or 0)
+        )
+        for row in db.session.execute(stmt)
+    }
+
+
+def _history_stamp():
+    """Changes whenever a sale is recorded into (or a rollup rebuilt for) a past day."""
+    return db.session.execute(
+        db.select(TableVersion.version).where(TableVersion.name == SALES_HISTORY_VERSION)
+    ).scalar()
+
+
+def sales_series(interval, start, end):
+    """
+    Revenue, units and orders per bucket covering local days ``start``..``end``.
+
+    Every bucket is a whole period: a week or month that only partly overlaps
+    the range is reported in full. Empty buckets are included with zeros.
+
+    Args:
+        interval (str): One of INTERVALS
+        start (date): First local day to cover
+        end (date): Last local day to cover (inclusive)
+
+    Returns:
+        list: Dicts with ``period`` (timezone-aware bucket start), ``revenue``,
+        ``units`` and ``orders``
+    """
+    if interval not in INTERVALS:
+        raise SalesSeriesError(f"interval must be one of: {', '.join(INTERVALS)}")
+    if start > end:
+        raise SalesSeriesError('start must not be after end')
+
+    tz = get_timezone()
+    offset = _utc_offset(tz)
+    today = bucket_start(datetime.utcnow() + offset, 'day')
+
+    stop = datetime.combine(end + timedelta(days=1), time())
+    buckets = [bucket_start(datetime.combine(start, time()), interval)]
+    max_buckets = current_app.config['SALES_SERIES_MAX_BUCKETS']
+    while next_bucket(buckets[-1], interval) < stop:
+        buckets.append(next_bucket(buckets[-1], interval))
+        if len(buckets) > max_buckets:
+            raise SalesSeriesError(f'Range spans more than {max_buckets} {interval} buckets')
+
+    closed = [bucket for bucket in buckets if next_bucket(bucket, interval) <= today]
+    cache = get_sales_series_cache()
+    stamp = None
+    totals = {}
+    if closed:
+        stamp = _history_stamp()
+        totals = {
+            bucket: values
+            for (_, bucket), values in cache.lookup(stamp, [(interval, b) for b in closed]).items()
+        }
+
+    missing = [bucket for bucket in buckets if bucket not in totals]
+    if missing:
+        fetched = _query_buckets(interval, missing[0], next_bucket(buckets[-1], interval), offset)
+        newly_closed = {}
+        for bucket in missing:
+            values = fetched.get(bucket, (0.0, 0, 0))
+            totals[bucket] = values
+            if next_bucket(bucket, interval) <= today:
+                newly_closed[(interval, bucket)] = values
+        if newly_closed:
+            cache.store(stamp, newly_closed)
+
+    return [
+        {
+            'period': tz.localize(bucket),
+            'revenue': round(totals[bucket][0], 2),
+            'units': totals[bucket][1],
+            'orders': totals[bucket][2]
+        }
+        for bucket in buckets
+    ]
@@ -0,0 +1,167 @@
+"""
+Slow-query log.
+
+Engine events time every statement; those slower than
+``SLOW_QUERY_THRESHOLD_MS`` are kept in a bounded in-memory ring buffer (and
+logged as warnings). Each record carries the Flask endpoint that issued the
+query, the types of its parameters (the values themselves only with
+``SLOW_QUERY_LOG_PARAMETERS``) and duration. The first time a statement is
+seen, its query plan is captured with ``EXPLAIN`` so the record shows *why*
+it was slow, without turning on ``SQLALCHEMY_ECHO``.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+from services.read_replicas import get_replica_engines
+
+MAX_PARAMETER_LENGTH = 500
+MAX_CACHED_PLANS = 500
+EXPLAINABLE = re.compile(r'\s*(SELECT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+
+
+class SlowQueryLog:
+    """Records statements over a duration threshold for one app."""
+
+    def __init__(self, app=None):
+        self._records = deque(maxlen=200)
+        self._plans = OrderedDict()  # statement -> plan lines
+        self._lock = threading.Lock()
+        self.threshold = 0.1
+        self.explain = True
+        self.log_parameters = False
+        self.total = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000
+        self.explain = app.config['SLOW_QUERY_EXPLAIN']
+        self.log_parameters = app.config['SLOW_QUERY_LOG_PARAMETERS']
+        self._records = deque(maxlen=app.config['SLOW_QUERY_LOG_SIZE'])
+        self._logger = app.logger
+
+        with app.app_context():
+            engines = [db.engine] + get_replica_engines()
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._before_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_execute)
+        app.extensions['slow_query_log'] = self
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['slow_query_started'] = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('slow_query_started', None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return
+
+        if executemany and parameters:
+            shown = parameters[0]
+            batch = len(parameters)
+        else:
+            shown = parameters
+            batch = None
+
+        record = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'duration_ms': round(duration * 1000, 2),
+            'statement': statement,
+            'parameters': repr(shown if self.log_parameters else _redact(shown))[:MAX_PARAMETER_LENGTH],
+            'executemany': batch,
+            'endpoint': request.endpoint if has_request_context() else None,
+            'method': request.method if has_request_context() else None,
+            'path': request.path if has_request_context() else None,
+            'plan': self._get_plan(conn, statement, shown, context),
+        }
+        with self._lock:
+            self._records.append(record)
+            self.total += 1
+
+        self._logger.warning(
+            'Slow query (%.1f ms) in %s: %s',
+            record['duration_ms'], record['endpoint'] or '<no request>', ' '.join(statement.split())[:300]
+        )
+
+    def _get_plan(self, conn, statement, parameters, context=None):
+        """Return the cached plan for ``statement``, running EXPLAIN on first sighting."""
+        if not self.explain or not EXPLAINABLE.match(statement):
+            return None
+        with self._lock:
+            if statement in self._plans:
+                self._plans.move_to_end(statement)
+                return self._plans[statement]
+
+        # A streamed result is still being read through this connection, and
+        # drivers such as pymysql discard unread rows before running another
+        # command; EXPLAIN here would silently truncate it
+        if context is not None and context.execution_options.get('stream_results'):
+            return ['EXPLAIN skipped: result is streamed']
+
+        sqlite = conn.dialect.name == 'sqlite'
+        prefix = 'EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '
+        try:
+            # A separate raw cursor: the original may still hold unread rows,
+            # and going through the engine would re-enter these hooks
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters or ())
+                rows = cursor.fetchall()
+                if sqlite:
+                    plan = [row[3] for row in rows]  # (id, parent, notused, detail)
+                else:
+                    plan = [' | '.join(str(value) for value in row) for row in rows]
+            finally:
+                cursor.close()
+        except Exception as e:
+            plan = [f'EXPLAIN failed: {e}']
+
+        with self._lock:
+            self._plans[statement] = plan
+            while len(self._plans) > MAX_CACHED_PLANS:
+                self._plans.popitem(last=False)
+        return plan
+
+    def records(self, endpoint=None, limit=None):
+        """Return recorded slow queries, newest first."""
+        with self._lock:
+            records = list(reversed(self._records))
+        if endpoint:
+            records = [record for record in records if record['endpoint'] == endpoint]
+        return records[:limit] if limit else records
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._plans.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'threshold_ms': self.threshold * 1000,
+                'total': self.total,
+                'buffered': len(self._records),
+                'capacity': self._records.maxlen
+            }
+
+
+def _redact(parameters):
+    """Replace bound values with their type names, keeping names/positions."""
+    if isinstance(parameters, dict):
+        return {name: f'<{type(value).__name__}>' for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [f'<{type(value).__name__}>' for value in parameters]
+    return parameters
+
+
+def get_slow_query_log():
+    return current_app.extensions['slow_query_log']
@@ -0,0 +1,208 @@
+"""
+Append-only stock movement ledger with periodic snapshots.
+
+Every write that changes ``products.stock`` also inserts stock movements in
+the same transaction, so the stock column and its history commit or roll
+back together. Each movement is a sale, adjustment, restock or import.
+``products.stock`` still answers "how many now"; the ledger answers "how
+many then" and "what happened". Rows are never deleted, not even with their
+product: a deleted product's history ends with a closing adjustment.
+
+``take_stock_snapshots()`` (``flask snapshot-stock``, run from cron) records
+the stock of every product that moved since the previous run. Stock at time
+T is the newest snapshot before T plus the movements between that snapshot
+and T. That costs one index seek and a range bounded by the snapshot
+interval, however long the history grows.
+"""
+from extensions import db
+from models.sale import get_utc_timestamp
+from models.stock_movement import MOVEMENT_KINDS, StockMovement, StockSnapshot
+
+# Movements are written in short transactions; a snapshot only covers
+# movements at least this old, so one that commits late cannot land behind it
+SNAPSHOT_SETTLE_SECONDS = 300
+SNAPSHOT_LOOKUP_CHUNK_SIZE = 500
+
+
+def kind_for_change(delta):
+    """Ledger kind for a stock level set by hand: received goods or a correction."""
+    return 'restock' if delta > 0 else 'adjustment'
+
+
+def record_movement(product_id, kind, quantity, sale_id=None, user_id=None):
+    """
+    Append one movement. Nothing is committed here; the caller's transaction
+    covers both the stock write and the ledger row.
+
+    Args:
+        product_id (int): Product whose stock changed
+        kind (str): One of MOVEMENT_KINDS
+        quantity (int): Signed change (negative when stock leaves)
+        sale_id (int): Sale that caused the change, if any
+        user_id (int): User who made the change, if known
+    """
+    record_movements([{
+        'product_id': product_id, 'kind': kind, 'quantity': quantity,
+        'sale_id': sale_id, 'user_id': user_id
+    }])
+
+
+def record_movements(movements):
+    """
+    Append many movements with one executemany INSERT.
+
+    Args:
+        movements (iterable): Dicts with product_id, kind and quantity, plus
+            optional sale_id, user_id and created_ts (defaults to now).
+            Zero-quantity entries are skipped.
+    """
+    now = get_utc_timestamp()
+    rows = []
+    for movement in movements:
+        if not movement['quantity']:
+            continue
+        if movement['kind'] not in MOVEMENT_KINDS:
+            raise ValueError(f"Unknown stock movement kind: {movement['kind']}")
+        rows.append({
+            'product_id': movement['product_id'],
+            'kind': movement['kind'],
+            'quantity': movement['quantity'],
+            'sale_id': movement.get('sale_id'),
+            'user_id': movement.get('user_id'),
+            'created_ts': movement.get('created_ts') or now
+        })
+    if rows:
+        db.session.execute(StockMovement.__table__.insert(), rows)
+
+
+def record_closing_stock(product, user_id=None):
+    """
+    Write off a product's remaining stock before it is deleted, so its
+    history (which is kept) ends at zero. Nothing is committed here.
+
+    Args:
+        product (Product): Product about to be deleted
+        user_id (int): User deleting it, if known
+    """
+    record_movement(product.id, 'adjustment', -(product.stock or 0), user_id=user_id)
+
+
+def record_opening_stock(kind='adjustment', created_ts=None, commit=True):
+    """
+    Give every product that has no ledger history an opening movement equal
+    to its current stock, so its history adds up from zero.
+
+    Args:
+        kind (str): Movement kind to record the opening balance as
+        created_ts (int): Timestamp of the opening movements (default now)
+        commit (bool): Commit the session afterwards
+
+    Returns:
+        int: Number of opening movements written
+    """
+    products = db.metadata.tables['products']
+    has_history = db.select(StockMovement.id).where(StockMovement.product_id == products.c.id).exists()
+    result = db.session.execute(
+        StockMovement.__table__.insert().from_select(
+            ['product_id', 'kind', 'quantity', 'created_ts'],
+            db.select(
+                products.c.id,
+                db.literal(kind),
+                products.c.stock,
+                db.literal(created_ts or get_utc_timestamp())
+            ).where(products.c.stock != 0, ~has_history)
+        )
+    )
+    if commit:
+        db.session.commit()
+    return result.rowcount
+
+
+def take_stock_snapshots(at_ts=None, commit=True):
+    """
+    Snapshot every product whose stock moved since the previous snapshot run.
+
+    The new snapshot is the product's previous snapshot (or zero) plus its
+    movements since then, so only movements in the window are read.
+
+    Args:
+        at_ts (int): Snapshot time in UTC epoch seconds; covers movements
+            strictly before it (default: SNAPSHOT_SETTLE_SECONDS ago)
+        commit (bool): Commit the session afterwards
+
+    Returns:
+        int: Number of snapshots written
+    """
+    if at_ts is None:
+        at_ts = get_utc_timestamp() - SNAPSHOT_SETTLE_SECONDS
+
+    previous = db.session.execute(db.select(db.func.max(StockSnapshot.taken_ts))).scalar()
+    if previous is not None and at_ts <= previous:
+        return 0
+
+    window = db.select(StockMovement.product_id, db.func.sum(StockMovement.quantity)).where(
+        StockMovement.created_ts < at_ts
+    )
+    if previous is not None:
+        window = window.where(StockMovement.created_ts >= previous)
+    deltas = dict(db.session.execute(window.group_by(StockMovement.product_id)).all())
+    if not deltas:
+        return 0
+
+    base = {}
+    product_ids = list(deltas)
+    for offset in range(0, len(product_ids), SNAPSHOT_LOOKUP_CHUNK_SIZE):
+        chunk = product_ids[offset:offset + SNAPSHOT_LOOKUP_CHUNK_SIZE]
+        latest = (
+            db.select(StockSnapshot.product_id, db.func.max(StockSnapshot.taken_ts).label('taken_ts'))
+            .where(StockSnapshot.product_id.in_(chunk))
+            .group_by(StockSnapshot.product_id)
+            .subquery()
+        )
+        base.update(db.session.execute(
+            db.select(StockSnapshot.product_id, StockSnapshot.stock).join(
+                latest,
+                (latest.c.product_id == StockSnapshot.product_id) & (latest.c.taken_ts == StockSnapshot.taken_ts)
+            )
+        ).all())
+
+    db.session.execute(StockSnapshot.__table__.insert(), [
+        {'product_id': product_id, 'taken_ts': at_ts, 'stock': base.get(product_id, 0) + int(delta)}
+        for product_id, delta in deltas.items()
+    ])
+    if commit:
+        db.session.commit()
+    return len(deltas)
+
+
+def stock_before(product_id, ts):
+    """
+    Stock of one product including every movement before ``ts``.
+
+    Args:
+        product_id (int): Product to look up
+        ts (int): UTC epoch seconds
+
+    Returns:
+        dict: ``stock``, ``snapshot_ts`` (the snapshot used, or None) and
+        ``replayed`` (number of movements added on top of it)
+    """
+    snapshot = db.session.execute(
+        db.select(StockSnapshot.taken_ts, StockSnapshot.stock)
+        .where(StockSnapshot.product_id == product_id, StockSnapshot.taken_ts <= ts)
+        .order_by(StockSnapshot.taken_ts.desc())
+        .limit(1)
+    ).first()
+
+    replay = db.select(
+        db.func.coalesce(db.func.sum(StockMovement.quantity), 0), db.func.count(StockMovement.id)
+    ).where(StockMovement.product_id == product_id, StockMovement.created_ts < ts)
+    if snapshot is not None:
+        replay = replay.where(StockMovement.created_ts >= snapshot.taken_ts)
+    delta, replayed = db.session.execute(replay).one()
+
+    return {
+        'stock': (snapshot.stock if snapshot is not None else 0) + int(delta),
+        'snapshot_ts': snapshot.taken_ts if snapshot is not None else None,
+        'replayed': int(replayed)
+    }
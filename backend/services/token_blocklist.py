@@ -0,0 +1,136 @@
+"""
+JWT revocation store.
+
+Revoked token ids (``jti``) are written to the ``revoked_tokens`` table for
+durability and mirrored in an in-process dict, so the check that runs on every
+``@jwt_required()`` request is a memory lookup. Each worker pulls revocations
+made by other workers with one small indexed query at most every
+``JWT_BLOCKLIST_SYNC_SECONDS``, and forgets tokens once they have expired.
+The sync only reads: expired rows are deleted by ``flask prune-revoked-tokens``
+(run from cron), never on the request path. If a sync fails, the worker keeps
+its current view and tries again after the next interval.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from extensions import db
+from models.revoked_token import RevokedToken
+
+# Re-read a little history on each sync so revocations committed slightly out
+# of order (clock skew between workers, slow transactions) are not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class TokenBlocklist:
+    """In-memory view of the revoked_tokens table for one app."""
+
+    def __init__(self, app=None):
+        self._revoked = {}  # jti -> expiry (unix timestamp)
+        self._lock = threading.Lock()
+        self._last_sync = None  # time.monotonic() of the last database sync
+        self._synced_until = None  # newest revoked_at already loaded
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['token_blocklist'] = self
+
+    def is_revoked(self, jti):
+        """Return True if the token id has been revoked."""
+        self._maybe_sync()
+        expires = self._revoked.get(jti)
+        return expires is not None and expires > time.time()
+
+    def revoke(self, jwt_payload):
+        """
+        Revoke a decoded token and commit the revocation.
+
+        Args:
+            jwt_payload (dict): Decoded JWT claims (needs jti, type, exp)
+        """
+        jti = jwt_payload['jti']
+        expires = jwt_payload['exp']
+        user_id = jwt_payload.get('sub')
+
+        db.session.add(RevokedToken(
+            jti=jti,
+            token_type=jwt_payload.get('type', 'access'),
+            user_id=int(user_id) if user_id is not None and str(user_id).isdigit() else None,
+            expires_at=datetime.utcfromtimestamp(expires)
+        ))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Already revoked (e.g. logout called twice)
+            db.session.rollback()
+
+        with self._lock:
+            self._revoked[jti] = expires
+
+    def _maybe_sync(self):
+        interval = current_app.config['JWT_BLOCKLIST_SYNC_SECONDS']
+        now = time.monotonic()
+        if self._last_sync is not None and now - self._last_sync < interval:
+            return
+
+        with self._lock:
+            if self._last_sync is not None and now - self._last_sync < interval:
+                return
+            self._last_sync = now
+            try:
+                self._sync()
+            except SQLAlchemyError as e:
+                # Serve from the revocations already loaded rather than fail the request
+                db.session.rollback()
+                current_app.logger.warning('Token blocklist sync failed: %s', e)
+
+    def _sync(self):
+        """Load revocations made since the last sync and drop expired entries."""
+        query = db.select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+        if self._synced_until is None:
+            query = query.where(RevokedToken.expires_at > datetime.utcnow())
+        else:
+            query = query.where(RevokedToken.revoked_at >= self._synced_until - SYNC_OVERLAP)
+
+        # Fetch everything before touching state, so a failed read leaves it as it was
+        for jti, expires_at, revoked_at in db.session.execute(query).all():
+            self._revoked[jti] = _utc_timestamp(expires_at)
+            if self._synced_until is None or revoked_at > self._synced_until:
+                self._synced_until = revoked_at
+        if self._synced_until is None:
+            self._synced_until = datetime.utcnow()
+
+        current = time.time()
+        for jti in [jti for jti, expires in self._revoked.items() if expires <= current]:
+            del self._revoked[jti]
+
+
+def _utc_timestamp(value):
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+def get_token_blocklist():
+    return current_app.extensions['token_blocklist']
+
+
+def revoke_token(jwt_payload):
+    """Revoke a decoded token for the current app."""
+    get_token_blocklist().revoke(jwt_payload)
+
+
+def prune_expired_tokens():
+    """
+    Delete revocations for tokens that have expired anyway.
+
+    Returns:
+        int: Number of rows removed
+    """
+    result = db.session.execute(
+        RevokedToken.__table__.delete().where(RevokedToken.expires_at <= datetime.utcnow())
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,135 @@
+"""
+TTL-bounded LRU cache of user records.
+
+Authenticated endpoints resolve the JWT identity to a user on every request.
+The cache keeps a serialized snapshot of recently seen users (the same shape
+``user_schema.dump`` returns) keyed by id, so identity lookups on hot paths do
+not need a database round trip.
+
+Entries are dropped once a transaction that updated or deleted the user
+commits: ORM hooks note the ids at flush and invalidate after the commit, so
+a concurrent lookup cannot refill the entry from the old row in between. A
+lookup that read the database before an invalidation does not store its
+result. Changes made by another worker become visible after at most
+``USER_CACHE_TTL_SECONDS``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from extensions import db
+from models.user import User, user_schema
+
+_CHANGED_KEY = 'user_cache_changed_ids'
+
+
+class UserCache:
+    """Thread-safe LRU of user snapshots with per-entry expiry."""
+
+    def __init__(self, app=None):
+        self._entries = OrderedDict()  # user_id -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by every invalidation
+        self.maxsize = 1024
+        self.ttl = 60
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.maxsize = app.config['USER_CACHE_MAX_SIZE']
+        self.ttl = app.config['USER_CACHE_TTL_SECONDS']
+        app.extensions['user_cache'] = self
+
+    def get(self, user_id):
+        """
+        Return the snapshot for ``user_id``, loading it on a miss.
+
+        Returns:
+            dict: Copy of the serialized user, or None if the user does not exist
+        """
+        user_id = int(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return dict(entry[1])
+            self.misses += 1
+            generation = self._generation
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = user_schema.dump(user)
+
+        with self._lock:
+            # A user changed while we were reading: the row may be stale, don't cache it
+            if generation == self._generation:
+                self._entries[user_id] = (now + self.ttl, snapshot)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return dict(snapshot)
+
+    def invalidate(self, user_id):
+        """Forget a user so the next lookup reads the database."""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(int(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.maxsize
+            }
+
+
+def get_user_cache():
+    return current_app.extensions['user_cache']
+
+
+def get_cached_user(user_id):
+    """Look up a user snapshot through the current app's cache."""
+    return get_user_cache().get(user_id)
+
+
+def invalidate_user(user_id):
+    """Drop a user from the current app's cache."""
+    get_user_cache().invalidate(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _note_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    user_ids = session.info.pop(_CHANGED_KEY, None)
+    if user_ids and has_app_context() and 'user_cache' in current_app.extensions:
+        for user_id in user_ids:
+            invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session):
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Product import upsert check.
+
+Seeds a throwaway SQLite database with one fully populated product, upserts
+a CSV row that supplies only name, sku and price through the import
+endpoint, and checks that the columns the row left out (stock, category,
+low-stock threshold, description) are kept, along with the counters and
+stock ledger that follow them.
+
+Usage:
+    python test_product_import.py
+    pytest test_product_import.py
+"""
+import os
+import sys
+import tempfile
+
+
+def run_partial_upsert():
+    """Return a dict describing the product and its aggregates after a partial upsert."""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+
+    from app import create_app
+    from extensions import db
+    from config import TestingConfig
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    original_uri = TestingConfig.SQLALCHEMY_DATABASE_URI
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    try:
+        app = create_app('testing')
+        client = app.test_client()
+        with app.app_context():
+            from models.user import User
+            from models.category import Category
+            from models.product import Product
+            from services.category_counter_service import reconcile_category_counts
+            from services.inventory_counter_service import reconcile_inventory_counters
+            from services.stock_ledger_service import record_opening_stock
+
+            db.create_all()
+            user = User(username='importer', email='importer@example.com', role='admin')
+            user.set_password('password123')
+            db.session.add(user)
+            db.session.add(Category(name='Food'))
+            db.session.flush()
+            db.session.add(Product(name='Rice', sku='R1', price=2.5, stock=50, low_stock_threshold=5,
+                                   category_id=1, description='Long grain'))
+            db.session.commit()
+            record_opening_stock()
+            reconcile_category_counts()
+            reconcile_inventory_counters()
+
+        response = client.post('/api/auth/login', json={'email': 'importer@example.com', 'password': 'password123'})
+        headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+        response = client.post(
+            '/api/inventory/import', query_string={'mode': 'upsert'}, headers=headers,
+            data='name,sku,price\nRice v2,R1,3\n', content_type='text/csv'
+        )
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+        with app.app_context():
+            from models.stock_movement import StockMovement
+            from services.inventory_counter_service import get_inventory_counts
+
+            product = Product.query.filter_by(sku='R1').one()
+            category_counts = {category.id: category.product_count for category in Category.query}
+            counts = get_inventory_counts()
+            movements = [(m.kind, m.quantity) for m in StockMovement.query.filter_by(product_id=product.id)]
+            result = {
+                'summary': response.get_json(),
+                'product': {
+                    'name': product.name, 'price': product.price, 'stock': product.stock,
+                    'low_stock_threshold': product.low_stock_threshold,
+                    'category_id': product.category_id, 'description': product.description
+                },
+                'category_counts': category_counts,
+                'counts': counts,
+                'movements': movements,
+            }
+            # The maintained aggregates must agree with a full recount
+            reconcile_category_counts()
+            reconcile_inventory_counters()
+            result['recounted'] = (
+                {category.id: category.product_count for category in Category.query},
+                get_inventory_counts()
+            )
+            db.engine.dispose()
+        return result
+    finally:
+        TestingConfig.SQLALCHEMY_DATABASE_URI = original_uri
+        os.remove(path)
+
+
+def test_partial_upsert_keeps_omitted_columns():
+    result = run_partial_upsert()
+
+    assert result['summary']['updated'] == 1
+    assert result['product'] == {
+        'name': 'Rice v2', 'price': 3.0, 'stock': 50, 'low_stock_threshold': 5,
+        'category_id': 1, 'description': 'Long grain'
+    }
+    assert result['movements'] == [('adjustment', 50)]
+    assert result['category_counts'] == {1: 1}
+    assert result['counts']['in_stock'] == 1
+    assert result['recounted'] == (result['category_counts'], result['counts'])
+
+
+if __name__ == '__main__':
+    test_partial_upsert_keeps_omitted_columns()
+    print('✅ Partial upsert kept the omitted columns')
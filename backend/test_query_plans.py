@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check.
+
+Seeds a throwaway SQLite database, calls each API route through Flask's test
+client, captures every SQL statement the route issues and runs
+``EXPLAIN QUERY PLAN`` on it. The check fails if any statement reads a table
+with a full scan.
+
+A scan is accepted only when it is bounded: the statement has a LIMIT, the
+plan reads rows in index order (no temp B-tree sort), and either the scan
+walks an index or the statement filters on nothing but its keyset cursor
+(the ORDER BY columns). A filter the scan has to test row by row could read
+the whole table before the page fills, so that is reported. Small lookup
+tables listed in ALLOWED_FULL_SCANS are exempt.
+
+Usage:
+    python test_query_plans.py
+    pytest test_query_plans.py
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+# Tables that stay tiny (reference data, staff accounts); SQLite rightly
+# prefers scanning them over an index lookup
+ALLOWED_FULL_SCANS = {'categories', 'users', 'inventory_counters', 'alembic_version'}
+
+SEED_CATEGORIES = 8
+SEED_PRODUCTS = 400
+SEED_SALES = 600
+SEED_USERS = 25
+
+
+def seed(db):
+    """Populate the database with enough rows for the planner to prefer indexes."""
+    from models.user import User
+    from models.category import Category
+    from models.product import Product
+    from models.sale import Sale, SaleItem, get_eat_now, to_timestamp
+    from models.stock_movement import StockMovement
+    from services.stock_ledger_service import record_opening_stock, take_stock_snapshots
+
+    rng = random.Random(42)
+
+    user = User(username='planner', email='planner@example.com', first_name='Plan', last_name='Ner', role='admin')
+    user.set_password('password123')
+    cashiers = [
+        User(username=f'cashier{i}', email=f'cashier{i}@example.com', first_name='Cashier', last_name=str(i),
+             password_hash=user.password_hash)
+        for i in range(SEED_USERS - 1)
+    ]
+    db.session.add(user)
+    db.session.add_all(cashiers)
+    db.session.flush()
+    user_ids = [user.id] + [cashier.id for cashier in cashiers]
+
+    categories = [Category(name=f'Category {i}') for i in range(SEED_CATEGORIES)]
+    db.session.add_all(categories)
+    db.session.flush()
+
+    products = [
+        Product(
+            name=f'Product {i}',
+            sku=f'SKU{i:05d}',
+            category_id=categories[i % SEED_CATEGORIES].id,
+            price=round(rng.uniform(1, 500), 2),
+            stock=rng.randint(0, 200),
+            low_stock_threshold=10,
+            description=f'Seeded product number {i}'
+        )
+        for i in range(SEED_PRODUCTS)
+    ]
+    db.session.add_all(products)
+    db.session.flush()
+
+    now = get_eat_now()
+    record_opening_stock(created_ts=to_timestamp(now - timedelta(days=91)), commit=False)
+    for i in range(SEED_SALES):
+        sale = Sale(
+            user_id=rng.choice(user_ids),
+            total_amount=0,
+            payment_method='cash',
+            created_ts=to_timestamp(now - timedelta(hours=rng.randint(0, 24 * 90)))
+        )
+        db.session.add(sale)
+        db.session.flush()
+        total = 0
+        for product in rng.sample(products, rng.randint(1, 4)):
+            quantity = rng.randint(1, 3)
+            total += product.price * quantity
+            db.session.add(SaleItem(sale_id=sale.id, product_id=product.id, quantity=quantity, price_at_sale=product.price))
+            db.session.add(StockMovement(product_id=product.id, kind='sale', quantity=-quantity,
+                                         sale_id=sale.id, user_id=sale.user_id, created_ts=sale.created_ts))
+        sale.total_amount = total
+
+    db.session.commit()
+
+    # Weekly snapshots, as the snapshot-stock cron job would have taken
+    for weeks_ago in range(12, 0, -1):
+        take_stock_snapshots(at_ts=to_timestamp(now - timedelta(weeks=weeks_ago)))
+
+    # Build the maintained aggregates up front; their rebuild routines scan by design
+    from services.sales_rollup_service import rebuild_daily_rollup
+    from services.inventory_counter_service import reconcile_inventory_counters
+    from services.category_counter_service import reconcile_category_counts
+    rebuild_daily_rollup()
+    reconcile_inventory_counters()
+    reconcile_category_counts()
+
+    # Give the planner real statistics, as a long-lived database would have
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def route_calls(client, headers):
+    """Yield (label, response) for every route under test."""
+    today = date.today()
+    start = (today - timedelta(days=30)).isoformat()
+    end = today.isoformat()
+
+    def get(url, **kwargs):
+        return client.get(url, headers=headers, **kwargs)
+
+    first_page = get('/api/inventory/', query_string={'limit': 20})
+    yield 'GET /api/inventory/ (first page)', first_page
+    yield 'GET /api/inventory/ (next page)', get(
+        '/api/inventory/', query_string={'limit': 20, 'cursor': first_page.get_json()['next_cursor']}
+    )
+    by_updated = get('/api/inventory/', query_string={'limit': 20, 'order_by': 'updated_at'})
+    yield 'GET /api/inventory/?order_by=updated_at', by_updated
+    yield 'GET /api/inventory/?order_by=updated_at (next page)', get(
+        '/api/inventory/',
+        query_string={'limit': 20, 'order_by': 'updated_at', 'cursor': by_updated.get_json()['next_cursor']}
+    )
+    yield 'GET /api/inventory/?category_id', get('/api/inventory/', query_string={'limit': 20, 'category_id': 2})
+    yield 'GET /api/inventory/search', get('/api/inventory/search', query_string={'q': 'Product 12'})
+    yield 'GET /api/inventory/search (sku)', get('/api/inventory/search', query_string={'q': 'SKU001'})
+    yield 'GET /api/inventory/stats', get('/api/inventory/stats')
+    yield 'GET /api/inventory/recent-activity', get('/api/inventory/recent-activity')
+    yield 'GET /api/inventory/<id>/stock?as_of', get('/api/inventory/7/stock', query_string={'as_of': start})
+    movements = get('/api/inventory/7/stock-movements', query_string={'start': start, 'limit': 2})
+    yield 'GET /api/inventory/<id>/stock-movements', movements
+    yield 'GET /api/inventory/<id>/stock-movements (next page)', get(
+        '/api/inventory/7/stock-movements', query_string={'limit': 2, 'cursor': movements.get_json()['next_cursor']}
+    )
+    categories = get('/api/categories/')
+    yield 'GET /api/categories/', categories
+    yield 'GET /api/categories/ (If-None-Match)', client.get(
+        '/api/categories/', headers={**headers, 'If-None-Match': categories.headers['ETag']}
+    )
+    yield 'GET /api/inventory/ (If-None-Match)', client.get(
+        '/api/inventory/', query_string={'limit': 20},
+        headers={**headers, 'If-None-Match': first_page.headers['ETag']}
+    )
+
+    sales_page = get('/api/sales/', query_string={'limit': 20})
+    yield 'GET /api/sales/ (first page)', sales_page
+    yield 'GET /api/sales/ (next page)', get(
+        '/api/sales/', query_string={'limit': 20, 'cursor': sales_page.get_json()['next_cursor']}
+    )
+    yield 'GET /api/sales/?start&end', get('/api/sales/', query_string={'limit': 20, 'start': start, 'end': end})
+    yield 'GET /api/sales/<id>', get('/api/sales/1')
+    for interval in ('hour', 'day', 'week', 'month'):
+        yield f'GET /api/sales/series?interval={interval}', get(
+            '/api/sales/series', query_string={'interval': interval, 'start': start, 'end': end}
+        )
+    yield 'GET /api/sales/series (cached)', get('/api/sales/series', query_string={'start': start, 'end': end})
+    yield 'GET /api/sales/export?start&end', get('/api/sales/export', query_string={'start': start, 'end': end})
+    yield 'GET /api/auth/me', get('/api/auth/me')
+
+    yield 'POST /api/sales/', client.post(
+        '/api/sales/', headers=headers, json={'items': [{'product_id': 5, 'quantity': 1}]}
+    )
+    yield 'PUT /api/inventory/<id>', client.put('/api/inventory/6', headers=headers, json={'stock': 50})
+
+
+def _filters_beyond_keyset(statement):
+    """True if the WHERE clause tests anything other than the ORDER BY columns."""
+    where = re.search(r'\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|$)', statement, re.IGNORECASE | re.DOTALL)
+    if not where:
+        return False
+    order_by = re.search(r'\bORDER BY\b(.*?)(?:\bLIMIT\b|$)', statement, re.IGNORECASE | re.DOTALL)
+    columns = [
+        re.sub(r'\s+(ASC|DESC)\s*$', '', column.strip(), flags=re.IGNORECASE)
+        for column in (order_by.group(1).split(',') if order_by else [])
+    ]
+    remainder = where.group(1)
+    for column in columns:
+        remainder = re.sub(re.escape(column) + r'\s*(<=|>=|<|>|=)\s*\?', '', remainder)
+    return bool(re.sub(r'\b(AND|OR)\b|[()\s]', '', remainder, flags=re.IGNORECASE))
+
+
+def find_full_scans(connection, statement, parameters):
+    """Return the plan lines of ``statement`` that are unbounded full scans."""
+    if not re.match(r'\s*(SELECT|UPDATE|DELETE|WITH)\b', statement, re.IGNORECASE):
+        return []
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else ()
+
+    plan = [row[3] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+    bounded = re.search(r'\bLIMIT\b', statement, re.IGNORECASE) and not any('TEMP B-TREE' in line for line in plan)
+
+    problems = []
+    for line in plan:
+        match = re.match(r'SCAN (\w+)', line)
+        # "SCAN CONSTANT ROW" is a FROM-less SELECT (e.g. of scalar subqueries)
+        if not match or 'VIRTUAL TABLE' in line or line.startswith('SCAN CONSTANT ROW'):
+            continue
+        if match.group(1) in ALLOWED_FULL_SCANS:
+            continue
+        if bounded and ('USING INDEX' in line or 'USING COVERING INDEX' in line
+                        or not _filters_beyond_keyset(statement)):
+            continue
+        # Walking a whole index ("SCAN t USING INDEX ...") is still a full scan
+        problems.append(line)
+    return problems
+
+
+def run_query_plan_checks(verbose=True):
+    """Run every route and return a list of (label, statement, plan line) failures."""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+
+    from app import create_app
+    from extensions import db
+    from config import TestingConfig
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    original_uri = TestingConfig.SQLALCHEMY_DATABASE_URI
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    try:
+        app = create_app('testing')
+        client = app.test_client()
+        with app.app_context():
+            db.create_all()
+            seed(db)
+            engine = db.engine
+
+        response = client.post('/api/auth/login', json={'email': 'planner@example.com', 'password': 'password123'})
+        headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            captured.append((statement, parameters))
+
+        failures = []
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            for label, response in route_calls(client, headers):
+                statements = list(captured)
+                captured.clear()
+                if response.status_code >= 400:
+                    failures.append((label, f'HTTP {response.status_code}', response.get_data(as_text=True)[:200]))
+                    continue
+
+                event.remove(engine, 'before_cursor_execute', capture)
+                try:
+                    with engine.connect() as connection:
+                        for statement, parameters in statements:
+                            for line in find_full_scans(connection, statement, parameters):
+                                failures.append((label, statement, line))
+                finally:
+                    event.listen(engine, 'before_cursor_execute', capture)
+
+                if verbose:
+                    print(f"  {'checked':8} {label} ({len(statements)} statements)")
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+            with app.app_context():
+                db.engine.dispose()
+        return failures
+    finally:
+        TestingConfig.SQLALCHEMY_DATABASE_URI = original_uri
+        os.remove(path)
+
+
+def test_query_plans():
+    failures = run_query_plan_checks(verbose=False)
+    assert not failures, '\n'.join(f'{label}: {line}\n    {statement}' for label, statement, line in failures)
+
+
+if __name__ == '__main__':
+    print('Checking query plans...')
+    failures = run_query_plan_checks()
+    if failures:
+        print(f'\n❌ {len(failures)} full table scan(s) found:')
+        for label, statement, line in failures:
+            print(f'\n  {label}\n    plan: {line}\n    sql:  {" ".join(statement.split())}')
+        sys.exit(1)
+    print('\n✅ No full table scans')
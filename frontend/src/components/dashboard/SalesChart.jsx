@@ -1,18 +1,27 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { Area, AreaChart, ResponsiveContainer, Tooltip, XAxis, YAxis, CartesianGrid } from 'recharts';
 import { Card, CardContent, CardHeader, CardTitle } from '../ui/Card';
-
-const data = [
-  { name: 'Jan', total: 1200 },
-  { name: 'Feb', total: 2100 },
-  { name: 'Mar', total: 1800 },
-  { name: 'Apr', total: 2400 },
-  { name: 'May', total: 1600 },
-  { name: 'Jun', total: 3200 },
-  { name: 'Jul', total: 3800 },
-];
+import { saleService } from '../../services/api';
 
 const SalesChart = () => {
+  const [data, setData] = useState([]);
+
+  useEffect(() => {
+    const fetchSeries = async () => {
+      try {
+        // Daily revenue for the last 30 days, bucketed by the server in EAT
+        const series = await saleService.getSeries({ interval: 'day' });
+        setData(series.buckets.map((bucket) => ({
+          name: new Date(bucket.period).toLocaleDateString('en-US', { month: 'short', day: 'numeric', timeZone: series.timezone }),
+          total: bucket.revenue,
+        })));
+      } catch (error) {
+        console.error('Error fetching sales series:', error);
+      }
+    };
+    fetchSeries();
+  }, []);
+
   return (
     <Card className="col-span-4">
       <CardHeader>
@@ -26,12 +26,24 @@ apiClient.interceptors.request.use(
   }
 )
 
+// Retries for a 503 that carries Retry-After (e.g. the password hashing pool
+// is momentarily full during a burst of logins)
+const MAX_BUSY_RETRIES = 3
+
 // Response interceptor - Handle common errors
 apiClient.interceptors.response.use(
   (response) => {
     return response
   },
   (error) => {
+    const config = error.config
+    const retryAfter = error.response?.headers?.['retry-after']
+    if (error.response?.status === 503 && retryAfter && config && (config.busyRetries || 0) < MAX_BUSY_RETRIES) {
+      config.busyRetries = (config.busyRetries || 0) + 1
+      const delay = (Number(retryAfter) || 1) * 1000 * (0.5 + Math.random())
+      return new Promise((resolve) => setTimeout(resolve, delay)).then(() => apiClient(config))
+    }
+
     if (error.response) {
       // Handle specific error codes
       switch (error.response.status) {
@@ -172,6 +184,11 @@ export const saleService = {
     const response = await apiClient.post('/sales/', saleData)
     return response.data
   },
+
+  getSeries: async (params) => {
+    const response = await apiClient.get('/sales/series', { params })
+    return response.data
+  },
 }
 
 export default apiClient